@@ -0,0 +1,51 @@
+"""
+Run from the repository root as a module: python -m benchmarks.dispatch_scaling
+"""
+import argparse
+import os
+import time
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.dispatch import evaluate_dispatch_matrix, build_route_table
+
+
+def build_fleet(n_aircraft: int, rng: np.random.Generator) -> list[N8273V]:
+    fleet = []
+    for i in range(n_aircraft):
+        aircraft = N8273V()
+        aircraft.callsign = f"N{i:05d}"
+        aircraft.performance_profile = {**aircraft.performance_profile,
+                                        "fuel_capacity_g": float(rng.uniform(30, 60)),
+                                        "fuel_rate_gph": float(rng.uniform(6, 10))}
+        fleet.append(aircraft)
+    return fleet
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the scaling of the dispatch matrix with the number of "
+                                                 "worker processes.")
+    parser.add_argument("--aircraft", type=int, default=100, help="number of aircraft")
+    parser.add_argument("--routes", type=int, default=10_000, help="number of routes")
+    parser.add_argument("--legs", type=int, default=6, help="maximum number of legs per route")
+    parser.add_argument("--processes", type=int, nargs="+", default=None,
+                        help="process counts to measure (default: 1, 2, 4, ... up to the CPU count)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    shape = (args.routes, args.legs)
+    routes = build_route_table(np.stack([rng.uniform(5, 60, shape), rng.uniform(0, 360, shape),
+                                         rng.uniform(0, 360, shape), rng.uniform(0, 30, shape),
+                                         rng.uniform(40, 80, shape), rng.uniform(-10, 10, shape)]),
+                               rng.integers(1, args.legs + 1, args.routes))
+    fleet = build_fleet(args.aircraft, rng)
+    cruise_altitude = rng.choice([4500, 5500, 6500, 7500, 8500], args.routes)
+
+    processes = args.processes or [2 ** k for k in range(int(np.log2(os.cpu_count() or 1)) + 1)]
+    reference = None
+    for n_processes in processes:
+        start = time.perf_counter()
+        matrix = evaluate_dispatch_matrix(fleet, routes, 1000, cruise_altitude, 1000, processes=n_processes)
+        seconds = time.perf_counter() - start
+        reference = reference or seconds
+        print(f"{n_processes:>3} processes: {seconds:8.2f} s, {args.aircraft * args.routes / seconds:>12,.0f} "
+              f"pairs/s, speedup {reference / seconds:5.2f}x, {matrix.feasible.mean():.1%} feasible")
@@ -0,0 +1,73 @@
+"""
+Run from the repository root as a module: python -m benchmarks.leg_memory_benchmark
+"""
+import argparse
+import gc
+import tracemalloc
+from classes.leg_store import LegStore
+from classes.legs import Cruise
+from classes.waypoints import Waypoint
+
+WAYPOINT_NAMES: tuple = ("KPDK", "Top of Climb", "Lake Lanier", "GVL", "Habersham")
+
+
+class DictLeg:
+    """
+    Stand-in for the previous Leg layout: every attribute stored in a per-instance __dict__, and a new Waypoint
+    object holding its own copy of the name for every leg.
+    """
+    def __init__(self, leg: Cruise) -> None:
+        for name in Cruise.__slots__ + Cruise.__mro__[1].__slots__:
+            setattr(self, name, getattr(leg, name))
+        self.from_waypoint = DictWaypoint("".join(leg.from_waypoint.name))
+        self.to_waypoint = DictWaypoint("".join(leg.to_waypoint.name))
+
+
+class DictWaypoint:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+def build_leg(i: int) -> Cruise:
+    return Cruise(from_waypoint=Waypoint(WAYPOINT_NAMES[i % len(WAYPOINT_NAMES)]),
+                  to_waypoint=Waypoint(WAYPOINT_NAMES[(i + 1) % len(WAYPOINT_NAMES)]),
+                  distance=float(i % 50), true_course=float(i % 360), true_airspeed=115.0, altitude=5500.0,
+                  wind_direction=289.0, wind_speed=8.0, temperature=66.2, mag_var=6.0)
+
+
+def measure(build) -> int:
+    """
+    :param build: builds and returns the objects to measure.
+    :return: the memory held by the built objects (bytes).
+    """
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the memory per leg of the leg representations.")
+    parser.add_argument("--legs", type=int, default=10 ** 6, help="number of legs")
+    args = parser.parse_args()
+
+    # legs are built outside of the measured region for the store, which only keeps its rows
+    template = [build_leg(i) for i in range(args.legs)]
+
+    class Plan:
+        def __init__(self, plan):
+            self.plan = plan
+
+    results = {
+        "dict-based Leg + Waypoint": measure(lambda: [DictLeg(leg) for leg in template]),
+        "slotted Leg + interned Waypoint": measure(lambda: [build_leg(i) for i in range(args.legs)]),
+        "LegStore rows": measure(lambda: LegStore.from_flight_plans([Plan(template)])),
+    }
+
+    baseline = results["dict-based Leg + Waypoint"]
+    print(f"Memory per leg at {args.legs:,} legs " + '-' * 40)
+    for name, size in results.items():
+        print(f"\t {name:<34} {size / args.legs:>8.1f} bytes/leg  ({baseline / size:.1f}x smaller)")
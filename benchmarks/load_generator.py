@@ -0,0 +1,127 @@
+"""
+Run from the repository root as a module: python -m benchmarks.load_generator
+"""
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+from classes.planning_server import PlanningServer, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_MAX_BATCH_SIZE, \
+    DEFAULT_MAX_BATCH_DELAY, DEFAULT_MAX_PENDING
+
+
+def build_plan_request(rng: np.random.Generator) -> bytes:
+    """
+    :param rng: random generator for the winds of the plan
+    :return: body of an /evaluate request for the KPDK -> Habersham plan
+    """
+    wind_direction, wind_speed = float(rng.uniform(0, 360)), float(rng.uniform(0, 30))
+    winds = {"wind_direction": wind_direction, "wind_speed": wind_speed, "temperature": 65, "mag_var": 6}
+    legs = [
+        {"kind": "Climb", "from_waypoint": "KPDK", "to_waypoint": "Top of Climb", "distance": 15, "true_course": 43,
+         "true_airspeed": 76, "start_altitude": 998, "end_altitude": 5500, **winds},
+        {"kind": "Cruise", "from_waypoint": "Top of Climb", "to_waypoint": "Lake Lanier", "distance": 12,
+         "true_course": 43, "true_airspeed": 115, "altitude": 5500, **winds},
+        {"kind": "Cruise", "from_waypoint": "Lake Lanier", "to_waypoint": "GVL", "distance": 8, "true_course": 50,
+         "true_airspeed": 115, "altitude": 5500, **winds},
+        {"kind": "Descend", "from_waypoint": "GVL", "to_waypoint": "Habersham", "distance": 16, "true_course": 60,
+         "true_airspeed": 122, "start_altitude": 5500, "end_altitude": 998, **winds},
+    ]
+    return json.dumps({"legs": legs}).encode()
+
+
+async def post(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, body: bytes) -> int:
+    """
+    Sends an /evaluate request on a keep-alive connection and reads the reply.
+
+    :return: the HTTP status of the reply
+    """
+    writer.write(f"POST /evaluate HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def run_load(host: str, port: int, n_requests: int, concurrency: int, seed: int = 0) -> dict:
+    """
+    Sends n_requests plans from concurrency clients, each with its own keep-alive connection and at most one
+    request in flight.
+
+    :return: throughput (requests/s), latency percentiles (ms) and the count of every reply status
+    """
+    rng = np.random.default_rng(seed)
+    bodies = [build_plan_request(rng) for _ in range(n_requests)]
+    latencies = np.zeros(n_requests)
+    statuses = {}
+    next_request = 0
+
+    async def client() -> None:
+        nonlocal next_request
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while next_request < n_requests:
+                i = next_request
+                next_request += 1
+                start = time.perf_counter()
+                status = await post(reader, writer, host, bodies[i])
+                latencies[i] = time.perf_counter() - start
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1e3
+    return {"requests": n_requests, "seconds": elapsed, "throughput": n_requests / elapsed, "p50_ms": p50,
+            "p90_ms": p90, "p99_ms": p99, "max_ms": latencies.max() * 1e3, "statuses": statuses}
+
+
+async def main(args: argparse.Namespace) -> None:
+    server = None
+    if args.spawn:
+        server = PlanningServer(host=args.host, port=0, max_batch_size=args.batch_size,
+                                max_batch_delay=args.batch_delay_ms / 1e3, max_pending=args.max_pending)
+        await server.start()
+        args.port = server.port
+
+    try:
+        results = await run_load(args.host, args.port, args.requests, args.concurrency)
+    finally:
+        if server is not None:
+            await server.close()
+
+    print(f"{results['requests']} requests from {args.concurrency} clients in {results['seconds']:.2f} s: "
+          f"{results['throughput']:,.0f} requests/s")
+    print(f"latency p50 {results['p50_ms']:.2f} ms, p90 {results['p90_ms']:.2f} ms, p99 {results['p99_ms']:.2f} ms, "
+          f"max {results['max_ms']:.2f} ms")
+    print(f"replies: {results['statuses']}")
+    if server is not None:
+        stats = server.stats
+        print(f"batches: {stats['batches']}, mean size {stats['batched_plans'] / max(stats['batches'], 1):.1f}, "
+              f"max size {stats['max_batch_size']}, shed {stats['shed']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the throughput and latency of the planning server.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="server host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument("--spawn", action="store_true", help="start a server in this process instead")
+    parser.add_argument("--requests", type=int, default=5000, help="number of requests")
+    parser.add_argument("--concurrency", type=int, default=64, help="number of concurrent clients")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="maximum number of plans per batch of the spawned server")
+    parser.add_argument("--batch-delay-ms", type=float, default=DEFAULT_MAX_BATCH_DELAY * 1e3,
+                        help="maximum batching delay of the spawned server (ms)")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="maximum number of pending plans of the spawned server")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,276 @@
+"""
+Run from the repository root as a module: python -m benchmarks.run_benchmarks
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import zlib
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.flightplan import FlightPlan
+from classes.legs import Climb, Cruise, Descend
+from classes.plan_table import PlanTable, LEG_CRUISE, LEG_CLIMB, LEG_DESCEND
+from classes.routing import WaypointGraph, find_route
+from classes.waypoint_database import WaypointDatabase
+from classes.waypoints import Waypoint
+from models.atmosphere import atmospheric_model, atmospheric_model_batch
+from models.winds import compute_wca, compute_gs, compute_wind_triangle
+from models.winds_aloft import WindsAloft
+
+DEFAULT_BASELINE: str = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD_PERCENT: float = 20.0
+
+
+class Benchmark:
+    """
+    A single benchmark case. setup(rng) builds the inputs outside of the timed region and returns the function to
+    time; items is the number of work items (calls, legs or plans) processed by one call of that function. rng is
+    seeded from the name of the case, so a case gets the same inputs whether it runs alone (--filter) or not.
+    """
+    def __init__(self, name: str, items: int, setup) -> None:
+        self.name: str = name
+        self.items: int = items
+        self.setup = setup
+
+    def run(self, repeat: int) -> dict:
+        """
+        :param repeat: number of timed runs, the fastest one is kept.
+        :return: throughput (items/s), best time (s) and peak traced memory (bytes) of the case.
+        """
+        function = self.setup(np.random.default_rng(zlib.crc32(self.name.encode())))
+        function()  # warm-up
+
+        best = np.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {"items": self.items, "seconds": best, "throughput": self.items / best,
+                "peak_memory_bytes": peak_memory}
+
+
+def build_flight_plan(aircraft: N8273V) -> FlightPlan:
+    return FlightPlan([
+        Climb(from_waypoint=Waypoint("KPDK"), to_waypoint=Waypoint("Top of Climb"), distance=15, true_course=43,
+              true_airspeed=76, start_altitude=998, end_altitude=5500, wind_direction=289, wind_speed=4,
+              temperature=73.4, mag_var=6),
+        Cruise(from_waypoint=Waypoint("Top of Climb"), to_waypoint=Waypoint("Lake Lanier"), distance=6,
+               true_course=43, true_airspeed=115, altitude=5500, wind_direction=289, wind_speed=8,
+               temperature=66.2, mag_var=6),
+        Cruise(from_waypoint=Waypoint("Lake Lanier"), to_waypoint=Waypoint("GVL"), distance=6, true_course=43,
+               true_airspeed=115, altitude=5500, wind_direction=290, wind_speed=16, temperature=73.4, mag_var=6),
+        Descend(from_waypoint=Waypoint("GVL"), to_waypoint=Waypoint("Habersham"), distance=15, true_course=45,
+                true_airspeed=76, start_altitude=5500, end_altitude=998, wind_direction=289, wind_speed=4,
+                temperature=73.4, mag_var=6),
+    ], aircraft=aircraft)
+
+
+def build_plan_table(n_plans: int, n_legs: int, rng: np.random.Generator) -> PlanTable:
+    kind = np.full((n_plans, n_legs), LEG_CRUISE, dtype=np.int8)
+    kind[:, 0] = LEG_CLIMB
+    kind[:, -1] = LEG_DESCEND
+    cruise_altitude = rng.uniform(3000, 9000, (n_plans, 1))
+    start_altitude = np.repeat(cruise_altitude, n_legs, axis=1)
+    end_altitude = start_altitude.copy()
+    start_altitude[:, 0] = rng.uniform(0, 2000, n_plans)
+    end_altitude[:, -1] = rng.uniform(0, 2000, n_plans)
+
+    return PlanTable(kind=kind,
+                     distance=rng.uniform(5, 50, (n_plans, n_legs)),
+                     true_course=rng.uniform(0, 360, (n_plans, n_legs)),
+                     true_airspeed=np.where(kind == LEG_CRUISE, 115.0, 76.0),
+                     start_altitude=start_altitude,
+                     end_altitude=end_altitude,
+                     wind_direction=rng.uniform(0, 360, (n_plans, n_legs)),
+                     wind_speed=rng.uniform(0, 30, (n_plans, n_legs)),
+                     temperature=rng.uniform(0, 90, (n_plans, n_legs)),
+                     mag_var=rng.uniform(-15, 15, (n_plans, n_legs)))
+
+
+def build_benchmarks(scale: float = 1.0) -> list[Benchmark]:
+    """
+    Builds the benchmark cases covering the planning hot paths: single calls of the scalar functions, a single
+    flight plan, and 10k plans through both FlightPlan.evaluate() and the PlanTable batch engine. At 1M legs only
+    PlanTable.evaluate() is timed: the equivalent 100k FlightPlan objects would take minutes to evaluate per run and
+    hold 1M Leg objects in memory.
+
+    :param scale: multiplier applied to every problem size (e.g., 0.01 for a quick smoke run).
+    :return: the benchmark cases.
+    """
+    aircraft = N8273V()
+    rng = np.random.default_rng(0)
+
+    n_calls = max(1, int(10_000 * scale))
+    n_elements = max(1, int(1_000_000 * scale))
+    n_plans = max(1, int(10_000 * scale))
+    n_leg_plans = max(1, int(100_000 * scale))
+
+    temperatures = rng.uniform(-20, 100, n_elements)
+    pressure_alts = rng.uniform(0, 14000, n_elements)
+    courses = rng.uniform(0, 360, n_elements)
+    airspeeds = rng.uniform(60, 160, n_elements)
+    wind_directions = rng.uniform(0, 360, n_elements)
+    wind_speeds = rng.uniform(0, 50, n_elements)
+    from_altitudes = rng.uniform(0, 7000, n_elements)
+    to_altitudes = rng.uniform(7001, 14000, n_elements)
+
+    # the inputs above are drawn eagerly; setup functions that draw their own inputs use the generator of their case
+    def scalar_loop(function, *columns):
+        arguments = list(zip(*(column[:n_calls].tolist() for column in columns)))
+        return lambda rng: lambda: [function(*argument) for argument in arguments]
+
+    def evaluate_flight_plan(rng):
+        flight_plan = build_flight_plan(aircraft)
+        return flight_plan.evaluate
+
+    def evaluate_flight_plans(n: int, m: int):
+        def setup(rng):
+            flight_plans = build_plan_table(n, m, rng).to_flight_plans(aircraft)
+            return lambda: [flight_plan.evaluate() for flight_plan in flight_plans]
+        return setup
+
+    def evaluate_plan_table(n: int, m: int):
+        def setup(rng):
+            table = build_plan_table(n, m, rng)
+            return lambda: table.evaluate(aircraft)
+        return setup
+
+    def route_search(rng):
+        n_waypoints = max(10, int(5_000 * scale))
+        database = WaypointDatabase([f"WP{i}" for i in range(n_waypoints)], rng.uniform(30, 38, n_waypoints),
+                                    rng.uniform(-90, -78, n_waypoints))
+        graph = WaypointGraph.within_range(database, 20 / np.sqrt(max(scale, 1e-3)))
+        winds = WindsAloft(altitudes=[0, 12000], wind_direction=[270, 300], wind_speed=[20, 40],
+                           temperature=[70, 40])
+        return lambda: find_route(graph, aircraft, "WP0", "WP1", winds, cruise_altitude=5500,
+                                  departure_altitude=1000, arrival_altitude=1000, mag_var=5)
+
+    def wind_pair(rng):
+        return lambda: (compute_wca(courses, airspeeds, wind_directions, wind_speeds),
+                        compute_gs(courses, airspeeds, wind_directions, wind_speeds))
+
+    return [
+        Benchmark("atmospheric_model[scalar]", n_calls, scalar_loop(atmospheric_model, temperatures, pressure_alts)),
+        Benchmark("atmospheric_model_batch[1M]", n_elements,
+                  lambda rng: lambda: atmospheric_model_batch(temperatures, pressure_alts)),
+        Benchmark("compute_wca[scalar]", n_calls, scalar_loop(compute_wca, courses, airspeeds, wind_directions,
+                                                              wind_speeds)),
+        Benchmark("compute_gs[scalar]", n_calls, scalar_loop(compute_gs, courses, airspeeds, wind_directions,
+                                                             wind_speeds)),
+        Benchmark("compute_wca+compute_gs[1M]", n_elements, wind_pair),
+        Benchmark("compute_wind_triangle[1M]", n_elements,
+                  lambda rng: lambda: compute_wind_triangle(courses, airspeeds, wind_directions, wind_speeds)),
+        Benchmark("Aircraft.compute_mag_dev[scalar]", n_calls, scalar_loop(aircraft.compute_mag_dev, courses)),
+        Benchmark("Aircraft.compute_mag_dev_batch[1M]", n_elements,
+                  lambda rng: lambda: aircraft.compute_mag_dev_batch(courses)),
+        Benchmark("Aircraft.compute_climb[scalar]", n_calls, scalar_loop(aircraft.compute_climb, from_altitudes,
+                                                                         to_altitudes, temperatures)),
+        Benchmark("Aircraft.compute_descent[scalar]", n_calls, scalar_loop(aircraft.compute_descent, to_altitudes,
+                                                                           from_altitudes, temperatures)),
+        Benchmark("Aircraft.compute_climb_batch[1M]", n_elements,
+                  lambda rng: lambda: aircraft.compute_climb_batch(from_altitudes, to_altitudes, temperatures)),
+        Benchmark("Aircraft.compute_descent_batch[1M]", n_elements,
+                  lambda rng: lambda: aircraft.compute_descent_batch(to_altitudes, from_altitudes, temperatures)),
+        Benchmark("FlightPlan.evaluate[single plan]", 1, evaluate_flight_plan),
+        Benchmark("FlightPlan.evaluate[10k plans]", n_plans, evaluate_flight_plans(n_plans, 4)),
+        Benchmark("PlanTable.evaluate[10k plans]", n_plans, evaluate_plan_table(n_plans, 4)),
+        Benchmark("PlanTable.evaluate[1M legs]", n_leg_plans * 10, evaluate_plan_table(n_leg_plans, 10)),
+        Benchmark("find_route[~100k edges]", 1, route_search),
+    ]
+
+
+def compare(results: dict, baseline: dict, threshold_percent: float, memory_threshold_percent: float) -> list[str]:
+    """
+    Compares benchmark results against a baseline.
+
+    :param results: results of run_benchmarks()
+    :param baseline: a previously saved baseline
+    :param threshold_percent: maximum allowed throughput drop (%)
+    :param memory_threshold_percent: maximum allowed peak memory increase (%)
+    :return: a description of every regression, empty if there are none.
+    """
+    regressions = []
+    for name, result in results["cases"].items():
+        if name not in baseline.get("cases", {}):
+            continue
+        reference = baseline["cases"][name]
+
+        throughput_change = (result["throughput"] / reference["throughput"] - 1) * 100
+        if throughput_change < -threshold_percent:
+            regressions.append(f"{name}: throughput {throughput_change:+.1f}% "
+                               f"({reference['throughput']:.4g} -> {result['throughput']:.4g} items/s)")
+
+        if reference["peak_memory_bytes"] > 0:
+            memory_change = (result["peak_memory_bytes"] / reference["peak_memory_bytes"] - 1) * 100
+            if memory_change > memory_threshold_percent:
+                regressions.append(f"{name}: peak memory {memory_change:+.1f}% "
+                                   f"({reference['peak_memory_bytes']:,} -> {result['peak_memory_bytes']:,} bytes)")
+    return regressions
+
+
+def run_benchmarks(scale: float = 1.0, repeat: int = 3, name_filter: str | None = None) -> dict:
+    """
+    Runs the benchmark cases.
+
+    :param scale: multiplier applied to every problem size.
+    :param repeat: number of timed runs of every case.
+    :param name_filter: only run the cases whose name contains this string.
+    :return: the results, in the format of the JSON baseline.
+    """
+    results = {"scale": scale, "python": platform.python_version(), "numpy": np.__version__,
+               "machine": platform.machine(), "cases": {}}
+
+    for benchmark in build_benchmarks(scale):
+        if name_filter is not None and name_filter not in benchmark.name:
+            continue
+        result = benchmark.run(repeat)
+        results["cases"][benchmark.name] = result
+        print(f"{benchmark.name:<40} {result['throughput']:>14,.0f} items/s "
+              f"{result['seconds'] * 1e3:>10.2f} ms {result['peak_memory_bytes'] / 2 ** 20:>10.1f} MiB")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the planning hot paths and checks them against a "
+                                                 "JSON baseline.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="path of the JSON baseline")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PERCENT,
+                        help="maximum allowed throughput drop (%%)")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_THRESHOLD_PERCENT,
+                        help="maximum allowed peak memory increase (%%)")
+    parser.add_argument("--scale", type=float, default=1.0, help="problem size multiplier")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs of every case")
+    parser.add_argument("--filter", default=None, help="only run the cases whose name contains this string")
+    args = parser.parse_args()
+
+    results = run_benchmarks(scale=args.scale, repeat=args.repeat, name_filter=args.filter)
+
+    if args.update or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    if baseline.get("scale") != args.scale:
+        print(f"Baseline was recorded at scale {baseline.get('scale')}, not {args.scale}. Use --update.")
+        sys.exit(2)
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    sys.exit(1 if regressions else 0)
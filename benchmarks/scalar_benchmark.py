@@ -0,0 +1,55 @@
+"""
+Run from the repository root as a module: python -m benchmarks.scalar_benchmark
+"""
+import time
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.tests.altitude_optimizer_tests import build_route
+from models.winds import compute_wind_triangle
+
+N_CALLS: int = 20_000
+
+
+def time_per_call(function, *args, repeat: int = 5) -> float:
+    """
+    Times repeated calls of a function and returns the per-call latency of the best run.
+
+    :param function: the function to time.
+    :param args: arguments passed to the function.
+    :param repeat: number of runs.
+    :return: the fastest per-call time in seconds.
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(N_CALLS):
+            function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best / N_CALLS
+
+
+def vectorized_leg_evaluate(leg, mag_dev: float, fuel_rate: float) -> None:
+    # Leg.evaluate() with the wind triangle solved on one-element arrays (the NumPy path)
+    wca, gs, headwind, crosswind = compute_wind_triangle(np.array([leg.true_course]), np.array([leg.true_airspeed]),
+                                                         np.array([leg.wind_direction]), np.array([leg.wind_speed]))
+    leg.apply_wind_triangle(mag_dev, fuel_rate, wca[0], gs[0], headwind[0], crosswind[0])
+
+
+if __name__ == "__main__":
+    aircraft = N8273V()
+    leg = build_route().plan[1]
+    climb, descent = (998.0, 5500.0, 60.0), (5500.0, 998.0, 60.0)
+    cases = [("compute_climb()", aircraft.compute_climb, climb, tuple(np.array([value]) for value in climb)),
+             ("compute_descent()", aircraft.compute_descent, descent, tuple(np.array([value]) for value in descent))]
+
+    print(f"Per-call latency over {N_CALLS:,} calls " + '-' * 40)
+    for name, function, scalar_arguments, array_arguments in cases:
+        scalar_time = time_per_call(function, *scalar_arguments)
+        array_time = time_per_call(function, *array_arguments)
+        print(f"\t {name:<18} float path: {scalar_time * 1e6:6.2f} us,  NumPy path: {array_time * 1e6:6.2f} us  "
+              f"({array_time / scalar_time:.1f}x)")
+
+    scalar_time = time_per_call(leg.evaluate, 1.0, 7.6)
+    array_time = time_per_call(vectorized_leg_evaluate, leg, 1.0, 7.6)
+    print(f"\t {'Leg.evaluate()':<18} float path: {scalar_time * 1e6:6.2f} us,  NumPy path: {array_time * 1e6:6.2f} us  "
+          f"({array_time / scalar_time:.1f}x)")
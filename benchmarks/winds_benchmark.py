@@ -0,0 +1,50 @@
+"""
+Run from the repository root as a module: python -m benchmarks.winds_benchmark
+"""
+import time
+import numpy as np
+from models.winds import compute_wca, compute_gs, compute_wind_triangle
+
+N_INPUTS: int = 10 ** 6
+
+
+def time_call(function, *args, repeat: int = 5) -> float:
+    """
+    Times a function call and returns the best of several runs.
+
+    :param function: the function to time.
+    :param args: arguments passed to the function.
+    :param repeat: number of runs.
+    :return: the fastest run time in seconds.
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def separate(true_course, true_airspeed, wind_direction, wind_speed):
+    wca = compute_wca(true_course, true_airspeed, wind_direction, wind_speed)
+    gs = compute_gs(true_course, true_airspeed, wind_direction, wind_speed)
+    return wca, gs
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    inputs = (rng.uniform(0, 360, N_INPUTS),
+              rng.uniform(60, 160, N_INPUTS),
+              rng.uniform(0, 360, N_INPUTS),
+              rng.uniform(0, 50, N_INPUTS))
+
+    separate_time = time_call(separate, *inputs)
+    fused_time = time_call(compute_wind_triangle, *inputs)
+
+    wca, gs = separate(*inputs)
+    fused_wca, fused_gs, _, _ = compute_wind_triangle(*inputs)
+
+    print(f"Wind triangle over {N_INPUTS:,} inputs " + '-' * 40)
+    print(f"\t compute_wca() + compute_gs(): {separate_time * 1e3:.1f} ms")
+    print(f"\t compute_wind_triangle():      {fused_time * 1e3:.1f} ms  ({separate_time / fused_time:.2f}x)")
+    print(f"\t max |WCA error|: {np.max(np.abs(wca - fused_wca)):.2e} deg,  max |GS error|: {np.max(np.abs(gs - fused_gs)):.2e} kts")
@@ -1,10 +1,50 @@
+import math
+import os
 import numpy as np
-from models.atmosphere import atmospheric_model
+from models.atmosphere import atmospheric_model, atmospheric_model_batch, atmospheric_envelope_mask
+from models.performance_grid import PerformanceGrid, MODEL_NAMES
+from models.modeling.model_artifact import DATA_DIR, load_models
+from models.polynomial import Polynomial, is_scalar
+
+
+class PerformanceModel:
+    """
+    Climb/descent model attribute of an Aircraft (e.g., time_to_climb_model). An assigned model is stored as a
+    read-only float array (copied if it was writable) and compiled into its Horner evaluator right away, so that
+    the scalar path never has to check whether the model changed: it can only be replaced, not updated in place.
+    """
+    def __set_name__(self, owner: type, attribute: str) -> None:
+        self.name: str = attribute.removesuffix("_model")
+        self.attribute: str = f"_{attribute}"
+
+    def __get__(self, aircraft, owner: type | None = None):
+        if aircraft is None:
+            return self
+        return getattr(aircraft, self.attribute)
+
+    def __set__(self, aircraft, model) -> None:
+        polynomial = None
+        if model is not None:
+            model = np.asarray(model, dtype=float)
+            if model.flags.writeable:
+                model = model.copy()
+                model.flags.writeable = False
+            polynomial = Polynomial(model)
+        setattr(aircraft, self.attribute, model)
+        aircraft.polynomials[self.name] = polynomial
+
 
 class Aircraft:
     """
     Generic aircraft class.
     """
+    time_to_climb_model = PerformanceModel()
+    distance_to_climb_model = PerformanceModel()
+    fuel_to_climb_model = PerformanceModel()
+    time_to_descend_model = PerformanceModel()
+    distance_to_descend_model = PerformanceModel()
+    fuel_to_descend_model = PerformanceModel()
+
     def __init__(self, category: str, class_: str, type: str, callsign: str, performance_profile: dict) -> None:
         """
         Constructor.
@@ -21,6 +61,10 @@ class Aircraft:
         self.callsign: str = callsign
         self.performance_profile: dict = performance_profile
 
+        # the climb/descent models compiled into plain float evaluators by model name, see PerformanceModel
+        self.polynomials: dict = {}
+
+        # read-only climb/descent models, see PerformanceModel
         self.time_to_climb_model: np.ndarray | None = None
         self.distance_to_climb_model: np.ndarray | None = None
         self.fuel_to_climb_model: np.ndarray | None = None
@@ -28,28 +72,171 @@ class Aircraft:
         self.distance_to_descend_model: np.ndarray | None = None
         self.fuel_to_descend_model: np.ndarray | None = None
 
+        # opt-in tabulated climb/descent models, see enable_performance_grid()
+        self.performance_grid: PerformanceGrid | None = None
+
+        # magnetic deviation card compiled into a lookup table, see compile_mag_dev_table()
+        self.mag_dev_resolution: float = 1.0
+        self.mag_dev_interpolation: str = "nearest"
+        self.mag_dev_table: np.ndarray | None = None
+        if "mag_dev_lookup" in self.performance_profile.keys():
+            self.compile_mag_dev_table()
+
+    @property
+    def performance_models(self) -> np.ndarray:
+        """
+        :return: the climb and descent models stacked in the order of models.performance_grid.MODEL_NAMES
+        """
+        models = [self.time_to_climb_model, self.distance_to_climb_model, self.fuel_to_climb_model,
+                  self.time_to_descend_model, self.distance_to_descend_model, self.fuel_to_descend_model]
+        assert all(model is not None for model in models), "Must have climb and descent models for this aircraft."
+        return np.array(models, dtype=float)
+
+    def load_performance_models(self, path: str | None = None, data_dir: str = DATA_DIR) -> None:
+        """
+        Sets the climb and descent models from a fitted model artifact. Only reads the artifact: a missing or stale
+        artifact of data_dir raises FileNotFoundError, build it with models/modeling/fit_models.py. Any performance
+        grid is dropped, as it was tabulated from the previous models.
+
+        :param path: path of an existing artifact, the artifact of data_dir is used if None
+        :param data_dir: directory of the digitized POH charts of the aircraft
+        :return: None
+        """
+        models = load_models(path, data_dir=data_dir)
+        for name in MODEL_NAMES:
+            setattr(self, f"{name}_model", models[name])
+        self.performance_grid = None
+
+    def polynomial(self, name: str) -> Polynomial:
+        """
+        :param name: name of the model in models.performance_grid.MODEL_NAMES (e.g., "time_to_climb")
+        :return: the compiled evaluator of the model, see models.polynomial.Polynomial
+        """
+        return self.polynomials[name]
+
+    def enable_performance_grid(self, temperature_step: float = 1.0, pressure_alt_step: float = 100.0,
+                                tolerance: float | None = None, path: str | None = None) -> PerformanceGrid:
+        """
+        Tabulates the climb and descent models over the atmospheric envelope once, so that compute_climb() and
+        compute_descent() (and their batch versions) are answered by bilinear lookup instead of the polynomial
+        models. If path points to a grid previously built from the same models, atmospheric model and steps, it is
+        loaded instead of rebuilt; otherwise the new grid is saved there.
+
+        :param temperature_step: maximum temperature spacing of the grid (F)
+        :param pressure_alt_step: maximum pressure altitude spacing of the grid (ft)
+        :param tolerance: if given, the maximum absolute error allowed for every tabulated model (min, nm or gal)
+        :param path: optional .npz file used to cache the grid across processes
+        :return: the performance grid
+        """
+        grid = None
+        if path is not None and os.path.exists(path):
+            grid = PerformanceGrid.load(path)
+            if not grid.matches(self.performance_models, temperature_step, pressure_alt_step) or \
+                    (tolerance is not None and np.any(grid.max_errors > tolerance)):
+                grid = None
+
+        if grid is None:
+            grid = PerformanceGrid.build(self.performance_models, temperature_step=temperature_step,
+                                         pressure_alt_step=pressure_alt_step, tolerance=tolerance)
+            if path is not None:
+                grid.save(path)
+
+        self.performance_grid = grid
+        return grid
+
+    def disable_performance_grid(self) -> None:
+        """
+        Reverts compute_climb() and compute_descent() to the exact polynomial models.
+
+        :return: None
+        """
+        self.performance_grid = None
+
+    def compile_mag_dev_table(self, resolution: float = 1.0, interpolation: str = "nearest") -> None:
+        """
+        Compiles the "mag_dev_lookup" deviation card of the performance profile into a lookup table covering 0 to
+        360 degrees at the given resolution, so that compute_mag_dev() is a constant-time lookup. Headings wrap
+        around at 0/360 (e.g., 355 is matched to the 0 entry of the card rather than the 330 entry).
+        Called with the default arguments by the constructor.
+
+        :param resolution: the heading resolution of the table in degrees (must divide 360).
+        :param interpolation: "nearest" to use the closest card entry, "linear" to interpolate between card entries.
+        :return: None
+        """
+        assert "mag_dev_lookup" in self.performance_profile.keys(), \
+            "Performance profile is missing the mag_dev_lookup() dictionary."
+        assert isinstance(self.performance_profile["mag_dev_lookup"], dict), \
+            "mag_dev_lookup must be a dictionary."
+        assert interpolation in ("nearest", "linear"), "interpolation must be 'nearest' or 'linear'."
+
+        n_entries = int(round(360 / resolution))
+        assert np.isclose(n_entries * resolution, 360), "The resolution must divide 360 degrees."
+
+        card_headings = np.fromiter(self.performance_profile["mag_dev_lookup"].keys(), dtype=float) % 360
+        card_corrections = np.fromiter(self.performance_profile["mag_dev_lookup"].values(), dtype=float)
+        table_headings = np.arange(n_entries) * resolution
+
+        if interpolation == "nearest":
+            circular_distance = np.abs((table_headings[:, np.newaxis] - card_headings + 180) % 360 - 180)
+            table = card_corrections[circular_distance.argmin(axis=1)]
+        else:
+            order = np.argsort(card_headings)
+            card_headings = card_headings[order]
+            card_corrections = card_corrections[order]
+            table = np.interp(table_headings, card_headings, card_corrections, period=360)
+
+        self.mag_dev_resolution: float = resolution
+        self.mag_dev_interpolation: str = interpolation
+        self.mag_dev_table: np.ndarray | None = table
+
     def compute_mag_dev(self, heading: float) -> float:
         """
         Compute the magnetic deviation for a given heading.
         The performance profile must have an entry called "mag_dev_lookup". The mag_dev_lookup entry must be a
         dictionary structures as a table of magentic deviations in degrees.
         e.g., "mag_dev_lookup": {0: -1, 30: 0, 60: 1, ...}
+        The deviation card is looked up through the table built by compile_mag_dev_table().
 
         :param heading: the magnetic heading in degrees.
         :return: the magnetic deviation correction angle in degrees.
         """
-        assert "mag_dev_lookup" in self.performance_profile.keys(), \
-            "Performance profile is missing the mag_dev_lookup() dictionary."
-        assert isinstance(self.performance_profile["mag_dev_lookup"], dict), \
-            "mag_dev_lookup must be a dictionary."
+        assert self.mag_dev_table is not None, "Performance profile is missing the mag_dev_lookup() dictionary."
 
-        true_headings = np.fromiter(self.performance_profile["mag_dev_lookup"].keys(), dtype=float)
-        corrections = np.fromiter(self.performance_profile["mag_dev_lookup"].values(), dtype=float)
+        position = heading / self.mag_dev_resolution
+        n_entries = len(self.mag_dev_table)
 
-        closest_heading_index = (np.abs(true_headings - heading)).argmin()
-        return corrections[closest_heading_index]
+        if self.mag_dev_interpolation == "nearest":
+            return self.mag_dev_table[int(round(position)) % n_entries]
 
-    def compute_climb(self, from_altitude: float, to_altitude: float, temperature: float):
+        lower_index = math.floor(position)
+        weight = position - lower_index
+        lower = self.mag_dev_table[lower_index % n_entries]
+        upper = self.mag_dev_table[(lower_index + 1) % n_entries]
+        return lower + weight * (upper - lower)
+
+    def compute_mag_dev_batch(self, headings: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of compute_mag_dev(). Computes the magnetic deviation for an array of headings.
+
+        :param headings: the magnetic headings in degrees (any shape).
+        :return: the magnetic deviation correction angles in degrees (same shape as headings).
+        """
+        assert self.mag_dev_table is not None, "Performance profile is missing the mag_dev_lookup() dictionary."
+
+        position = np.asarray(headings, dtype=float) / self.mag_dev_resolution
+        n_entries = len(self.mag_dev_table)
+
+        if self.mag_dev_interpolation == "nearest":
+            return self.mag_dev_table[np.round(position).astype(np.intp) % n_entries]
+
+        lower_index = np.floor(position)
+        weight = position - lower_index
+        lower_index = lower_index.astype(np.intp)
+        lower = self.mag_dev_table[lower_index % n_entries]
+        upper = self.mag_dev_table[(lower_index + 1) % n_entries]
+        return lower + weight * (upper - lower)
+
+    def compute_climb(self, from_altitude: float, to_altitude: float, temperature: float, validate: bool = True):
         """
         Computes the time, distance, and fuel to climb performance based on a temperature and pressure
         altitude.
@@ -57,34 +244,82 @@ class Aircraft:
         :param from_altitude: float = outside pressure altitude (ft)
         :param to_altitude: float = desired pressure altitude (ft) [must be > pressure_alt]
         :param temperature: float = outside air temperature (F)
+        :param validate: bool = if False, the altitudes and temperature are not checked (e.g., already checked by
+            classes.plan_validation.validate_plan_table())
         :return: time: float = time to climb to the desired pressure altitude (min)
         :return: distance: float = distance to climb to the desired pressure altitude (nautical miles)
         :return: fuel: float = fuel to climb to the desired pressure altitude (gal)
         """
-        assert from_altitude < to_altitude, f"from_altitude must be less than the to_altitude. Use compute_descent() otherwise."
         assert self.time_to_climb_model is not None, "Must have a time to climb model for this aircraft."
         assert self.distance_to_climb_model is not None, "Must have a distance to climb model for this aircraft."
         assert self.fuel_to_climb_model is not None, "Must have a fuel to climb model for this aircraft."
 
-        performance = atmospheric_model(temperature=temperature, pressure_alt=to_altitude)
+        if not is_scalar(from_altitude, to_altitude, temperature):
+            if validate:
+                assert np.all(np.asarray(from_altitude) < np.asarray(to_altitude)), \
+                    "from_altitude must be less than the to_altitude. Use compute_descent() otherwise."
+                assert np.all(atmospheric_envelope_mask(temperature, from_altitude) &
+                              atmospheric_envelope_mask(temperature, to_altitude)), \
+                    "Temperature and pressure altitudes must be inside the atmospheric envelope."
+            return self.compute_climb_batch(from_altitude, to_altitude, temperature)
 
-        time: float = np.polyval(self.time_to_climb_model, performance)
-        distance: float = np.polyval(self.distance_to_climb_model, performance)
-        fuel: float = np.polyval(self.fuel_to_climb_model, performance)
+        if validate:
+            assert from_altitude < to_altitude, f"from_altitude must be less than the to_altitude. Use compute_descent() otherwise."
 
-        reference_performance = atmospheric_model(temperature=temperature, pressure_alt=from_altitude)
+        if self.performance_grid is not None:
+            assert not validate or (atmospheric_envelope_mask(temperature, from_altitude) and
+                                    atmospheric_envelope_mask(temperature, to_altitude)), \
+                "Temperature and pressure altitudes must be inside the atmospheric envelope."
+            return self.performance_grid.compute_climb(from_altitude, to_altitude, temperature)
 
-        reference_time: float = np.polyval(self.time_to_climb_model, reference_performance)
-        reference_distance: float = np.polyval(self.distance_to_climb_model, reference_performance)
-        reference_fuel: float = np.polyval(self.fuel_to_climb_model, reference_performance)
+        performance = atmospheric_model(temperature=temperature, pressure_alt=to_altitude, validate=validate)
+        reference_performance = atmospheric_model(temperature=temperature, pressure_alt=from_altitude,
+                                                  validate=validate)
 
-        time -= reference_time
-        distance -= reference_distance
-        fuel -= reference_fuel
+        time_model = self.polynomial("time_to_climb")
+        distance_model = self.polynomial("distance_to_climb")
+        fuel_model = self.polynomial("fuel_to_climb")
+
+        time: float = time_model(performance) - time_model(reference_performance)
+        distance: float = distance_model(performance) - distance_model(reference_performance)
+        fuel: float = fuel_model(performance) - fuel_model(reference_performance)
 
         return time, distance, fuel
 
-    def compute_descent(self, from_altitude: float, to_altitude: float, temperature: float):
+    def compute_climb_batch(self, from_altitude: np.ndarray, to_altitude: np.ndarray, temperature: np.ndarray):
+        """
+        Vectorized version of compute_climb(). The inputs may be scalars or arrays of any broadcastable shape.
+        Entries that are outside of the atmospheric envelope, or where from_altitude >= to_altitude, are returned
+        as NaN instead of raising.
+
+        :param from_altitude: np.ndarray = outside pressure altitude (ft)
+        :param to_altitude: np.ndarray = desired pressure altitude (ft) [must be > pressure_alt]
+        :param temperature: np.ndarray = outside air temperature (F)
+        :return: time: np.ndarray = time to climb to the desired pressure altitude (min)
+        :return: distance: np.ndarray = distance to climb to the desired pressure altitude (nautical miles)
+        :return: fuel: np.ndarray = fuel to climb to the desired pressure altitude (gal)
+        """
+        assert self.time_to_climb_model is not None, "Must have a time to climb model for this aircraft."
+        assert self.distance_to_climb_model is not None, "Must have a distance to climb model for this aircraft."
+        assert self.fuel_to_climb_model is not None, "Must have a fuel to climb model for this aircraft."
+
+        if self.performance_grid is not None:
+            return self.performance_grid.compute_climb(from_altitude, to_altitude, temperature)
+
+        performance = atmospheric_model_batch(temperature=temperature, pressure_alt=to_altitude)
+        reference_performance = atmospheric_model_batch(temperature=temperature, pressure_alt=from_altitude)
+        performance = np.where(np.asarray(from_altitude) < np.asarray(to_altitude), performance, np.nan)
+
+        time = np.polyval(self.time_to_climb_model, performance) - \
+            np.polyval(self.time_to_climb_model, reference_performance)
+        distance = np.polyval(self.distance_to_climb_model, performance) - \
+            np.polyval(self.distance_to_climb_model, reference_performance)
+        fuel = np.polyval(self.fuel_to_climb_model, performance) - \
+            np.polyval(self.fuel_to_climb_model, reference_performance)
+
+        return time, distance, fuel
+
+    def compute_descent(self, from_altitude: float, to_altitude: float, temperature: float, validate: bool = True):
         """
         Computes the time, distance, and fuel to descend performance based on a temperature and pressure
         altitude.
@@ -92,6 +327,8 @@ class Aircraft:
         :param from_altitude: float = outside pressure altitude (ft)
         :param to_altitude: float = desired pressure altitude (ft) [must be > pressure_alt]
         :param temperature: float = outside air temperature (F)
+        :param validate: bool = if False, the altitudes and temperature are not checked (e.g., already checked by
+            classes.plan_validation.validate_plan_table())
 
         :return: time: float = time to descend to the desired pressure altitude (min)
         :return: distance: float = distance to descend to the desired pressure altitude (nautical miles)
@@ -101,19 +338,60 @@ class Aircraft:
         assert self.distance_to_descend_model is not None, "Must have a distance to descend model for this aircraft."
         assert self.fuel_to_descend_model is not None, "Must have a fuel to descend model for this aircraft."
 
-        performance = atmospheric_model(temperature=temperature, pressure_alt=to_altitude)
-        reference_performance = atmospheric_model(temperature=temperature, pressure_alt=from_altitude)
+        if not is_scalar(from_altitude, to_altitude, temperature):
+            assert not validate or np.all(atmospheric_envelope_mask(temperature, from_altitude) &
+                                          atmospheric_envelope_mask(temperature, to_altitude)), \
+                "Temperature and pressure altitudes must be inside the atmospheric envelope."
+            return self.compute_descent_batch(from_altitude, to_altitude, temperature)
+
+        if self.performance_grid is not None:
+            assert not validate or (atmospheric_envelope_mask(temperature, from_altitude) and
+                                    atmospheric_envelope_mask(temperature, to_altitude)), \
+                "Temperature and pressure altitudes must be inside the atmospheric envelope."
+            return self.performance_grid.compute_descent(from_altitude, to_altitude, temperature)
+
+        performance = atmospheric_model(temperature=temperature, pressure_alt=to_altitude, validate=validate)
+        reference_performance = atmospheric_model(temperature=temperature, pressure_alt=from_altitude,
+                                                  validate=validate)
+
+        time_model = self.polynomial("time_to_descend")
+        distance_model = self.polynomial("distance_to_descend")
+        fuel_model = self.polynomial("fuel_to_descend")
+
+        time: float = time_model(reference_performance) - time_model(performance)
+        distance: float = distance_model(reference_performance) - distance_model(performance)
+        fuel: float = fuel_model(reference_performance) - fuel_model(performance)
+
+        return time, distance, fuel
+
+    def compute_descent_batch(self, from_altitude: np.ndarray, to_altitude: np.ndarray, temperature: np.ndarray):
+        """
+        Vectorized version of compute_descent(). The inputs may be scalars or arrays of any broadcastable shape.
+        Entries that are outside of the atmospheric envelope are returned as NaN instead of raising.
+
+        :param from_altitude: np.ndarray = outside pressure altitude (ft)
+        :param to_altitude: np.ndarray = desired pressure altitude (ft)
+        :param temperature: np.ndarray = outside air temperature (F)
+
+        :return: time: np.ndarray = time to descend to the desired pressure altitude (min)
+        :return: distance: np.ndarray = distance to descend to the desired pressure altitude (nautical miles)
+        :return: fuel: np.ndarray = fuel to descend to the desired pressure altitude (gal)
+        """
+        assert self.time_to_descend_model is not None, "Must have a time to descend model for this aircraft."
+        assert self.distance_to_descend_model is not None, "Must have a distance to descend model for this aircraft."
+        assert self.fuel_to_descend_model is not None, "Must have a fuel to descend model for this aircraft."
 
-        time: float = np.polyval(self.time_to_descend_model, performance)
-        distance: float = np.polyval(self.distance_to_descend_model, performance)
-        fuel: float = np.polyval(self.fuel_to_descend_model, performance)
+        if self.performance_grid is not None:
+            return self.performance_grid.compute_descent(from_altitude, to_altitude, temperature)
 
-        reference_time: float = np.polyval(self.time_to_descend_model, reference_performance)
-        reference_distance: float = np.polyval(self.distance_to_descend_model, reference_performance)
-        reference_fuel: float = np.polyval(self.fuel_to_descend_model, reference_performance)
+        performance = atmospheric_model_batch(temperature=temperature, pressure_alt=to_altitude)
+        reference_performance = atmospheric_model_batch(temperature=temperature, pressure_alt=from_altitude)
 
-        time = reference_time - time
-        distance = reference_distance - distance
-        fuel = reference_fuel - fuel
+        time = np.polyval(self.time_to_descend_model, reference_performance) - \
+            np.polyval(self.time_to_descend_model, performance)
+        distance = np.polyval(self.distance_to_descend_model, reference_performance) - \
+            np.polyval(self.distance_to_descend_model, performance)
+        fuel = np.polyval(self.fuel_to_descend_model, reference_performance) - \
+            np.polyval(self.fuel_to_descend_model, performance)
 
         return time, distance, fuel
@@ -0,0 +1,152 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from classes.flightplan import FlightPlan
+from classes.legs import Climb, Descend
+from classes.plan_table import PlanTable, LEG_CRUISE
+from models.winds import compute_wind_triangle
+from models.winds_aloft import WindsAloft
+
+DEFAULT_CRUISE_ALTITUDES: np.ndarray = np.arange(1000, 14001, 500)
+OBJECTIVES: dict = {"time": "total_time", "fuel": "total_fuel"}
+
+
+class CruiseAltitudeResult:
+    """
+    Ranked evaluation of every candidate cruise altitude for a route.
+    """
+    def __init__(self, objective: str, table: PlanTable, altitudes: np.ndarray, feasible: np.ndarray,
+                 climb_distance: np.ndarray, descent_distance: np.ndarray) -> None:
+        """
+        :param objective: "time" or "fuel"
+        :param table: the evaluated plan table, one plan per candidate altitude
+        :param altitudes: (K,) candidate cruise altitudes (ft)
+        :param feasible: (K,) True where the climb and descent fit in the route at that altitude
+        :param climb_distance: (K,) wind-adjusted climb distance (nm)
+        :param descent_distance: (K,) wind-adjusted descent distance (nm)
+        """
+        values = getattr(table, OBJECTIVES[objective])
+        order = np.lexsort((np.where(feasible, values, np.inf), ~feasible))
+
+        self.objective: str = objective
+        self.plan_table: PlanTable = table.take(order)
+        self.ranking: dict = {
+            "altitude": altitudes[order],
+            "total_time": table.total_time[order],
+            "total_fuel": table.total_fuel[order],
+            "total_distance": table.total_distance[order],
+            "climb_distance": climb_distance[order],
+            "descent_distance": descent_distance[order],
+            "feasible": feasible[order],
+        }
+        self.best_altitude: float | None = float(self.ranking["altitude"][0]) if feasible.any() else None
+
+    def best_flight_plan(self, aircraft) -> FlightPlan | None:
+        """
+        :param aircraft: the aircraft flying the route.
+        :return: the evaluated flight plan at the best cruise altitude, None if no candidate is feasible.
+        """
+        if self.best_altitude is None:
+            return None
+        return self.plan_table.take([0]).to_flight_plans(aircraft)[0]
+
+
+def evaluate_cruise_altitudes(flight_plan: FlightPlan, winds_aloft: WindsAloft,
+                              altitudes: np.ndarray = DEFAULT_CRUISE_ALTITUDES,
+                              objective: str = "time") -> CruiseAltitudeResult:
+    """
+    Evaluates every candidate cruise altitude for a route in one batched pass. The route must be a Climb leg,
+    followed by one or more Cruise legs and a Descend leg. For each candidate altitude:
+        1. the winds and temperatures of every leg are taken from winds_aloft at the leg's mean altitude
+        2. the climb and descent times are re-derived with the aircraft's climb and descent models
+        3. the climb and descent legs are resized to the distance covered at their wind-adjusted ground speed,
+           with the top of climb/descent sliding along the adjacent cruise leg
+
+    :param flight_plan: the route; only the leg geometry, airspeeds and departure/arrival altitudes are used.
+    :param winds_aloft: the winds and temperatures aloft along the route.
+    :param altitudes: the candidate cruise altitudes (ft).
+    :param objective: "time" to minimize the total time, "fuel" to minimize the total fuel.
+    :return: the ranked candidate altitudes.
+    """
+    assert objective in OBJECTIVES, f"objective must be one of {list(OBJECTIVES)}."
+    legs = flight_plan.plan
+    assert len(legs) >= 3 and isinstance(legs[0], Climb) and isinstance(legs[-1], Descend) and \
+        not any(isinstance(leg, (Climb, Descend)) for leg in legs[1:-1]), \
+        "The route must be a Climb leg, followed by Cruise legs and a Descend leg."
+
+    aircraft = flight_plan.aircraft
+    route = PlanTable.from_flight_plans([flight_plan])
+    altitudes = np.asarray(altitudes, dtype=float)
+    n_candidates = len(altitudes)
+
+    def repeat(column: np.ndarray) -> np.ndarray:
+        return np.repeat(column, n_candidates, axis=0)
+
+    cruise = route.kind[0] == LEG_CRUISE
+    start_altitude = repeat(route.start_altitude)
+    end_altitude = repeat(route.end_altitude)
+    start_altitude[:, cruise] = altitudes[:, np.newaxis]
+    end_altitude[:, cruise] = altitudes[:, np.newaxis]
+    end_altitude[:, 0] = altitudes
+    start_altitude[:, -1] = altitudes
+
+    wind_direction, wind_speed, temperature = winds_aloft.sample((start_altitude + end_altitude) / 2)
+
+    climb_time, _, _ = aircraft.compute_climb_batch(start_altitude[:, 0], altitudes, temperature[:, 0])
+    descent_time, _, _ = aircraft.compute_descent_batch(altitudes, end_altitude[:, -1], temperature[:, -1])
+    _, climb_gs, _, _ = compute_wind_triangle(route.true_course[0, 0], route.true_airspeed[0, 0],
+                                              wind_direction[:, 0], wind_speed[:, 0])
+    _, descent_gs, _, _ = compute_wind_triangle(route.true_course[0, -1], route.true_airspeed[0, -1],
+                                                wind_direction[:, -1], wind_speed[:, -1])
+    climb_distance = climb_time / 60 * climb_gs
+    descent_distance = descent_time / 60 * descent_gs
+
+    distance = repeat(route.distance)
+    distance[:, 0] = climb_distance
+    distance[:, -1] = descent_distance
+    distance[:, 1] += route.distance[0, 0] - climb_distance
+    distance[:, -2] += route.distance[0, -1] - descent_distance
+
+    with np.errstate(invalid="ignore"):
+        feasible = np.all(distance[:, 1:-1] >= 0, axis=1) & (climb_distance > 0) & (descent_distance > 0)
+    distance[~feasible] = np.nan
+
+    table = PlanTable(kind=route.kind, distance=distance, true_course=route.true_course,
+                      true_airspeed=route.true_airspeed, start_altitude=start_altitude, end_altitude=end_altitude,
+                      wind_direction=wind_direction, wind_speed=wind_speed, temperature=temperature,
+                      mag_var=route.mag_var, from_waypoints=repeat(route.from_waypoints),
+                      to_waypoints=repeat(route.to_waypoints))
+    table.evaluate(aircraft)
+
+    return CruiseAltitudeResult(objective, table, altitudes, feasible, climb_distance, descent_distance)
+
+
+def _evaluate_cruise_altitudes(arguments: tuple) -> CruiseAltitudeResult:
+    return evaluate_cruise_altitudes(*arguments)
+
+
+def optimize_cruise_altitudes(flight_plans: list[FlightPlan], winds_aloft: WindsAloft | list[WindsAloft],
+                              altitudes: np.ndarray = DEFAULT_CRUISE_ALTITUDES, objective: str = "time",
+                              processes: int | None = None) -> list[CruiseAltitudeResult]:
+    """
+    Runs evaluate_cruise_altitudes() over many routes. Each route is evaluated in one batched pass over its
+    candidate altitudes; with processes > 1 the routes are spread across a process pool.
+
+    :param flight_plans: the routes.
+    :param winds_aloft: the winds and temperatures aloft, either shared by every route or one per route.
+    :param altitudes: the candidate cruise altitudes (ft).
+    :param objective: "time" or "fuel".
+    :param processes: number of worker processes, None or 1 to run in the current process.
+    :return: the ranked candidate altitudes of each route.
+    """
+    if isinstance(winds_aloft, WindsAloft):
+        winds_aloft = [winds_aloft] * len(flight_plans)
+    assert len(winds_aloft) == len(flight_plans), "Must have one winds aloft forecast per route."
+
+    arguments = [(flight_plan, winds, altitudes, objective) for flight_plan, winds in zip(flight_plans, winds_aloft)]
+
+    if processes is None or processes <= 1:
+        return [_evaluate_cruise_altitudes(argument) for argument in arguments]
+
+    chunksize = max(1, len(arguments) // (4 * processes))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_evaluate_cruise_altitudes, arguments, chunksize=chunksize))
@@ -0,0 +1,151 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from classes.aircraft import Aircraft
+from classes.plan_table import PlanTable, LEG_CRUISE, DEFAULT_RESERVE_MIN
+from classes.segmentation import segment_plan_table
+from common.shared_array import SharedArray
+
+# lateral route columns shared with the workers, one (R, M) plane each
+ROUTE_COLUMNS: tuple = ("distance", "true_course", "wind_direction", "wind_speed", "temperature", "mag_var")
+RESULT_COLUMNS: tuple = ("time_min", "fuel_gal", "reserve_margin_gal")
+
+# set in every worker process by _attach_worker()
+_worker: dict = {}
+
+
+class DispatchMatrix:
+    """
+    Aircraft × route dispatch matrix. Every array has shape (A, R) for A aircraft and R routes.
+    """
+    def __init__(self, callsigns: list[str], time_min: np.ndarray, fuel_gal: np.ndarray,
+                 reserve_margin_gal: np.ndarray, feasible: np.ndarray) -> None:
+        """
+        :param callsigns: call sign of every aircraft
+        :param time_min: total time of every aircraft on every route (min), NaN where the route cannot be segmented
+        :param fuel_gal: total fuel of every aircraft on every route (gal)
+        :param reserve_margin_gal: fuel left over after the route and the reserve (gal)
+        :param feasible: True where the climb and descent fit in the route and the reserve margin is not negative
+        """
+        self.callsigns: list[str] = callsigns
+        self.time_min: np.ndarray = time_min
+        self.fuel_gal: np.ndarray = fuel_gal
+        self.reserve_margin_gal: np.ndarray = reserve_margin_gal
+        self.feasible: np.ndarray = feasible
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.feasible.shape
+
+    def feasible_aircraft(self, route: int) -> list[str]:
+        """
+        :param route: index of the route
+        :return: the call signs of the aircraft that can fly the route, fastest first
+        """
+        indices = np.flatnonzero(self.feasible[:, route])
+        return [self.callsigns[i] for i in indices[np.argsort(self.time_min[indices, route], kind="stable")]]
+
+
+def evaluate_dispatch_chunk(aircraft: list[Aircraft], routes: PlanTable, altitudes: np.ndarray,
+                            reserve_min: float, results: np.ndarray, feasible: np.ndarray) -> None:
+    """
+    Evaluates every route for a chunk of aircraft: the routes are segmented at the top of climb and descent of
+    each aircraft (see classes.segmentation.segment_plan_table()) and evaluated with the PlanTable engine.
+
+    :param aircraft: the aircraft of the chunk
+    :param routes: (R, M) lateral routes
+    :param altitudes: (3, R) departure, cruise and arrival pressure altitude of every route (ft)
+    :param reserve_min: fuel reserve, in minutes at the fuel rate of each aircraft
+    :param results: (3, A, R) output, see RESULT_COLUMNS, one row per aircraft of the chunk
+    :param feasible: (A, R) output feasibility mask
+    :return: None
+    """
+    for i, plane in enumerate(aircraft):
+        table, segmented = segment_plan_table(routes, plane, *altitudes)
+        table.evaluate(plane)
+
+        profile = plane.performance_profile
+        reserve_margin = profile["fuel_capacity_g"] - table.total_fuel - reserve_min / 60 * profile["fuel_rate_gph"]
+        results[0, i] = table.total_time
+        results[1, i] = table.total_fuel
+        results[2, i] = reserve_margin
+        with np.errstate(invalid="ignore"):
+            feasible[i] = segmented & np.isfinite(table.total_time) & (reserve_margin >= 0)
+
+
+def _attach_worker(aircraft: list[Aircraft], specs: dict, reserve_min: float) -> None:
+    shared = {name: SharedArray.attach(spec) for name, spec in specs.items()}
+    _worker.update(aircraft=aircraft, shared=shared, reserve_min=reserve_min,
+                   routes=build_route_table(shared["routes"].array, shared["n_legs"].array))
+
+
+def _evaluate_worker_chunk(start: int, stop: int) -> None:
+    shared = _worker["shared"]
+    evaluate_dispatch_chunk(_worker["aircraft"][start:stop], _worker["routes"], shared["altitudes"].array,
+                            _worker["reserve_min"], shared["results"].array[:, start:stop],
+                            shared["feasible"].array[start:stop])
+
+
+def build_route_table(columns: np.ndarray, n_legs: np.ndarray) -> PlanTable:
+    """
+    :param columns: (len(ROUTE_COLUMNS), R, M) lateral route columns
+    :param n_legs: (R,) number of legs of every route
+    :return: a plan table viewing the columns (kinds, airspeeds and altitudes are placeholders)
+    """
+    return PlanTable(kind=LEG_CRUISE, true_airspeed=0.0, start_altitude=0.0, end_altitude=0.0, n_legs=n_legs,
+                     **dict(zip(ROUTE_COLUMNS, columns)))
+
+
+def evaluate_dispatch_matrix(aircraft: list[Aircraft], routes: PlanTable, departure_altitude: np.ndarray,
+                             cruise_altitude: np.ndarray, arrival_altitude: np.ndarray,
+                             reserve_min: float = DEFAULT_RESERVE_MIN, processes: int | None = None,
+                             chunk_size: int | None = None) -> DispatchMatrix:
+    """
+    Evaluates which aircraft can fly which routes, and at what time and fuel. Each route is given by its legs'
+    distances, courses, forecast winds and temperatures, and magnetic variations; it is segmented for each
+    aircraft at its own top of climb and top of descent and flown at its own airspeeds.
+
+    With processes > 1, the route, altitude and result arrays are placed once in shared memory and the aircraft
+    are split in chunks across a process pool; every worker maps the routes instead of receiving a copy and
+    writes its rows of the results in place, so only the chunk bounds are sent per task.
+
+    :param aircraft: the A aircraft, with climb/descent models, "fuel_rate_gph" and "fuel_capacity_g"
+    :param routes: (R, M) table of the lateral routes (only the columns of ROUTE_COLUMNS and n_legs are used)
+    :param departure_altitude: (R,) or scalar pressure altitude at the start of the routes (ft)
+    :param cruise_altitude: (R,) or scalar cruise pressure altitude (ft)
+    :param arrival_altitude: (R,) or scalar pressure altitude at the end of the routes (ft)
+    :param reserve_min: fuel reserve, in minutes at the fuel rate of each aircraft (e.g., 30 for VFR by day)
+    :param processes: number of worker processes, None or 1 to run in the current process
+    :param chunk_size: number of aircraft per task, defaults to about four tasks per process
+    :return: the dispatch matrix
+    """
+    n_aircraft, n_routes = len(aircraft), len(routes)
+    altitudes = np.stack([np.broadcast_to(np.asarray(altitude, dtype=float), (n_routes,))
+                          for altitude in (departure_altitude, cruise_altitude, arrival_altitude)])
+    callsigns = [plane.callsign for plane in aircraft]
+
+    if processes is None or processes <= 1 or n_aircraft <= 1:
+        results = np.full((len(RESULT_COLUMNS), n_aircraft, n_routes), np.nan)
+        feasible = np.zeros((n_aircraft, n_routes), dtype=bool)
+        evaluate_dispatch_chunk(aircraft, routes, altitudes, reserve_min, results, feasible)
+        return DispatchMatrix(callsigns, *results, feasible)
+
+    chunk_size = chunk_size or max(1, -(-n_aircraft // (4 * processes)))
+    shared = {}
+    try:
+        shared["routes"] = SharedArray.from_array(np.stack([getattr(routes, name) for name in ROUTE_COLUMNS]))
+        shared["n_legs"] = SharedArray.from_array(routes.n_legs)
+        shared["altitudes"] = SharedArray.from_array(altitudes)
+        shared["results"] = SharedArray.create((len(RESULT_COLUMNS), n_aircraft, n_routes), fill_value=np.nan)
+        shared["feasible"] = SharedArray.create((n_aircraft, n_routes), dtype=bool, fill_value=False)
+        specs = {name: array.spec for name, array in shared.items()}
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_attach_worker,
+                                 initargs=(aircraft, specs, reserve_min)) as executor:
+            starts = range(0, n_aircraft, chunk_size)
+            list(executor.map(_evaluate_worker_chunk, starts, [min(start + chunk_size, n_aircraft)
+                                                               for start in starts]))
+
+        return DispatchMatrix(callsigns, *shared["results"].array.copy(), shared["feasible"].array.copy())
+    finally:
+        for array in shared.values():
+            array.unlink()
@@ -1,19 +1,31 @@
 from classes.legs import Leg, Climb, Cruise, Descend
 from classes.waypoints import Waypoint
 from classes.aircraft import Aircraft
+from classes.leg_cache import LegCache
 
 
 class FlightPlan:
-    def __init__(self, plan: list[Leg], aircraft: Aircraft) -> None:
+    def __init__(self, plan: list[Leg], aircraft: Aircraft, leg_cache: LegCache | None = None,
+                 validate: bool = True) -> None:
+        """
+        :param plan: the legs of the plan
+        :param aircraft: the aircraft flying the plan
+        :param leg_cache: optional classes.leg_cache.LegCache, legs are then evaluated through the cache
+        :param validate: if False, the plan and the climb/descent inputs are not checked (e.g., the plan was already
+            checked by classes.plan_validation.validate_plan_table())
+        """
         self.plan: list[Leg] = plan
         self.aircraft: Aircraft = aircraft
+        self.leg_cache: LegCache | None = leg_cache
+        self.validate: bool = validate
 
         self.total_time = 0
         self.total_distance = 0
         self.total_fuel = 0
 
-        is_valid, error_msg = self.check_plan()
-        assert is_valid, error_msg
+        if self.validate:
+            is_valid, error_msg = self.check_plan()
+            assert is_valid, error_msg
 
     def check_plan(self) -> tuple[bool, str | None]:
         """
@@ -46,30 +58,17 @@ class FlightPlan:
 
         :return: None
         """
+        self.total_time = 0
+        self.total_distance = 0
+        self.total_fuel = 0
+
         for leg in self.plan:
-            leg.evaluate(mag_dev=self.aircraft.compute_mag_dev(leg.true_course),
-                         fuel_rate=self.aircraft.performance_profile['fuel_rate_gph'])
+            self.evaluate_leg(leg)
 
             self.total_time += leg.time_min
             self.total_distance += leg.distance_nm
             self.total_fuel += leg.fuel_gal
 
-            if isinstance(leg, Climb):
-                time, distance, fuel = self.aircraft.compute_climb(from_altitude=leg.start_altitude,
-                                                                   to_altitude=leg.end_altitude,
-                                                                   temperature=leg.temperature)
-                leg.climb_time_min = time
-                leg.climb_distance_nm = distance
-                leg.climb_fuel_gal = fuel
-
-            elif isinstance(leg, Descend):
-                time, distance, fuel = self.aircraft.compute_descent(from_altitude=leg.start_altitude,
-                                                                     to_altitude=leg.end_altitude,
-                                                                     temperature=leg.temperature)
-                leg.descend_time_min = time
-                leg.descend_distance_nm = distance
-                leg.descend_fuel_gal = fuel
-
         remaining_time_min = 0
         remaining_distance_nm = 0
         remaining_fuel_gal = 0
@@ -84,6 +83,38 @@ class FlightPlan:
             remaining_distance_nm += self.plan[i].distance_nm
             remaining_fuel_gal += self.plan[i].fuel_gal
 
+    def evaluate_leg(self, leg: Leg) -> None:
+        """
+        Evaluates a single leg of the plan, including its climb or descent performance.
+
+        :param leg: the leg to evaluate.
+        :return: None
+        """
+        if self.leg_cache is not None:
+            self.leg_cache.evaluate_leg(leg, self.aircraft, self.validate)
+            return
+
+        leg.evaluate(mag_dev=self.aircraft.compute_mag_dev(leg.true_course),
+                     fuel_rate=self.aircraft.performance_profile['fuel_rate_gph'])
+
+        if isinstance(leg, Climb):
+            time, distance, fuel = self.aircraft.compute_climb(from_altitude=leg.start_altitude,
+                                                               to_altitude=leg.end_altitude,
+                                                               temperature=leg.temperature,
+                                                               validate=self.validate)
+            leg.climb_time_min = time
+            leg.climb_distance_nm = distance
+            leg.climb_fuel_gal = fuel
+
+        elif isinstance(leg, Descend):
+            time, distance, fuel = self.aircraft.compute_descent(from_altitude=leg.start_altitude,
+                                                                 to_altitude=leg.end_altitude,
+                                                                 temperature=leg.temperature,
+                                                                 validate=self.validate)
+            leg.descend_time_min = time
+            leg.descend_distance_nm = distance
+            leg.descend_fuel_gal = fuel
+
     def summarize(self) -> None:
         """
         Prints a summary of the flight plan.
@@ -0,0 +1,54 @@
+import numpy as np
+from classes.flightplan import FlightPlan
+from models.wind_field import WindField
+
+
+def apply_wind_field(flight_plans: list[FlightPlan], wind_field: WindField, departure_time: float | np.ndarray,
+                     method: str = "midpoint", n_points: int = 8) -> None:
+    """
+    Sets the wind direction, wind speed and temperature of every leg of the flight plans from a gridded forecast,
+    sampled in one vectorized pass over all legs. The waypoints of every leg must have positions.
+
+    Each leg is sampled at the departure time of its plan, plus the time flown to the middle of the leg if the plan
+    was already evaluated (e.g., re-applying a new forecast cycle to evaluated plans). The plans must be
+    re-evaluated afterwards.
+
+    :param flight_plans: the flight plans
+    :param wind_field: the forecast
+    :param departure_time: departure time of every plan in hours, in the time reference of the forecast
+    :param method: "midpoint" or "integrate", see WindField.sample_legs()
+    :param n_points: number of points of the "integrate" method
+    :return: None
+    """
+    legs = [leg for flight_plan in flight_plans for leg in flight_plan.plan]
+    assert all(leg.from_waypoint.has_position and leg.to_waypoint.has_position for leg in legs), \
+        "The waypoints of every leg must have positions to sample a wind field."
+
+    departure_time = np.broadcast_to(np.asarray(departure_time, dtype=float), (len(flight_plans),))
+    time = np.repeat(departure_time, [len(flight_plan.plan) for flight_plan in flight_plans])
+
+    elapsed = []
+    for flight_plan in flight_plans:
+        leg_times = [leg.time_min for leg in flight_plan.plan]
+        if any(leg_time is None for leg_time in leg_times):
+            elapsed.append(np.zeros(len(leg_times)))
+        else:
+            elapsed.append(np.cumsum(leg_times) - np.asarray(leg_times) / 2)
+    if legs:
+        time = time + np.concatenate(elapsed) / 60
+
+    wind_direction, wind_speed, temperature = wind_field.sample_legs(
+        from_latitude=[leg.from_waypoint.latitude for leg in legs],
+        from_longitude=[leg.from_waypoint.longitude for leg in legs],
+        to_latitude=[leg.to_waypoint.latitude for leg in legs],
+        to_longitude=[leg.to_waypoint.longitude for leg in legs],
+        start_altitude=[leg.start_altitude for leg in legs],
+        end_altitude=[leg.end_altitude for leg in legs],
+        time=time, method=method, n_points=n_points)
+    assert not np.isnan(wind_speed).any(), "Some legs are outside of the wind field."
+
+    for leg, direction, speed, temperature_f in zip(legs, wind_direction.tolist(), wind_speed.tolist(),
+                                                    temperature.tolist()):
+        leg.wind_direction = direction
+        leg.wind_speed = speed
+        leg.temperature = temperature_f
@@ -0,0 +1,85 @@
+from classes.aircraft import Aircraft
+from classes.flightplan import FlightPlan
+from classes.leg_cache import LegCache
+from classes.legs import Leg
+from common.segment_tree import SumSegmentTree
+
+# leg attributes that may be changed with IncrementalFlightPlan.update_leg()
+UPDATABLE_ATTRIBUTES: tuple = ("distance", "true_course", "true_airspeed", "start_altitude", "end_altitude",
+                               "wind_direction", "wind_speed", "temperature", "mag_var")
+
+
+class IncrementalFlightPlan(FlightPlan):
+    """
+    Flight plan for live replanning. Legs changed with update_leg() are marked dirty and evaluate() only
+    recomputes those legs. The leg times, distances and fuel are kept in segment trees, so the totals are updated
+    in O(log n) per changed leg and the remaining values of any leg are queried in O(log n) with remaining().
+
+    The remaining_* attributes of the legs are only refreshed by materialize_remaining() (O(n)), which
+    summarize() calls.
+    """
+    def __init__(self, plan: list[Leg], aircraft: Aircraft, leg_cache: LegCache | None = None,
+                 validate: bool = True) -> None:
+        super().__init__(plan, aircraft, leg_cache=leg_cache, validate=validate)
+
+        self.dirty: set[int] = set(range(len(plan)))
+        self._time_tree: SumSegmentTree = SumSegmentTree([0.0] * len(plan))
+        self._distance_tree: SumSegmentTree = SumSegmentTree([0.0] * len(plan))
+        self._fuel_tree: SumSegmentTree = SumSegmentTree([0.0] * len(plan))
+
+    def update_leg(self, index: int, **changes: float) -> None:
+        """
+        Changes the inputs of a leg (e.g., a new wind report) and marks it dirty.
+
+        :param index: index of the leg in the plan.
+        :param changes: new values of any of UPDATABLE_ATTRIBUTES.
+        :return: None
+        """
+        assert 0 <= index < len(self.plan), "Leg index out of range."
+        for name, value in changes.items():
+            assert name in UPDATABLE_ATTRIBUTES, f"{name} is not an updatable leg attribute."
+            setattr(self.plan[index], name, value)
+        self.dirty.add(index)
+
+    def evaluate(self) -> None:
+        """
+        Recomputes the dirty legs only and updates the totals.
+
+        :return: None
+        """
+        for index in sorted(self.dirty):
+            leg = self.plan[index]
+            self.evaluate_leg(leg)
+
+            self._time_tree[index] = leg.time_min
+            self._distance_tree[index] = leg.distance_nm
+            self._fuel_tree[index] = leg.fuel_gal
+
+        self.dirty.clear()
+
+        self.total_time = self._time_tree.total
+        self.total_distance = self._distance_tree.total
+        self.total_fuel = self._fuel_tree.total
+
+    def remaining(self, index: int) -> tuple[float, float, float]:
+        """
+        :param index: index of the leg in the plan.
+        :return: the remaining time (min), distance (nm) and fuel (gal) after the leg.
+        """
+        assert not self.dirty, "The plan has dirty legs. Call IncrementalFlightPlan.evaluate() first."
+        return (self._time_tree.suffix_sum(index + 1),
+                self._distance_tree.suffix_sum(index + 1),
+                self._fuel_tree.suffix_sum(index + 1))
+
+    def materialize_remaining(self) -> None:
+        """
+        Writes the remaining time, distance and fuel onto every leg.
+
+        :return: None
+        """
+        for index, leg in enumerate(self.plan):
+            leg.remaining_time_min, leg.remaining_distance_nm, leg.remaining_fuel_gal = self.remaining(index)
+
+    def summarize(self) -> None:
+        self.materialize_remaining()
+        super().summarize()
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import math
+import sqlite3
+import struct
+import weakref
+from collections import OrderedDict
+import numpy as np
+from classes.aircraft import Aircraft
+from classes.legs import Leg, Climb, Descend
+from models.winds import compute_wind_triangle
+
+CACHE_VERSION: int = 1
+
+# default quantization step of every key input, 0 keys on the exact value
+DEFAULT_QUANTA: dict = {"true_course": 0.01, "true_airspeed": 0.01, "wind_direction": 0.1, "wind_speed": 0.01,
+                        "altitude": 1.0, "temperature": 0.01}
+
+# cached values: magnetic deviation, wind triangle and climb/descent time, distance and fuel (NaN for cruise legs)
+VALUE_FORMAT: struct.Struct = struct.Struct("<8d")
+# new entries are written to the on-disk tier at least every FLUSH_INTERVAL entries
+FLUSH_INTERVAL: int = 4096
+MODEL_ATTRIBUTES: tuple = ("time_to_climb_model", "distance_to_climb_model", "fuel_to_climb_model",
+                           "time_to_descend_model", "distance_to_descend_model", "fuel_to_descend_model")
+KIND_CODES: dict = {Climb: 1, Descend: 2}
+
+
+def quantize(value: float, step: float) -> int | float:
+    """
+    :param value: the value
+    :param step: quantization step, 0 for none
+    :return: the index of the closest multiple of step, or the value itself
+    """
+    return round(value / step) if step > 0 else float(value)
+
+
+def aircraft_digest(aircraft: Aircraft) -> bytes:
+    """
+    :param aircraft: the aircraft
+    :return: digest of everything the evaluation of a leg depends on: climb/descent models, performance grid,
+             magnetic deviation table and fuel rate
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for name in MODEL_ATTRIBUTES:
+        model = getattr(aircraft, name)
+        digest.update(b"-" if model is None else np.asarray(model, dtype=float).tobytes())
+    grid = aircraft.performance_grid
+    digest.update(json.dumps([None if grid is None else [grid.temperature_step, grid.pressure_alt_step],
+                              aircraft.mag_dev_resolution, aircraft.mag_dev_interpolation,
+                              aircraft.performance_profile["fuel_rate_gph"]]).encode())
+    if aircraft.mag_dev_table is not None:
+        digest.update(aircraft.mag_dev_table.tobytes())
+    return digest.digest()
+
+
+class LegCache:
+    """
+    Memoizes the evaluation of legs, keyed on a hash of the inputs it depends on and of the aircraft. Legs with the
+    same course, airspeed and wind share their magnetic deviation and wind triangle; climb and descent legs must
+    also have the same altitudes and temperature to share their climb/descent performance. The distance and the
+    magnetic variation are not part of the key, the time, fuel and headings are recomputed from them on every hit.
+
+    Inputs are quantized (see DEFAULT_QUANTA) so that near-identical legs hit; a hit reuses the solution of the
+    first leg evaluated within the same quanta. Entries are kept in an LRU of max_entries and, if path is given,
+    in a SQLite file shared across runs (written every FLUSH_INTERVAL new entries, by flush() and by close()).
+
+    Use with FlightPlan(..., leg_cache=cache) or call evaluate_leg() directly.
+    """
+    def __init__(self, max_entries: int = 65536, quanta: dict | None = None, path: str | None = None) -> None:
+        """
+        :param max_entries: maximum number of entries of the in-process tier
+        :param quanta: quantization step of any of the inputs of DEFAULT_QUANTA, overriding the defaults
+        :param path: path of the on-disk tier (SQLite), None for in-process only
+        """
+        assert max_entries > 0, "max_entries must be positive."
+        self.max_entries: int = max_entries
+        self.quanta: dict = {**DEFAULT_QUANTA, **(quanta or {})}
+        assert set(self.quanta) == set(DEFAULT_QUANTA), f"quanta must be a subset of {tuple(DEFAULT_QUANTA)}."
+        assert all(step >= 0 for step in self.quanta.values()), "Quantization steps must not be negative."
+
+        self.entries: OrderedDict[bytes, tuple] = OrderedDict()
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        self._aircraft_digests: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._pending: dict[bytes, tuple] = {}
+        self.path: str | None = path
+        self._connection: sqlite3.Connection | None = None
+        if path is not None:
+            self._connection = sqlite3.connect(path)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS legs (key BLOB PRIMARY KEY, value BLOB NOT NULL)")
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __enter__(self) -> "LegCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def stats(self) -> dict:
+        """
+        :return: hits (including the hits of the on-disk tier), disk hits, misses, hit rate, evictions from the
+                 in-process tier and its size
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0, "evictions": self.evictions,
+                "entries": len(self.entries)}
+
+    def key(self, leg: Leg, aircraft: Aircraft) -> bytes:
+        """
+        :param leg: the leg
+        :param aircraft: the aircraft flying the leg
+        :return: canonical hash of the quantized inputs the evaluation of the leg depends on
+        """
+        # the models are read-only (see classes.aircraft.PerformanceModel), so they change only when reassigned
+        models = tuple(getattr(aircraft, name) for name in MODEL_ATTRIBUTES) + \
+            (aircraft.performance_grid, aircraft.mag_dev_table, aircraft.performance_profile["fuel_rate_gph"])
+        cached = self._aircraft_digests.get(aircraft)
+        if cached is None or any(a is not b for a, b in zip(cached[0], models)):
+            cached = models, aircraft_digest(aircraft)
+            self._aircraft_digests[aircraft] = cached
+
+        quanta = self.quanta
+        kind = next((code for leg_class, code in KIND_CODES.items() if isinstance(leg, leg_class)), 0)
+        inputs = [CACHE_VERSION, kind, quantize(leg.true_course % 360, quanta["true_course"]),
+                  quantize(leg.true_airspeed, quanta["true_airspeed"]),
+                  quantize(leg.wind_direction % 360, quanta["wind_direction"]),
+                  quantize(leg.wind_speed, quanta["wind_speed"])]
+        if kind:
+            inputs += [quantize(leg.start_altitude, quanta["altitude"]), quantize(leg.end_altitude, quanta["altitude"]),
+                       quantize(leg.temperature, quanta["temperature"])]
+        return hashlib.blake2b(cached[1] + repr(inputs).encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> tuple | None:
+        """
+        :param key: key of a leg, see key()
+        :return: the cached values, or None (counted as a miss)
+        """
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        value = self._pending.get(key)
+        if value is None and self._connection is not None:
+            row = self._connection.execute("SELECT value FROM legs WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = VALUE_FORMAT.unpack(row[0])
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.disk_hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key: bytes, value: tuple) -> None:
+        """
+        :param key: key of a leg, see key()
+        :param value: the values to cache, see VALUE_FORMAT
+        :return: None
+        """
+        self._remember(key, value)
+        if self._connection is not None:
+            self._pending[key] = value
+            if len(self._pending) >= FLUSH_INTERVAL:
+                self.flush()
+
+    def evaluate_leg(self, leg: Leg, aircraft: Aircraft, validate: bool = True) -> None:
+        """
+        Evaluates a leg like FlightPlan.evaluate_leg(), reusing the cached solution of an equivalent leg.
+
+        :param leg: the leg
+        :param aircraft: the aircraft flying the leg
+        :param validate: if False, the climb/descent inputs of a missed leg are not checked
+        :return: None
+        """
+        key = self.key(leg, aircraft)
+        value = self.get(key)
+        if value is None:
+            value = self.solve(leg, aircraft, validate)
+            self.put(key, value)
+
+        mag_dev, wca, gs, headwind, crosswind, time, distance, fuel = value
+        leg.apply_wind_triangle(mag_dev, aircraft.performance_profile["fuel_rate_gph"], wca, gs, headwind, crosswind)
+        if isinstance(leg, Climb):
+            leg.climb_time_min, leg.climb_distance_nm, leg.climb_fuel_gal = time, distance, fuel
+        elif isinstance(leg, Descend):
+            leg.descend_time_min, leg.descend_distance_nm, leg.descend_fuel_gal = time, distance, fuel
+
+    @staticmethod
+    def solve(leg: Leg, aircraft: Aircraft, validate: bool = True) -> tuple:
+        """
+        :param leg: the leg
+        :param aircraft: the aircraft flying the leg
+        :param validate: if False, the climb/descent inputs are not checked
+        :return: the values to cache for the leg, see VALUE_FORMAT
+        """
+        wca, gs, headwind, crosswind = compute_wind_triangle(leg.true_course, leg.true_airspeed, leg.wind_direction,
+                                                             leg.wind_speed)
+        maneuver = (math.nan, math.nan, math.nan)
+        if isinstance(leg, Climb):
+            maneuver = aircraft.compute_climb(leg.start_altitude, leg.end_altitude, leg.temperature,
+                                             validate=validate)
+        elif isinstance(leg, Descend):
+            maneuver = aircraft.compute_descent(leg.start_altitude, leg.end_altitude, leg.temperature,
+                                               validate=validate)
+        return tuple(float(value) for value in (aircraft.compute_mag_dev(leg.true_course), wca, gs, headwind,
+                                                crosswind, *maneuver))
+
+    def flush(self) -> None:
+        """
+        Writes the new entries to the on-disk tier.
+
+        :return: None
+        """
+        if self._connection is None or not self._pending:
+            return
+        self._connection.executemany("INSERT OR REPLACE INTO legs (key, value) VALUES (?, ?)",
+                                     [(key, VALUE_FORMAT.pack(*value)) for key, value in self._pending.items()])
+        self._connection.commit()
+        self._pending.clear()
+
+    def close(self) -> None:
+        """
+        Flushes and closes the on-disk tier.
+
+        :return: None
+        """
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
+
+    def clear(self) -> None:
+        """
+        Empties the in-process tier and resets the statistics, the on-disk tier is kept.
+
+        :return: None
+        """
+        self.entries.clear()
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def _remember(self, key: bytes, value: tuple) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
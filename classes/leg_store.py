@@ -0,0 +1,171 @@
+import sys
+import numpy as np
+from classes.legs import Leg, Climb, Cruise, Descend
+from classes.plan_table import INPUT_COLUMNS, OUTPUT_COLUMNS, LEG_CRUISE, LEG_CLIMB, LEG_DESCEND
+from classes.waypoints import Waypoint
+
+LEG_KINDS: dict = {Climb: LEG_CLIMB, Descend: LEG_DESCEND}
+LEG_STORE_DTYPE: np.dtype = np.dtype([("plan", np.int32), ("kind", np.int8),
+                                      ("from_waypoint", np.int32), ("to_waypoint", np.int32)] +
+                                     [(name, np.float64) for name in INPUT_COLUMNS + OUTPUT_COLUMNS])
+
+
+class LegStore:
+    """
+    Legs stored as rows of a single structured NumPy array, with waypoint names kept once in a shared table.
+    Rows are accessed through ArrayLeg views, which expose the same attributes as Leg objects.
+    """
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        :param capacity: initial number of rows, the store grows as needed.
+        """
+        self.rows: np.ndarray = np.zeros(capacity, dtype=LEG_STORE_DTYPE)
+        self.size: int = 0
+        self.waypoint_names: list[str] = []
+        self._waypoint_codes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> "ArrayLeg":
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("leg index out of range")
+        return ArrayLeg(self, index)
+
+    def __iter__(self):
+        return (ArrayLeg(self, index) for index in range(self.size))
+
+    def waypoint_code(self, name: str) -> int:
+        """
+        :param name: waypoint name
+        :return: the index of the name in the shared waypoint table, added if missing
+        """
+        code = self._waypoint_codes.get(name)
+        if code is None:
+            code = len(self.waypoint_names)
+            self.waypoint_names.append(sys.intern(name))
+            self._waypoint_codes[name] = code
+        return code
+
+    def append(self, leg: Leg, plan: int = 0) -> "ArrayLeg":
+        """
+        Copies a Leg (inputs and any evaluated outputs) into a new row.
+
+        :param leg: the leg to store
+        :param plan: index of the plan the leg belongs to
+        :return: the view of the new row
+        """
+        if self.size == len(self.rows):
+            self.rows = np.resize(self.rows, max(1, 2 * len(self.rows)))
+
+        row = self.rows[self.size]
+        row["plan"] = plan
+        row["kind"] = next((kind for leg_class, kind in LEG_KINDS.items() if isinstance(leg, leg_class)), LEG_CRUISE)
+        row["from_waypoint"] = self.waypoint_code(leg.from_waypoint.name)
+        row["to_waypoint"] = self.waypoint_code(leg.to_waypoint.name)
+        for name in INPUT_COLUMNS + OUTPUT_COLUMNS:
+            value = getattr(leg, name, None)
+            row[name] = np.nan if value is None else value
+
+        self.size += 1
+        return ArrayLeg(self, self.size - 1)
+
+    @classmethod
+    def from_flight_plans(cls, flight_plans: list) -> "LegStore":
+        """
+        :param flight_plans: the flight plans to store
+        :return: a store with the legs of every plan, the plan column holds the index of each plan
+        """
+        legs = [(i, leg) for i, flight_plan in enumerate(flight_plans) for leg in flight_plan.plan]
+        store = cls(capacity=len(legs))
+        rows = store.rows
+
+        rows["plan"] = [i for i, _ in legs]
+        rows["kind"] = [next((kind for leg_class, kind in LEG_KINDS.items() if isinstance(leg, leg_class)),
+                             LEG_CRUISE) for _, leg in legs]
+        rows["from_waypoint"] = [store.waypoint_code(leg.from_waypoint.name) for _, leg in legs]
+        rows["to_waypoint"] = [store.waypoint_code(leg.to_waypoint.name) for _, leg in legs]
+        for name in INPUT_COLUMNS + OUTPUT_COLUMNS:
+            rows[name] = [np.nan if (value := getattr(leg, name, None)) is None else value for _, leg in legs]
+
+        store.size = len(legs)
+        return store
+
+    def trim(self) -> None:
+        """
+        Releases the unused capacity of the store.
+
+        :return: None
+        """
+        self.rows = self.rows[:self.size].copy()
+
+
+def _column_property(name: str) -> property:
+    def getter(self):
+        value = float(self.store.rows[name][self.index])
+        return None if np.isnan(value) else value
+
+    def setter(self, value):
+        self.store.rows[name][self.index] = np.nan if value is None else value
+
+    return property(getter, setter)
+
+
+def _waypoint_property(name: str) -> property:
+    def getter(self):
+        return Waypoint(self.store.waypoint_names[self.store.rows[name][self.index]])
+
+    def setter(self, waypoint):
+        self.store.rows[name][self.index] = self.store.waypoint_code(waypoint.name)
+
+    return property(getter, setter)
+
+
+class ArrayLeg:
+    """
+    View of one row of a LegStore with the attributes of a Leg (e.g., leg.TH, leg.remaining_fuel_gal). Unset
+    values read as None. Only the store and the row index are kept per view.
+    """
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: LegStore, index: int) -> None:
+        self.store: LegStore = store
+        self.index: int = index
+
+    @property
+    def kind(self) -> int:
+        return int(self.store.rows["kind"][self.index])
+
+    @property
+    def plan(self) -> int:
+        return int(self.store.rows["plan"][self.index])
+
+    def to_leg(self) -> Leg:
+        """
+        :return: an equivalent Leg object (Climb, Descend or Cruise, or Leg for uneven non-climb/descent legs).
+        """
+        inputs = {name: getattr(self, name) for name in INPUT_COLUMNS}
+        if self.kind == LEG_CLIMB:
+            leg_class = Climb
+        elif self.kind == LEG_DESCEND:
+            leg_class = Descend
+        elif inputs["start_altitude"] == inputs["end_altitude"]:
+            leg_class = Cruise
+            inputs["altitude"] = inputs.pop("start_altitude")
+            inputs.pop("end_altitude")
+        else:
+            leg_class = Leg
+
+        leg = leg_class(from_waypoint=self.from_waypoint, to_waypoint=self.to_waypoint, **inputs)
+        for name in OUTPUT_COLUMNS:
+            if hasattr(leg, name):
+                setattr(leg, name, getattr(self, name))
+        return leg
+
+
+for _name in INPUT_COLUMNS + OUTPUT_COLUMNS:
+    setattr(ArrayLeg, _name, _column_property(_name))
+for _name in ("from_waypoint", "to_waypoint"):
+    setattr(ArrayLeg, _name, _waypoint_property(_name))
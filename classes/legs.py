@@ -1,37 +1,90 @@
+import numpy as np
 from classes.aircraft import Aircraft
 from classes.waypoints import Waypoint
-from models.winds import compute_wca, compute_gs
+from models.geodesy import route_geometry, intermediate_point
+from models.magnetic_variation import MagneticVariationGrid
+from models.winds import compute_wind_triangle
+
+
+def compute_leg_geometry(from_waypoint: Waypoint, to_waypoint: Waypoint,
+                         method: str = "great_circle") -> tuple[float, float]:
+    """
+    :param from_waypoint: waypoint at the start of the leg
+    :param to_waypoint: waypoint at the end of the leg
+    :param method: "great_circle" (initial true course) or "rhumb_line" (constant true course)
+    :return: true_course: true course in degrees
+    :return: distance: distance in nautical miles
+    """
+    assert from_waypoint.has_position and to_waypoint.has_position, \
+        "The waypoints must have positions to derive the distance and true course."
+    true_course, distance = route_geometry([from_waypoint.latitude, to_waypoint.latitude],
+                                           [from_waypoint.longitude, to_waypoint.longitude], method=method)
+    return float(true_course[0]), float(distance[0])
+
+
+def compute_leg_mag_var(from_waypoint: Waypoint, to_waypoint: Waypoint, mag_var_grid: MagneticVariationGrid) -> float:
+    """
+    :param from_waypoint: waypoint at the start of the leg
+    :param to_waypoint: waypoint at the end of the leg
+    :param mag_var_grid: magnetic variation table
+    :return: the magnetic variation at the middle of the leg in degrees
+    """
+    assert from_waypoint.has_position and to_waypoint.has_position, \
+        "The waypoints must have positions to derive the magnetic variation."
+    latitude, longitude = intermediate_point(from_waypoint.latitude, from_waypoint.longitude,
+                                             to_waypoint.latitude, to_waypoint.longitude)
+    mag_var = float(mag_var_grid.sample(latitude, longitude))
+    assert not np.isnan(mag_var), "The leg is outside of the magnetic variation grid."
+    return mag_var
 
 
 class Leg:
     """
     Generic class for the leg of a flight plan.
     """
+    # slotted to keep large fleets of plans compact (no per-instance __dict__)
+    __slots__ = ("from_waypoint", "to_waypoint", "distance", "true_course", "true_airspeed", "start_altitude",
+                 "end_altitude", "wind_direction", "wind_speed", "temperature", "mag_var", "mag_dev",
+                 "wca", "TC", "TH", "MH", "CH", "GS", "headwind", "crosswind",
+                 "time_min", "remaining_time_min", "distance_nm", "remaining_distance_nm", "fuel_gal",
+                 "remaining_fuel_gal")
+
     def __init__(self,
                  from_waypoint: Waypoint,
                  to_waypoint: Waypoint,
-                 distance: float,
-                 true_course: float,
+                 distance: float | None,
+                 true_course: float | None,
                  true_airspeed: float,
                  start_altitude: float,
                  end_altitude: float,
                  wind_direction: float,
                  wind_speed: float,
                  temperature: float,
-                 mag_var: float) -> None:
+                 mag_var: float | None = None,
+                 mag_var_grid: MagneticVariationGrid | None = None,
+                 course_method: str = "great_circle") -> None:
         """
         :param from_waypoint: waypoint at the start of the leg
         :param to_waypoint: waypoint at the start of the leg
-        :param distance: distance between waypoints in nautical miles
-        :param true_course: true course in degrees
+        :param distance: distance between waypoints in nautical miles, derived from the waypoint positions if None
+        :param true_course: true course in degrees, derived from the waypoint positions if None
         :param true_airspeed: true airspeed in kts
         :param start_altitude: starting pressure altitude
         :param end_altitude: ending pressure altitude
         :param wind_direction: wind direction in degrees
         :param wind_speed: wind speed in kts
         :param temperature: outside temperature at waypoint (Celsius)
-        :param mag_var: magentic variation in degrees
+        :param mag_var: magentic variation in degrees, interpolated from mag_var_grid at the middle of the leg if None
+        :param mag_var_grid: magnetic variation table, required if mag_var is None
+        :param course_method: "great_circle" or "rhumb_line", the path used to derive the distance and true course
         """
+        if distance is None or true_course is None:
+            derived_course, derived_distance = compute_leg_geometry(from_waypoint, to_waypoint, course_method)
+            distance = derived_distance if distance is None else distance
+            true_course = derived_course if true_course is None else true_course
+        if mag_var is None:
+            assert mag_var_grid is not None, "Must have a magnetic variation grid to derive the magnetic variation."
+            mag_var = compute_leg_mag_var(from_waypoint, to_waypoint, mag_var_grid)
 
         self.from_waypoint: Waypoint = from_waypoint
         self.to_waypoint: Waypoint = to_waypoint
@@ -53,6 +106,8 @@ class Leg:
         self.CH: float | None = None
 
         self.GS: float | None = None
+        self.headwind: float | None = None
+        self.crosswind: float | None = None
 
         self.time_min: float | None = None
         self.remaining_time_min: float | None = None
@@ -68,32 +123,52 @@ class Leg:
         :param fuel_rate: aircraft fuel rate in GPH.
         :return:
         """
+        wca, gs, headwind, crosswind = compute_wind_triangle(self.true_course, self.true_airspeed,
+                                                             self.wind_direction, self.wind_speed)
+        self.apply_wind_triangle(mag_dev, fuel_rate, wca, gs, headwind, crosswind)
+
+    def apply_wind_triangle(self, mag_dev: float, fuel_rate: float, wca: float, gs: float, headwind: float,
+                            crosswind: float) -> None:
+        """
+        Sets the outputs of evaluate() from an already solved wind triangle (e.g., a cached solution).
+
+        :param mag_dev: magnetic deviation of aircraft in degrees.
+        :param fuel_rate: aircraft fuel rate in GPH.
+        :param wca: wind correction angle in degrees
+        :param gs: ground speed in kts
+        :param headwind: headwind component in kts
+        :param crosswind: crosswind component in kts
+        :return: None
+        """
         self.mag_dev = mag_dev
 
         self.TC = self.true_course
-        self.wca = compute_wca(self.true_course, self.true_airspeed, self.wind_direction, self.wind_speed)
+        self.wca, self.GS, self.headwind, self.crosswind = wca, gs, headwind, crosswind
         self.TH = self.TC + self.wca
         self.MH = self.TH + self.mag_var
         self.CH = self.MH + self.mag_dev
 
-        self.GS = compute_gs(self.true_course, self.true_airspeed, self.wind_direction, self.wind_speed)
         self.distance_nm = self.distance
         self.time_min = self.distance_nm / self.GS * 60
         self.fuel_gal = fuel_rate / 60 * self.time_min
 
 class Climb(Leg):
+    __slots__ = ("climb_time_min", "climb_distance_nm", "climb_fuel_gal")
+
     def __init__(self,
                  from_waypoint: Waypoint,
                  to_waypoint: Waypoint,
-                 distance: float,
-                 true_course: float,
+                 distance: float | None,
+                 true_course: float | None,
                  true_airspeed: float,
                  start_altitude: float,
                  end_altitude: float,
                  wind_direction: float,
                  wind_speed: float,
                  temperature: float,
-                 mag_var: float) -> None:
+                 mag_var: float | None = None,
+                 mag_var_grid: MagneticVariationGrid | None = None,
+                 course_method: str = "great_circle") -> None:
 
         super().__init__(from_waypoint=from_waypoint,
                  to_waypoint=to_waypoint,
@@ -105,7 +180,9 @@ class Climb(Leg):
                  wind_direction=wind_direction,
                  wind_speed=wind_speed,
                  temperature=temperature,
-                 mag_var=mag_var)
+                 mag_var=mag_var,
+                 mag_var_grid=mag_var_grid,
+                 course_method=course_method)
 
         self.climb_time_min: float | None = None
         self.climb_distance_nm: float | None = None
@@ -113,18 +190,22 @@ class Climb(Leg):
 
 
 class Descend(Leg):
+    __slots__ = ("descend_time_min", "descend_distance_nm", "descend_fuel_gal")
+
     def __init__(self,
                  from_waypoint: Waypoint,
                  to_waypoint: Waypoint,
-                 distance: float,
-                 true_course: float,
+                 distance: float | None,
+                 true_course: float | None,
                  true_airspeed: float,
                  start_altitude: float,
                  end_altitude: float,
                  wind_direction: float,
                  wind_speed: float,
                  temperature: float,
-                 mag_var: float) -> None:
+                 mag_var: float | None = None,
+                 mag_var_grid: MagneticVariationGrid | None = None,
+                 course_method: str = "great_circle") -> None:
 
         super().__init__(from_waypoint=from_waypoint,
                  to_waypoint=to_waypoint,
@@ -136,7 +217,9 @@ class Descend(Leg):
                  wind_direction=wind_direction,
                  wind_speed=wind_speed,
                  temperature=temperature,
-                 mag_var=mag_var)
+                 mag_var=mag_var,
+                 mag_var_grid=mag_var_grid,
+                 course_method=course_method)
 
         self.descend_time_min: float | None = None
         self.descend_distance_nm: float | None = None
@@ -144,17 +227,21 @@ class Descend(Leg):
 
 
 class Cruise(Leg):
+    __slots__ = ()
+
     def __init__(self,
                  from_waypoint: Waypoint,
                  to_waypoint: Waypoint,
-                 distance: float,
-                 true_course: float,
+                 distance: float | None,
+                 true_course: float | None,
                  true_airspeed: float,
                  altitude: float,
                  wind_direction: float,
                  wind_speed: float,
                  temperature: float,
-                 mag_var: float) -> None:
+                 mag_var: float | None = None,
+                 mag_var_grid: MagneticVariationGrid | None = None,
+                 course_method: str = "great_circle") -> None:
 
         super().__init__(from_waypoint=from_waypoint,
                  to_waypoint=to_waypoint,
@@ -166,4 +253,6 @@ class Cruise(Leg):
                  wind_direction=wind_direction,
                  wind_speed=wind_speed,
                  temperature=temperature,
-                 mag_var=mag_var)
+                 mag_var=mag_var,
+                 mag_var_grid=mag_var_grid,
+                 course_method=course_method)
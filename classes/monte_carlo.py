@@ -0,0 +1,147 @@
+import numpy as np
+from classes.flightplan import FlightPlan
+from classes.plan_table import PlanTable, INPUT_COLUMNS
+
+PERTURBED_COLUMNS: tuple = ("wind_direction", "wind_speed", "temperature")
+# samples kept to compute the percentiles, the percentiles are exact up to this number of samples
+DEFAULT_RESERVOIR_SIZE: int = 100_000
+
+
+def normal(sigma: float):
+    """
+    :param sigma: standard deviation of the perturbation.
+    :return: a sampler of zero-mean normally distributed perturbations.
+    """
+    return lambda rng, shape: rng.normal(0.0, sigma, shape)
+
+
+def uniform(half_width: float):
+    """
+    :param half_width: half width of the perturbation interval.
+    :return: a sampler of perturbations uniformly distributed in [-half_width, half_width].
+    """
+    return lambda rng, shape: rng.uniform(-half_width, half_width, shape)
+
+
+class MonteCarloResult:
+    """
+    Percentile curves of a Monte Carlo run. Every per-leg array has shape (P, M) for P percentiles and M legs.
+    fuel_on_board_gal is the fuel left at the end of each leg, not the fuel still to burn (the remaining_fuel_gal
+    of a leg).
+    """
+    def __init__(self, percentiles: np.ndarray, n_samples: int, fuel_capacity_gal: float, time_min: np.ndarray,
+                 fuel_gal: np.ndarray, maneuver_fuel_gal: np.ndarray, fuel_exhaustion_probability: float) -> None:
+        """
+        :param percentiles: (P,) the percentiles reported
+        :param n_samples: number of samples evaluated
+        :param fuel_capacity_gal: usable fuel of the aircraft (gal)
+        :param time_min: (S, M) leg times (min) of the S samples kept
+        :param fuel_gal: (S, M) leg fuel (gal) of the samples kept
+        :param maneuver_fuel_gal: (S, M) climb or descent fuel (gal) of the samples kept, NaN for cruise legs
+        :param fuel_exhaustion_probability: fraction of all the samples that exhaust the fuel on board
+        """
+        cumulative_fuel_gal = np.cumsum(fuel_gal, axis=1)
+        on_board_gal = fuel_capacity_gal - cumulative_fuel_gal
+
+        self.percentiles: np.ndarray = percentiles
+        self.n_samples: int = n_samples
+        self.fuel_capacity_gal: float = fuel_capacity_gal
+
+        self.time_min: np.ndarray = np.percentile(time_min, percentiles, axis=0)
+        self.fuel_gal: np.ndarray = np.percentile(fuel_gal, percentiles, axis=0)
+        self.cumulative_time_min: np.ndarray = np.percentile(np.cumsum(time_min, axis=1), percentiles, axis=0)
+        self.fuel_on_board_gal: np.ndarray = np.percentile(on_board_gal, percentiles, axis=0)
+        self.total_time: np.ndarray = self.cumulative_time_min[:, -1]
+        self.total_fuel: np.ndarray = np.percentile(cumulative_fuel_gal[:, -1], percentiles)
+
+        maneuver_legs = ~np.all(np.isnan(maneuver_fuel_gal), axis=0)
+        self.maneuver_fuel_gal: np.ndarray = np.full((len(percentiles), fuel_gal.shape[1]), np.nan)
+        self.maneuver_fuel_gal[:, maneuver_legs] = np.nanpercentile(maneuver_fuel_gal[:, maneuver_legs],
+                                                                    percentiles, axis=0)
+
+        self.fuel_exhaustion_probability: float = fuel_exhaustion_probability
+
+
+def run_monte_carlo(flight_plan: FlightPlan, n_samples: int = 10_000, wind_direction=None, wind_speed=None,
+                    temperature=None, percentiles: tuple = (5, 50, 95), seed: int = 0,
+                    chunk_size: int = 10_000, reservoir_size: int = DEFAULT_RESERVOIR_SIZE) -> MonteCarloResult:
+    """
+    Monte Carlo analysis of a flight plan under uncertain winds and temperatures. The wind direction, wind speed
+    and temperature of every leg are perturbed with the given samplers and the perturbed plans are evaluated with
+    the vectorized PlanTable engine, chunk_size samples at a time, without building per-sample Leg objects.
+
+    A sampler is a float (the standard deviation of a normal perturbation), the result of normal() or uniform(),
+    or any callable (rng, shape) -> perturbations, where shape is (samples, legs). Each perturbed column draws
+    from its own random stream, so the results only depend on the seed, not on the chunk size.
+
+    Memory is bounded by chunk_size and reservoir_size, not by n_samples: the percentiles are computed from a
+    uniform random subset (reservoir sampling) of at most reservoir_size samples, whose leg times and fuel are kept
+    as float32 (12 bytes per kept sample and leg), and are exact when n_samples <= reservoir_size. The fuel
+    exhaustion probability is counted over all the samples.
+
+    :param flight_plan: the nominal flight plan.
+    :param n_samples: number of samples.
+    :param wind_direction: wind direction perturbation (degrees), None for no perturbation.
+    :param wind_speed: wind speed perturbation (kts), None for no perturbation. Wind speeds are clipped at 0.
+    :param temperature: temperature perturbation (F), None for no perturbation.
+    :param percentiles: the percentiles to report.
+    :param seed: random seed.
+    :param chunk_size: number of samples evaluated at a time.
+    :param reservoir_size: maximum number of samples kept to compute the percentiles.
+    :return: the percentile curves.
+    """
+    assert n_samples > 0 and chunk_size > 0 and reservoir_size > 0, \
+        "n_samples, chunk_size and reservoir_size must be positive."
+
+    aircraft = flight_plan.aircraft
+    nominal = PlanTable.from_flight_plans([flight_plan])
+    n_legs = nominal.shape[1]
+
+    samplers = {}
+    for name, sampler in zip(PERTURBED_COLUMNS, (wind_direction, wind_speed, temperature)):
+        if sampler is None:
+            continue
+        samplers[name] = normal(sampler) if isinstance(sampler, (int, float)) else sampler
+    children = np.random.SeedSequence(seed).spawn(len(PERTURBED_COLUMNS) + 1)
+    streams = dict(zip(PERTURBED_COLUMNS, (np.random.default_rng(child) for child in children)))
+    reservoir_stream = np.random.default_rng(children[-1])
+
+    fuel_capacity_gal = aircraft.performance_profile["fuel_capacity_g"]
+    kept = min(n_samples, reservoir_size)
+    time_min = np.empty((kept, n_legs), dtype=np.float32)
+    fuel_gal = np.empty((kept, n_legs), dtype=np.float32)
+    maneuver_fuel_gal = np.empty((kept, n_legs), dtype=np.float32)
+    exhausted = 0
+
+    for start in range(0, n_samples, chunk_size):
+        stop = min(start + chunk_size, n_samples)
+        columns = {name: getattr(nominal, name) for name in INPUT_COLUMNS}
+        for name, sampler in samplers.items():
+            columns[name] = columns[name] + sampler(streams[name], (stop - start, n_legs))
+        columns["wind_speed"] = np.maximum(columns["wind_speed"], 0)
+
+        table = PlanTable(kind=nominal.kind, **columns)
+        table.evaluate(aircraft)
+
+        # without perturbations the table holds the nominal plan only
+        time_chunk, fuel_chunk, climb_fuel_chunk, descend_fuel_chunk, total_fuel = (
+            np.broadcast_to(values, (stop - start,) + values.shape[1:]) for values in
+            (table.time_min, table.fuel_gal, table.climb_fuel_gal, table.descend_fuel_gal, table.total_fuel))
+        exhausted += int(np.count_nonzero(fuel_capacity_gal - total_fuel < 0))
+
+        # reservoir sampling (algorithm R): sample i replaces a random slot with probability reservoir_size / (i + 1),
+        # later samples of the chunk overwrite earlier ones drawn into the same slot, as in the sequential algorithm
+        index = np.arange(start, stop)
+        slots = index.copy()
+        replacing = index >= reservoir_size
+        draws = reservoir_stream.random(np.count_nonzero(replacing))
+        slots[replacing] = (draws * (index[replacing] + 1)).astype(np.int64)
+        rows = np.flatnonzero(slots < reservoir_size)
+        slots = slots[rows]
+        time_min[slots] = time_chunk[rows]
+        fuel_gal[slots] = fuel_chunk[rows]
+        maneuver_fuel_gal[slots] = np.where(np.isnan(climb_fuel_chunk[rows]), descend_fuel_chunk[rows],
+                                            climb_fuel_chunk[rows])
+
+    return MonteCarloResult(np.asarray(percentiles, dtype=float), n_samples, fuel_capacity_gal, time_min, fuel_gal,
+                            maneuver_fuel_gal, exhausted / n_samples)
@@ -0,0 +1,204 @@
+import json
+import struct
+import numpy as np
+from classes.flightplan import FlightPlan
+from classes.plan_table import PlanTable, OUTPUT_COLUMNS, LEG_CRUISE, LEG_CLIMB, LEG_DESCEND
+from common.atomic_write import atomic_write
+
+MAGIC: bytes = b"VFRPLANS"
+FORMAT_VERSION: int = 1
+ALIGNMENT: int = 64
+PLAN_COLUMNS: tuple = ("total_time", "total_distance", "total_fuel")
+LEG_COLUMNS: tuple = ("start_altitude", "end_altitude") + OUTPUT_COLUMNS
+
+# FlightPlan.summarize() layout of one leg; every layout consumes the same arguments (see render_summary()), the
+# ones a leg kind does not print are consumed by empty %.0s fields
+_HEADING = "%d) -- %s -> %s %s\n\t TC: %.1f, TH: %.1f, MH: %.1f, CH: %.1f\n"
+_TOTALS = "\t Time: %.1f min,  Distance: %.1f nm,  Fuel: %.1f gal\n"
+_REMAINING = "\t Rem Time: %.1f min,  Rem Distance: %.1f nm,  Rem Fuel: %.1f gal\n"
+LEG_LAYOUTS: dict = {
+    LEG_CRUISE: _HEADING + "\t Altitude: %r ft%.0s\n" + _TOTALS + "%.0s%.0s%.0s" + _REMAINING,
+    LEG_CLIMB: _HEADING + "\t Start Altitude: %r ft,  End Altitude: %r ft\n" + _TOTALS +
+    "\t Climb Time: %.1f min,  Climb Distance: %.1f nm,  Climb Fuel: %.1f gal\n" + _REMAINING,
+    LEG_DESCEND: _HEADING + "\t Start Altitude: %r ft,  End Altitude: %r ft\n" + _TOTALS +
+    "\t Descent Time: %.1f min,  Descent Distance: %.1f nm,  Descent Fuel: %.1f gal\n" + _REMAINING,
+}
+HEADING_WIDTH: int = 80
+_DASHES: list = ["-" * width for width in range(HEADING_WIDTH + 1)]
+
+
+def write_plan_table(path: str, table: PlanTable, dtype: np.dtype = np.float64) -> None:
+    """
+    Writes the evaluated plans of a table to a columnar binary file: a JSON header followed by one contiguous,
+    64-byte aligned block per column. Plan columns (totals) have one value per plan, leg columns one value per
+    leg with the legs of all the plans back to back (see PlanColumns.plan_offsets).
+
+    :param path: path of the file
+    :param table: the evaluated plan table
+    :param dtype: data type of the float columns (e.g., np.float32 for a file half the size)
+    :return: None
+    """
+    assert table.time_min is not None, "The plan table must be evaluated before it is exported."
+    valid = table.valid
+
+    if table.from_waypoints is not None and table.to_waypoints is not None:
+        names = np.concatenate([table.from_waypoints[valid], table.to_waypoints[valid]]).astype(str)
+    else:
+        plans, legs = np.nonzero(valid)
+        names = np.array([f"{i}.{j}" for i, j in zip(plans.tolist(), legs.tolist())] +
+                         [f"{i}.{j + 1}" for i, j in zip(plans.tolist(), legs.tolist())])
+    waypoints, codes = np.unique(names, return_inverse=True)
+    n_legs = int(valid.sum())
+
+    columns = {"plan_offsets": np.concatenate([[0], np.cumsum(table.n_legs)]).astype(np.int64),
+               "kind": table.kind[valid], "from_waypoint": codes[:n_legs].astype(np.int32),
+               "to_waypoint": codes[n_legs:].astype(np.int32)}
+    for name in PLAN_COLUMNS:
+        columns[name] = getattr(table, name).astype(dtype)
+    for name in LEG_COLUMNS:
+        columns[name] = getattr(table, name)[valid].astype(dtype)
+
+    write_columns(path, columns, {"n_plans": len(table), "n_legs": n_legs, "waypoints": waypoints.tolist()})
+
+
+def write_flight_plans(path: str, flight_plans: list[FlightPlan], dtype: np.dtype = np.float64) -> None:
+    """
+    write_plan_table() for evaluated FlightPlan objects.
+
+    :param path: path of the file
+    :param flight_plans: the evaluated flight plans
+    :param dtype: data type of the float columns
+    :return: None
+    """
+    table = PlanTable.from_flight_plans(flight_plans)
+    for name in OUTPUT_COLUMNS:
+        column = np.full(table.shape, np.nan)
+        for i, flight_plan in enumerate(flight_plans):
+            column[i, :len(flight_plan.plan)] = [getattr(leg, name, None) for leg in flight_plan.plan]
+        setattr(table, name, column)
+    for name in PLAN_COLUMNS:
+        setattr(table, name, np.array([getattr(flight_plan, name) for flight_plan in flight_plans], dtype=float))
+    write_plan_table(path, table, dtype)
+
+
+def write_columns(path: str, columns: dict, header: dict) -> None:
+    """
+    :param path: path of the file, replaced atomically
+    :param columns: the 1-D column arrays
+    :param header: metadata stored in the JSON header
+    :return: None
+    """
+    header = {"version": FORMAT_VERSION, **header, "columns": {}}
+    offset = 0
+    for name, column in columns.items():
+        header["columns"][name] = {"dtype": column.dtype.str, "length": len(column), "offset": offset}
+        offset += -(-column.nbytes // ALIGNMENT) * ALIGNMENT
+
+    encoded = json.dumps(header).encode()
+    data_offset = -(-(len(MAGIC) + 8 + len(encoded)) // ALIGNMENT) * ALIGNMENT
+
+    def write(file) -> None:
+        file.write(MAGIC + struct.pack("<Q", len(encoded)) + encoded)
+        for name, column in columns.items():
+            file.seek(data_offset + header["columns"][name]["offset"])
+            file.write(np.ascontiguousarray(column).tobytes())
+        file.truncate(data_offset + offset)
+
+    atomic_write(path, write)
+
+
+class PlanColumns:
+    """
+    Memory-mapped reader of a file written by write_plan_table(). Columns are read-only arrays mapping the file,
+    so only the pages of the columns (and plans) used are read.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        :param path: path of the file
+        """
+        with open(path, "rb") as file:
+            assert file.read(len(MAGIC)) == MAGIC, f"{path} is not a plan column file."
+            header_length, = struct.unpack("<Q", file.read(8))
+            header = json.loads(file.read(header_length))
+        assert header["version"] == FORMAT_VERSION, f"Unsupported plan column file version {header['version']}."
+        data_offset = -(-(len(MAGIC) + 8 + header_length) // ALIGNMENT) * ALIGNMENT
+
+        self.path: str = path
+        self.n_plans: int = header["n_plans"]
+        self.n_legs: int = header["n_legs"]
+        self.waypoints: np.ndarray = np.array(header["waypoints"], dtype=object)
+        self.columns: dict[str, np.ndarray] = {}
+        for name, column in header["columns"].items():
+            dtype = np.dtype(column["dtype"])
+            if column["length"] == 0:
+                self.columns[name] = np.empty(0, dtype=dtype)
+                continue
+            self.columns[name] = np.memmap(path, dtype=dtype, mode="r", offset=data_offset + column["offset"],
+                                           shape=(column["length"],))
+
+    def __len__(self) -> int:
+        return self.n_plans
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def plan_offsets(self) -> np.ndarray:
+        """
+        :return: (n_plans + 1,) the legs of plan i are the leg column entries plan_offsets[i]:plan_offsets[i + 1]
+        """
+        return self.columns["plan_offsets"]
+
+    def plan_legs(self, plan: int) -> slice:
+        """
+        :param plan: index of the plan
+        :return: the slice of the leg columns holding the legs of the plan
+        """
+        return slice(int(self.plan_offsets[plan]), int(self.plan_offsets[plan + 1]))
+
+    def render_summary(self, plans: np.ndarray | None = None) -> str:
+        """
+        Renders the FlightPlan.summarize() text of the plans (one after the other, each numbering its legs from
+        1) in a single formatting pass over the leg columns. Altitudes are printed as floats (e.g., "998.0 ft"),
+        like summarize() prints a plan with float altitudes.
+
+        :param plans: indices of the plans to render, all of them if None
+        :return: the text
+        """
+        offsets = np.asarray(self.plan_offsets)
+        plans = np.arange(self.n_plans) if plans is None else np.asarray(plans, dtype=np.intp)
+        counts = offsets[plans + 1] - offsets[plans]
+        legs = np.repeat(offsets[plans] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        numbers = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        if not len(legs):
+            return ""
+
+        # heading: "<n>) -- <from> -> <to> " padded with dashes to HEADING_WIDTH
+        name_lengths = np.array([len(name) for name in self.waypoints.tolist()])
+        from_codes, to_codes = self.columns["from_waypoint"][legs], self.columns["to_waypoint"][legs]
+        heading_lengths = np.char.str_len(numbers.astype(str)) + name_lengths[from_codes] + \
+            name_lengths[to_codes] + 10
+        dashes = np.array(_DASHES, dtype=object)[np.clip(HEADING_WIDTH - heading_lengths, 0, HEADING_WIDTH)]
+
+        kind = self.columns["kind"][legs]
+        climb, descend = kind == LEG_CLIMB, kind == LEG_DESCEND
+        maneuver = [np.where(climb, self.columns[f"climb_{name}"][legs],
+                             np.where(descend, self.columns[f"descend_{name}"][legs], 0.0))
+                    for name in ("time_min", "distance_nm", "fuel_gal")]
+
+        arguments = np.empty((len(legs), 19), dtype=object)
+        arguments[:, 0] = numbers
+        arguments[:, 1] = self.waypoints[from_codes]
+        arguments[:, 2] = self.waypoints[to_codes]
+        arguments[:, 3] = dashes
+        for k, column in enumerate(("TC", "TH", "MH", "CH", "start_altitude", "end_altitude", "time_min",
+                                    "distance_nm", "fuel_gal"), start=4):
+            arguments[:, k] = self.columns[column][legs].astype(float).tolist()
+        for k, column in enumerate(maneuver, start=13):
+            arguments[:, k] = column.astype(float).tolist()
+        for k, column in enumerate(("remaining_time_min", "remaining_distance_nm", "remaining_fuel_gal"), start=16):
+            arguments[:, k] = self.columns[column][legs].astype(float).tolist()
+
+        layouts = np.array([LEG_LAYOUTS[LEG_CRUISE], LEG_LAYOUTS[LEG_CLIMB], LEG_LAYOUTS[LEG_DESCEND]],
+                           dtype=object)
+        return "".join(layouts[np.select([climb, descend], [1, 2], 0)]) % tuple(arguments.ravel().tolist())
@@ -0,0 +1,248 @@
+import csv
+import json
+import math
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+import numpy as np
+from classes.aircraft import Aircraft
+from classes.flightplan import FlightPlan
+from classes.legs import Leg, Climb, Cruise, Descend
+from classes.plan_table import PlanTable, OUTPUT_COLUMNS, LEG_CLIMB, LEG_DESCEND
+from classes.waypoints import Waypoint
+
+LEG_CLASSES: dict = {"Climb": Climb, "Cruise": Cruise, "Descend": Descend, "Leg": Leg}
+NUMERIC_FIELDS: tuple = ("distance", "true_course", "true_airspeed", "wind_direction", "wind_speed", "temperature",
+                         "mag_var")
+RESULT_FIELDS: tuple = ("plan_id", "leg", "kind", "from_waypoint", "to_waypoint") + OUTPUT_COLUMNS
+
+
+class MalformedRecordError(ValueError):
+    """
+    Raised when a leg record cannot be parsed.
+    """
+
+
+def detect_format(path: str) -> str:
+    """
+    :param path: file path
+    :return: "csv" or "jsonl", from the file extension
+    """
+    extension = path.rsplit(".", 1)[-1].lower()
+    assert extension in ("csv", "jsonl", "ndjson"), f"Unsupported plan file format: .{extension}"
+    return "csv" if extension == "csv" else "jsonl"
+
+
+def read_leg_records(path: str) -> Iterator[tuple[int, dict | str]]:
+    """
+    Streams the raw leg records of a CSV (with a header row) or JSONL file. Lines that are not valid JSON objects
+    are yielded as their raw text so that they can be rejected downstream.
+
+    :param path: file path
+    :return: generator of (line number, record)
+    """
+    with open(path, newline="") as file:
+        if detect_format(path) == "csv":
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+            return
+
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = line.rstrip("\n")
+            yield line_number, record if isinstance(record, dict) else line.rstrip("\n")
+
+
+def parse_leg(record: dict | str) -> tuple[str, Leg]:
+    """
+    Parses a leg record. Cruise legs may give a single "altitude" instead of start/end altitudes.
+
+    :param record: the raw record
+    :return: the plan id and the leg
+    """
+    if not isinstance(record, dict):
+        raise MalformedRecordError("record is not a JSON object")
+
+    plan_id = record.get("plan_id")
+    if plan_id in (None, ""):
+        raise MalformedRecordError("missing plan_id")
+
+    kind = record.get("kind")
+    if kind not in LEG_CLASSES:
+        raise MalformedRecordError(f"unknown leg kind {kind!r}")
+
+    fields = NUMERIC_FIELDS + (("altitude",) if kind == "Cruise" and "altitude" in record
+                               else ("start_altitude", "end_altitude"))
+    values = {}
+    for field in fields:
+        try:
+            values[field] = float(record[field])
+        except (KeyError, TypeError, ValueError):
+            raise MalformedRecordError(f"missing or invalid {field}") from None
+        if not math.isfinite(values[field]):
+            raise MalformedRecordError(f"non-finite {field}")
+
+    if kind == "Cruise" and "altitude" not in values:
+        if values["start_altitude"] != values["end_altitude"]:
+            raise MalformedRecordError("Cruise legs must have equal start and end altitudes")
+        values["altitude"] = values.pop("start_altitude")
+        values.pop("end_altitude")
+
+    for field in ("from_waypoint", "to_waypoint"):
+        if not record.get(field):
+            raise MalformedRecordError(f"missing {field}")
+
+    leg = LEG_CLASSES[kind](from_waypoint=Waypoint(str(record["from_waypoint"])),
+                            to_waypoint=Waypoint(str(record["to_waypoint"])),
+                            **values)
+    return str(plan_id), leg
+
+
+def group_plans(records: Iterable[tuple[int, dict | str]],
+                reject: Callable[[dict], None]) -> Iterator[tuple[str, list[Leg]]]:
+    """
+    Groups consecutive leg records with the same plan_id into plans. A plan with a malformed record is rejected
+    as a whole, since evaluating it without that leg would be wrong.
+
+    :param records: generator of (line number, record), see read_leg_records()
+    :param reject: called with a reject entry for every malformed record or rejected plan
+    :return: generator of (plan id, legs)
+    """
+    plan_id = None
+    legs = []
+    rejected = False
+
+    for line_number, record in records:
+        record_plan_id = record.get("plan_id") if isinstance(record, dict) else None
+        record_plan_id = None if record_plan_id in (None, "") else str(record_plan_id)
+
+        try:
+            _, leg = parse_leg(record)
+        except MalformedRecordError as error:
+            reject({"line": line_number, "plan_id": record_plan_id, "reason": str(error), "record": record})
+            leg = None
+
+        if record_plan_id is None:
+            continue
+
+        if record_plan_id != plan_id:
+            if rejected:
+                reject({"plan_id": plan_id, "reason": "plan has malformed records"})
+            elif plan_id is not None:
+                yield plan_id, legs
+            plan_id = record_plan_id
+            legs = []
+            rejected = False
+
+        if leg is None:
+            rejected = True
+            legs = []
+        elif not rejected:
+            legs.append(leg)
+
+    if rejected:
+        reject({"plan_id": plan_id, "reason": "plan has malformed records"})
+    elif plan_id is not None:
+        yield plan_id, legs
+
+
+def evaluate_plans(plans: Iterable[tuple[str, list[Leg]]], aircraft: Aircraft, reject: Callable[[dict], None],
+                   batch_size: int = 1024) -> Iterator[dict]:
+    """
+    Evaluates plans batch_size at a time with the PlanTable engine and yields one result row per leg. Plans that
+    fail FlightPlan.check_plan(), or whose climb/descent falls outside of the atmospheric envelope, are rejected.
+
+    :param plans: generator of (plan id, legs), see group_plans()
+    :param aircraft: the aircraft flying every plan
+    :param reject: called with a reject entry for every rejected plan
+    :param batch_size: number of plans evaluated at a time
+    :return: generator of result rows, see RESULT_FIELDS
+    """
+    plans = iter(plans)
+    while batch := list(islice(plans, batch_size)):
+        plan_ids = []
+        flight_plans = []
+        for plan_id, legs in batch:
+            try:
+                flight_plans.append(FlightPlan(legs, aircraft=aircraft))
+                plan_ids.append(plan_id)
+            except AssertionError as error:
+                reject({"plan_id": plan_id, "reason": str(error)})
+
+        if not flight_plans:
+            continue
+
+        table = PlanTable.from_flight_plans(flight_plans)
+        table.evaluate(aircraft)
+
+        out_of_envelope = np.any(((table.kind == LEG_CLIMB) & np.isnan(table.climb_time_min)) |
+                                 ((table.kind == LEG_DESCEND) & np.isnan(table.descend_time_min)), axis=1)
+
+        for i, (plan_id, flight_plan) in enumerate(zip(plan_ids, flight_plans)):
+            if out_of_envelope[i]:
+                reject({"plan_id": plan_id, "reason": "climb or descent is outside of the atmospheric envelope"})
+                continue
+
+            for j, leg in enumerate(flight_plan.plan):
+                row = {"plan_id": plan_id, "leg": j, "kind": type(leg).__name__,
+                       "from_waypoint": leg.from_waypoint.name, "to_waypoint": leg.to_waypoint.name}
+                for name in OUTPUT_COLUMNS:
+                    value = float(getattr(table, name)[i, j])
+                    row[name] = value if math.isfinite(value) else None
+                yield row
+
+
+def write_results(rows: Iterable[dict], path: str) -> int:
+    """
+    Writes result rows incrementally to a CSV or JSONL file.
+
+    :param rows: generator of result rows, see RESULT_FIELDS
+    :param path: file path
+    :return: number of rows written
+    """
+    n_rows = 0
+    with open(path, "w", newline="") as file:
+        if detect_format(path) == "csv":
+            writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                n_rows += 1
+        else:
+            for row in rows:
+                file.write(json.dumps(row) + "\n")
+                n_rows += 1
+    return n_rows
+
+
+def process_plan_file(input_path: str, output_path: str, reject_path: str, aircraft: Aircraft,
+                      batch_size: int = 1024) -> dict:
+    """
+    Streams leg records from input_path, groups them into plans, evaluates them and writes the per-leg results to
+    output_path. Malformed records and invalid plans are written to reject_path (JSONL) instead of aborting the
+    run. The legs of a plan must be contiguous in the input file. Memory use is bounded by batch_size plans,
+    regardless of the size of the input.
+
+    :param input_path: CSV or JSONL leg records
+    :param output_path: CSV or JSONL per-leg results
+    :param reject_path: JSONL reject entries
+    :param aircraft: the aircraft flying every plan
+    :param batch_size: number of plans evaluated at a time
+    :return: counts of the rows written and the entries rejected
+    """
+    n_rejects = 0
+
+    with open(reject_path, "w") as reject_file:
+        def reject(entry: dict) -> None:
+            nonlocal n_rejects
+            n_rejects += 1
+            reject_file.write(json.dumps(entry) + "\n")
+
+        plans = group_plans(read_leg_records(input_path), reject)
+        n_rows = write_results(evaluate_plans(plans, aircraft, reject, batch_size=batch_size), output_path)
+
+    return {"rows": n_rows, "rejects": n_rejects}
@@ -0,0 +1,279 @@
+import numpy as np
+from classes.aircraft import Aircraft
+from classes.flightplan import FlightPlan
+from classes.legs import Leg, Climb, Cruise, Descend
+from classes.waypoints import Waypoint
+from models.winds import compute_wind_triangle
+
+# leg kind codes used in the PlanTable.kind column
+LEG_CRUISE: int = 0
+LEG_CLIMB: int = 1
+LEG_DESCEND: int = 2
+
+# fuel reserve (min at the fuel rate of the aircraft) kept by dispatch and validation
+DEFAULT_RESERVE_MIN: float = 30.0
+
+INPUT_COLUMNS: tuple = ("distance", "true_course", "true_airspeed", "start_altitude", "end_altitude",
+                        "wind_direction", "wind_speed", "temperature", "mag_var")
+
+OUTPUT_COLUMNS: tuple = ("mag_dev", "wca", "TC", "TH", "MH", "CH", "GS", "headwind", "crosswind",
+                         "time_min", "distance_nm", "fuel_gal",
+                         "remaining_time_min", "remaining_distance_nm", "remaining_fuel_gal",
+                         "climb_time_min", "climb_distance_nm", "climb_fuel_gal",
+                         "descend_time_min", "descend_distance_nm", "descend_fuel_gal")
+
+
+def reverse_cumsum_exclusive(values: np.ndarray) -> np.ndarray:
+    """
+    Computes, for each leg, the sum of the values of all the legs that follow it in the same plan. The legs are
+    summed from the end of the plan backwards, in the same order as FlightPlan.evaluate().
+
+    :param values: (N, M) array of per-leg values, padded legs must be 0.
+    :return: (N, M) array of remaining values.
+    """
+    suffix = np.cumsum(values[:, ::-1], axis=1)[:, ::-1]
+    remaining = np.zeros_like(suffix)
+    remaining[:, :-1] = suffix[:, 1:]
+    return remaining
+
+
+class PlanTable:
+    """
+    Struct-of-arrays representation of N flight plans with up to M legs each. Every input column of a Leg is stored
+    as an (N, M) array so that a whole batch of plans can be evaluated with array operations instead of walking a
+    Python list of Leg objects. Plans with fewer than M legs are padded; see n_legs and valid.
+    """
+    def __init__(self,
+                 kind: np.ndarray,
+                 distance: np.ndarray,
+                 true_course: np.ndarray,
+                 true_airspeed: np.ndarray,
+                 start_altitude: np.ndarray,
+                 end_altitude: np.ndarray,
+                 wind_direction: np.ndarray,
+                 wind_speed: np.ndarray,
+                 temperature: np.ndarray,
+                 mag_var: np.ndarray,
+                 n_legs: np.ndarray | None = None,
+                 from_waypoints: np.ndarray | None = None,
+                 to_waypoints: np.ndarray | None = None) -> None:
+        """
+        All the leg columns must be broadcastable to a common (N, M) shape.
+
+        :param kind: leg kind codes (LEG_CRUISE, LEG_CLIMB or LEG_DESCEND)
+        :param distance: distance between waypoints in nautical miles
+        :param true_course: true course in degrees
+        :param true_airspeed: true airspeed in kts
+        :param start_altitude: starting pressure altitude
+        :param end_altitude: ending pressure altitude
+        :param wind_direction: wind direction in degrees
+        :param wind_speed: wind speed in kts
+        :param temperature: outside temperature (F)
+        :param mag_var: magnetic variation in degrees
+        :param n_legs: (N,) number of populated legs in each plan, defaults to M for every plan
+        :param from_waypoints: optional (N, M) array of waypoint names at the start of each leg
+        :param to_waypoints: optional (N, M) array of waypoint names at the end of each leg
+        """
+        columns = np.broadcast_arrays(np.atleast_2d(np.asarray(kind, dtype=np.int8)),
+                                      *(np.atleast_2d(np.asarray(column, dtype=float)) for column in
+                                        (distance, true_course, true_airspeed, start_altitude, end_altitude,
+                                         wind_direction, wind_speed, temperature, mag_var)))
+        assert columns[0].ndim == 2, "Plan table columns must be broadcastable to an (N, M) shape."
+
+        self.kind: np.ndarray = columns[0]
+        for name, column in zip(INPUT_COLUMNS, columns[1:]):
+            setattr(self, name, column)
+
+        n_plans, max_legs = self.shape
+        if n_legs is None:
+            n_legs = np.full(n_plans, max_legs)
+        self.n_legs: np.ndarray = np.asarray(n_legs, dtype=np.intp)
+        assert self.n_legs.shape == (n_plans,), "n_legs must have one entry per plan."
+        self.valid: np.ndarray = np.arange(max_legs) < self.n_legs[:, np.newaxis]
+
+        self.from_waypoints: np.ndarray | None = from_waypoints
+        self.to_waypoints: np.ndarray | None = to_waypoints
+
+        for name in OUTPUT_COLUMNS:
+            setattr(self, name, None)
+
+        self.total_time: np.ndarray | None = None
+        self.total_distance: np.ndarray | None = None
+        self.total_fuel: np.ndarray | None = None
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.kind.shape
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    @classmethod
+    def from_flight_plans(cls, flight_plans: list[FlightPlan]) -> "PlanTable":
+        """
+        Builds a plan table from FlightPlan objects. Plans with fewer legs than the longest plan are padded.
+
+        :param flight_plans: the flight plans to convert.
+        :return: the plan table.
+        """
+        n_plans = len(flight_plans)
+        n_legs = np.array([len(flight_plan.plan) for flight_plan in flight_plans], dtype=np.intp)
+        max_legs = int(n_legs.max()) if n_plans else 0
+
+        kind = np.zeros((n_plans, max_legs), dtype=np.int8)
+        columns = {name: np.zeros((n_plans, max_legs)) for name in INPUT_COLUMNS}
+        from_waypoints = np.full((n_plans, max_legs), None, dtype=object)
+        to_waypoints = np.full((n_plans, max_legs), None, dtype=object)
+
+        for i, flight_plan in enumerate(flight_plans):
+            for j, leg in enumerate(flight_plan.plan):
+                if isinstance(leg, Climb):
+                    kind[i, j] = LEG_CLIMB
+                elif isinstance(leg, Descend):
+                    kind[i, j] = LEG_DESCEND
+
+                for name in INPUT_COLUMNS:
+                    columns[name][i, j] = getattr(leg, name)
+
+                from_waypoints[i, j] = leg.from_waypoint.name
+                to_waypoints[i, j] = leg.to_waypoint.name
+
+        return cls(kind=kind, n_legs=n_legs, from_waypoints=from_waypoints, to_waypoints=to_waypoints, **columns)
+
+    def take(self, indices: np.ndarray) -> "PlanTable":
+        """
+        Selects a subset of the plans in the table. Evaluated columns are carried over.
+
+        :param indices: indices (or boolean mask) of the plans to select.
+        :return: a new plan table with the selected plans.
+        """
+        table = PlanTable(kind=self.kind[indices],
+                          n_legs=self.n_legs[indices],
+                          from_waypoints=self.from_waypoints[indices] if self.from_waypoints is not None else None,
+                          to_waypoints=self.to_waypoints[indices] if self.to_waypoints is not None else None,
+                          **{name: getattr(self, name)[indices] for name in INPUT_COLUMNS})
+
+        for name in OUTPUT_COLUMNS + ("total_time", "total_distance", "total_fuel"):
+            if getattr(self, name) is not None:
+                setattr(table, name, getattr(self, name)[indices])
+
+        return table
+
+    def evaluate(self, aircraft: Aircraft) -> None:
+        """
+        Vectorized version of FlightPlan.evaluate(). Computes the same per-leg columns (TH, MH, CH, GS, time,
+        distance, fuel, climb and descent corrections and remaining values) and per-plan totals for every plan in
+        the table at once. Columns of padded legs are set to NaN.
+
+        :param aircraft: the aircraft flying every plan in the table.
+        :return: None
+        """
+        valid = self.valid
+        fuel_rate = aircraft.performance_profile['fuel_rate_gph']
+
+        self.mag_dev = aircraft.compute_mag_dev_batch(self.true_course)
+
+        self.TC = self.true_course.copy()
+        self.wca, self.GS, self.headwind, self.crosswind = compute_wind_triangle(self.true_course,
+                                                                                 self.true_airspeed,
+                                                                                 self.wind_direction,
+                                                                                 self.wind_speed)
+        self.TH = self.TC + self.wca
+        self.MH = self.TH + self.mag_var
+        self.CH = self.MH + self.mag_dev
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            time_min = np.where(valid, self.distance / self.GS * 60, 0.0)
+        distance_nm = np.where(valid, self.distance, 0.0)
+        fuel_gal = fuel_rate / 60 * time_min
+
+        self.total_time = time_min.sum(axis=1)
+        self.total_distance = distance_nm.sum(axis=1)
+        self.total_fuel = fuel_gal.sum(axis=1)
+
+        self.remaining_time_min = np.where(valid, reverse_cumsum_exclusive(time_min), np.nan)
+        self.remaining_distance_nm = np.where(valid, reverse_cumsum_exclusive(distance_nm), np.nan)
+        self.remaining_fuel_gal = np.where(valid, reverse_cumsum_exclusive(fuel_gal), np.nan)
+
+        self.time_min = np.where(valid, time_min, np.nan)
+        self.distance_nm = np.where(valid, distance_nm, np.nan)
+        self.fuel_gal = np.where(valid, fuel_gal, np.nan)
+
+        # climb and descent corrections are only evaluated on the legs that need them
+        self.climb_time_min, self.climb_distance_nm, self.climb_fuel_gal = \
+            self._evaluate_maneuver(valid & (self.kind == LEG_CLIMB), aircraft.compute_climb_batch)
+        self.descend_time_min, self.descend_distance_nm, self.descend_fuel_gal = \
+            self._evaluate_maneuver(valid & (self.kind == LEG_DESCEND), aircraft.compute_descent_batch)
+
+        for name in ("mag_dev", "TC", "wca", "TH", "MH", "CH", "GS", "headwind", "crosswind"):
+            setattr(self, name, np.where(valid, getattr(self, name), np.nan))
+
+    def _evaluate_maneuver(self, mask: np.ndarray, compute_maneuver) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluates a climb or descent model on the legs selected by mask.
+
+        :param mask: (N, M) boolean mask of the legs to evaluate.
+        :param compute_maneuver: Aircraft.compute_climb_batch or Aircraft.compute_descent_batch
+        :return: time, distance and fuel arrays, NaN outside of mask.
+        """
+        results = tuple(np.full(self.shape, np.nan) for _ in range(3))
+        if mask.any():
+            values = compute_maneuver(from_altitude=self.start_altitude[mask],
+                                      to_altitude=self.end_altitude[mask],
+                                      temperature=self.temperature[mask])
+            for result, value in zip(results, values):
+                result[mask] = value
+        return results
+
+    def to_flight_plans(self, aircraft: Aircraft) -> list[FlightPlan]:
+        """
+        Converts the plan table back into FlightPlan objects. If the table has been evaluated, the computed columns
+        and totals are copied onto the legs and plans as well.
+
+        :param aircraft: the aircraft flying every plan in the table.
+        :return: the flight plans.
+        """
+        flight_plans = []
+        for i in range(len(self)):
+            legs = []
+            for j in range(self.n_legs[i]):
+                leg = self._build_leg(i, j)
+                if self.time_min is not None:
+                    self._copy_outputs(leg, i, j)
+                legs.append(leg)
+
+            flight_plan = FlightPlan(legs, aircraft=aircraft)
+            if self.total_time is not None:
+                flight_plan.total_time = float(self.total_time[i])
+                flight_plan.total_distance = float(self.total_distance[i])
+                flight_plan.total_fuel = float(self.total_fuel[i])
+            flight_plans.append(flight_plan)
+
+        return flight_plans
+
+    def _build_leg(self, i: int, j: int) -> Leg:
+        kind = self.kind[i, j]
+        from_name = self.from_waypoints[i, j] if self.from_waypoints is not None else f"{i}.{j}"
+        to_name = self.to_waypoints[i, j] if self.to_waypoints is not None else f"{i}.{j + 1}"
+        inputs = {name: float(getattr(self, name)[i, j]) for name in INPUT_COLUMNS}
+
+        if kind == LEG_CLIMB:
+            leg_class = Climb
+        elif kind == LEG_DESCEND:
+            leg_class = Descend
+        elif inputs["start_altitude"] == inputs["end_altitude"]:
+            leg_class = Cruise
+            inputs["altitude"] = inputs.pop("start_altitude")
+            inputs.pop("end_altitude")
+        else:
+            leg_class = Leg
+
+        return leg_class(from_waypoint=Waypoint(from_name), to_waypoint=Waypoint(to_name), **inputs)
+
+    def _copy_outputs(self, leg: Leg, i: int, j: int) -> None:
+        for name in OUTPUT_COLUMNS:
+            if name.startswith("climb_") and not isinstance(leg, Climb):
+                continue
+            if name.startswith("descend_") and not isinstance(leg, Descend):
+                continue
+            setattr(leg, name, float(getattr(self, name)[i, j]))
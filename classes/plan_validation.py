@@ -0,0 +1,111 @@
+import numpy as np
+from classes.aircraft import Aircraft
+from classes.plan_table import PlanTable, INPUT_COLUMNS, LEG_CRUISE, LEG_CLIMB, LEG_DESCEND, DEFAULT_RESERVE_MIN
+from models.atmosphere import atmospheric_envelope_mask
+from models.winds import compute_wind_triangle
+
+# per-leg violation bits reported by validate_plan_table(), 0 for a valid leg
+INVALID_INPUT: int = 1 << 0
+TEMPERATURE_ENVELOPE: int = 1 << 1
+ALTITUDE_ENVELOPE: int = 1 << 2
+CLIMB_DIRECTION: int = 1 << 3
+DESCENT_DIRECTION: int = 1 << 4
+ALTITUDE_DISCONTINUITY: int = 1 << 5
+ROUTE_DISCONTINUITY: int = 1 << 6
+INSUFFICIENT_FUEL: int = 1 << 7
+TOO_FEW_LEGS: int = 1 << 8
+
+VIOLATION_NAMES: dict = {
+    INVALID_INPUT: "invalid input (non-finite value, unknown leg kind, or non-positive distance or airspeed)",
+    TEMPERATURE_ENVELOPE: "temperature outside of the atmospheric envelope",
+    ALTITUDE_ENVELOPE: "pressure altitude outside of the atmospheric envelope",
+    CLIMB_DIRECTION: "climb leg does not climb",
+    DESCENT_DIRECTION: "descent leg does not descend",
+    ALTITUDE_DISCONTINUITY: "leg does not start at the altitude the previous leg ends at",
+    ROUTE_DISCONTINUITY: "leg does not start at the waypoint the previous leg ends at",
+    INSUFFICIENT_FUEL: "fuel on board exhausted before the end of the leg (including the reserve)",
+    TOO_FEW_LEGS: "the flight plan must have at least two legs",
+}
+
+# altitude mismatch (ft) tolerated between consecutive legs
+ALTITUDE_TOLERANCE: float = 1e-6
+
+
+def validate_plan_table(table: PlanTable, aircraft: Aircraft | None = None, reserve_min: float = DEFAULT_RESERVE_MIN,
+                        fuel_on_board: np.ndarray | None = None) -> np.ndarray:
+    """
+    Checks every leg of every plan of the table in one vectorized pass, instead of the asserts of the scalar
+    planner (FlightPlan.check_plan(), atmospheric_model(), Aircraft.compute_climb(), ...), which abort on the first
+    bad leg and are disabled under python -O. Plans whose legs are all 0 can be evaluated with validation skipped
+    (e.g., FlightPlan(..., validate=False)); the others can be filtered out with valid_plans() and PlanTable.take().
+
+    The envelope and direction checks apply to the climb and descent legs, which use the performance models. Fuel
+    is checked if an aircraft is given: the fuel burned by the end of each leg (the table's fuel_gal if it was
+    evaluated, otherwise solved from the wind triangle) must leave the reserve on board.
+
+    :param table: the plans to validate
+    :param aircraft: the aircraft flying every plan, None to skip the fuel check
+    :param reserve_min: fuel reserve, in minutes at the fuel rate of the aircraft
+    :param fuel_on_board: (N,) fuel at departure (gal), the fuel capacity of the aircraft if None
+    :return: (N, M) uint16 violation bits of each leg, 0 for padded legs
+    """
+    valid = table.valid
+    violations = np.zeros(table.shape, dtype=np.uint16)
+
+    finite = np.logical_and.reduce([np.isfinite(getattr(table, name)) for name in INPUT_COLUMNS])
+    malformed = ~finite | ~np.isin(table.kind, (LEG_CRUISE, LEG_CLIMB, LEG_DESCEND)) | \
+        ~(table.distance > 0) | ~(table.true_airspeed > 0) | ~(table.wind_speed >= 0)
+    violations[malformed] |= INVALID_INPUT
+
+    maneuver = (table.kind == LEG_CLIMB) | (table.kind == LEG_DESCEND)
+    temperature_envelope = atmospheric_envelope_mask(table.temperature, 0)
+    altitude_envelope = atmospheric_envelope_mask(0, table.start_altitude) & \
+        atmospheric_envelope_mask(0, table.end_altitude)
+    violations[maneuver & ~temperature_envelope] |= TEMPERATURE_ENVELOPE
+    violations[maneuver & ~altitude_envelope] |= ALTITUDE_ENVELOPE
+    violations[(table.kind == LEG_CLIMB) & ~(table.start_altitude < table.end_altitude)] |= CLIMB_DIRECTION
+    violations[(table.kind == LEG_DESCEND) & ~(table.start_altitude > table.end_altitude)] |= DESCENT_DIRECTION
+
+    # continuity with the previous leg of the same plan
+    continuous = np.ones(table.shape, dtype=bool)
+    continuous[:, 1:] = np.abs(table.start_altitude[:, 1:] - table.end_altitude[:, :-1]) <= ALTITUDE_TOLERANCE
+    violations[~continuous] |= ALTITUDE_DISCONTINUITY
+    if table.from_waypoints is not None and table.to_waypoints is not None:
+        connected = np.ones(table.shape, dtype=bool)
+        connected[:, 1:] = table.from_waypoints[:, 1:] == table.to_waypoints[:, :-1]
+        violations[~connected] |= ROUTE_DISCONTINUITY
+
+    if aircraft is not None:
+        profile = aircraft.performance_profile
+        fuel_gal = table.fuel_gal
+        if fuel_gal is None:
+            _, ground_speed, _, _ = compute_wind_triangle(table.true_course, table.true_airspeed,
+                                                         table.wind_direction, table.wind_speed)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fuel_gal = profile["fuel_rate_gph"] / 60 * table.distance / ground_speed * 60
+        if fuel_on_board is None:
+            fuel_on_board = np.full(len(table), float(profile["fuel_capacity_g"]))
+        usable = np.asarray(fuel_on_board, dtype=float) - reserve_min / 60 * profile["fuel_rate_gph"]
+        burned = np.cumsum(np.where(valid, fuel_gal, 0.0), axis=1)
+        violations[burned > usable[:, np.newaxis]] |= INSUFFICIENT_FUEL
+
+    violations[table.n_legs < 2] |= TOO_FEW_LEGS
+    violations[~valid] = 0
+    return violations
+
+
+def valid_plans(violations: np.ndarray, ignore: int = 0) -> np.ndarray:
+    """
+    :param violations: (N, M) violation bits returned by validate_plan_table()
+    :param ignore: violation bits to disregard (e.g., INSUFFICIENT_FUEL)
+    :return: (N,) True for the plans without any violation
+    """
+    return ~np.any(violations & ~np.uint16(ignore), axis=1)
+
+
+def describe_violations(code: int) -> list[str]:
+    """
+    :param code: the violation bits of a leg
+    :return: descriptions of the violations, in the order of VIOLATION_NAMES
+    """
+    return [description for bit, description in VIOLATION_NAMES.items() if int(code) & bit]
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from classes.legs import Leg
+from classes.plan_stream import MalformedRecordError, parse_leg, evaluate_plans
+from classes.registry import AircraftRegistry
+
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8273
+DEFAULT_AIRCRAFT: str = "N8273V"
+DEFAULT_MAX_BATCH_SIZE: int = 256
+DEFAULT_MAX_BATCH_DELAY: float = 0.005
+DEFAULT_MAX_PENDING: int = 4096
+MAX_BODY_SIZE: int = 2 ** 20
+
+
+class PlanningServer:
+    """
+    Local HTTP/JSON planning service. Clients POST a plan to /evaluate:
+
+        {"aircraft": "N8273V", "legs": [{"kind": "Climb", "from_waypoint": "KPDK", "to_waypoint": "TOC",
+                                         "distance": 15, ...}, ...]}
+
+    with the leg records of classes.plan_stream (without plan_id), and get the evaluated legs and the plan totals
+    back. "aircraft" is a call sign of the registry, and defaults to the server's default aircraft.
+
+    Concurrent requests are collected into micro-batches: a batch is closed when it has max_batch_size plans or
+    max_batch_delay seconds after its first plan, and is evaluated with the PlanTable engine in a worker thread,
+    so the event loop keeps accepting requests meanwhile. At most max_pending plans wait for a batch; further
+    requests are shed with 503 Service Unavailable (and a Retry-After header) instead of queueing without bound.
+    GET /health returns the queue depth and batching statistics.
+    """
+    def __init__(self, registry: AircraftRegistry | None = None, default_aircraft: str = DEFAULT_AIRCRAFT,
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_batch_delay: float = DEFAULT_MAX_BATCH_DELAY, max_pending: int = DEFAULT_MAX_PENDING) -> None:
+        """
+        :param registry: aircraft registry, defaults to the profiles of aircraft/profiles
+        :param default_aircraft: call sign used by requests without "aircraft"
+        :param host: interface to listen on
+        :param port: port to listen on, 0 for any free port (see port once started)
+        :param max_batch_size: maximum number of plans evaluated in one batch
+        :param max_batch_delay: maximum time (s) the first plan of a batch waits for more plans
+        :param max_pending: maximum number of plans waiting for a batch
+        """
+        assert max_batch_size > 0, "max_batch_size must be positive."
+        assert max_batch_delay >= 0, "max_batch_delay must not be negative."
+        assert max_pending > 0, "max_pending must be positive."
+
+        self.registry: AircraftRegistry = AircraftRegistry() if registry is None else registry
+        self.default_aircraft: str = default_aircraft
+        self.host: str = host
+        self.port: int = port
+        self.max_batch_size: int = max_batch_size
+        self.max_batch_delay: float = max_batch_delay
+        self.max_pending: int = max_pending
+
+        self.stats: dict = {"requests": 0, "shed": 0, "batches": 0, "batched_plans": 0, "max_batch_size": 0}
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._executor: ThreadPoolExecutor | None = None
+        self._server: asyncio.Server | None = None
+        self._batcher: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """
+        Starts listening and batching.
+
+        :return: None
+        """
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planning-batch")
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """
+        Stops listening and batching. Plans still waiting for a batch are answered with 503.
+
+        :return: None
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_result((HTTPStatus.SERVICE_UNAVAILABLE, {"error": "server is shutting down"}))
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def handle_request(self, method: str, path: str, body: bytes) -> tuple[HTTPStatus, dict]:
+        """
+        :param method: HTTP method
+        :param path: request target
+        :param body: request body
+        :return: the status and the JSON payload of the reply
+        """
+        if path == "/health":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use GET"}
+            return HTTPStatus.OK, {"pending": self._queue.qsize(), **self.stats}
+
+        if path != "/evaluate":
+            return HTTPStatus.NOT_FOUND, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use POST"}
+
+        self.stats["requests"] += 1
+        try:
+            callsign, legs = parse_plan_request(body, self.default_aircraft)
+        except MalformedRecordError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        if callsign not in self.registry:
+            return HTTPStatus.NOT_FOUND, {"error": f"unknown aircraft {callsign}"}
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((callsign, legs, future))
+        except asyncio.QueueFull:
+            self.stats["shed"] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "server is busy"}
+        return await future
+
+    def evaluate_batch(self, requests: list[tuple[str, list[Leg]]]) -> list[tuple[HTTPStatus, dict]]:
+        """
+        Evaluates a batch of plans, one PlanTable pass per aircraft.
+
+        :param requests: call sign and legs of every plan
+        :return: the status and the JSON payload of the reply to every plan
+        """
+        replies = [(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "plan was not evaluated"})] * len(requests)
+        for callsign in dict.fromkeys(callsign for callsign, _ in requests):
+            indices = [i for i, (request_callsign, _) in enumerate(requests) if request_callsign == callsign]
+            rows = {i: [] for i in indices}
+            rejects = {}
+
+            def reject(entry: dict) -> None:
+                rejects[int(entry["plan_id"])] = entry["reason"]
+
+            aircraft = self.registry[callsign]
+            plans = ((str(i), requests[i][1]) for i in indices)
+            for row in evaluate_plans(plans, aircraft, reject, batch_size=len(indices)):
+                rows[int(row.pop("plan_id"))].append(row)
+
+            for i in indices:
+                if i in rejects:
+                    replies[i] = HTTPStatus.UNPROCESSABLE_ENTITY, {"error": rejects[i]}
+                    continue
+                replies[i] = HTTPStatus.OK, {"aircraft": callsign,
+                                             "total_time_min": sum(row["time_min"] for row in rows[i]),
+                                             "total_distance_nm": sum(row["distance_nm"] for row in rows[i]),
+                                             "total_fuel_gal": sum(row["fuel_gal"] for row in rows[i]),
+                                             "legs": rows[i]}
+        return replies
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_batch_delay
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.stats["batches"] += 1
+            self.stats["batched_plans"] += len(batch)
+            self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+            try:
+                replies = await loop.run_in_executor(self._executor, self.evaluate_batch,
+                                                     [(callsign, legs) for callsign, legs, _ in batch])
+            except Exception as error:
+                replies = [(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)})] * len(batch)
+
+            for (_, _, future), reply in zip(batch, replies):
+                if not future.done():
+                    future.set_result(reply)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "malformed request line"},
+                                         keep_alive=False)
+                    break
+
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0) or 0)
+                if length > MAX_BODY_SIZE:
+                    await write_response(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                         {"error": f"body is larger than {MAX_BODY_SIZE} bytes"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length)
+
+                status, payload = await self.handle_request(method, path, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def parse_plan_request(body: bytes, default_aircraft: str) -> tuple[str, list[Leg]]:
+    """
+    :param body: JSON body of an /evaluate request
+    :param default_aircraft: call sign used if the request has no "aircraft"
+    :return: the call sign and the legs of the plan
+    """
+    try:
+        request = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise MalformedRecordError("body is not valid JSON") from None
+    if not isinstance(request, dict) or not isinstance(request.get("legs"), list):
+        raise MalformedRecordError("body must be a JSON object with a list of legs")
+
+    legs = []
+    for i, record in enumerate(request["legs"]):
+        if not isinstance(record, dict):
+            raise MalformedRecordError(f"leg {i}: record is not a JSON object")
+        try:
+            _, leg = parse_leg({**record, "plan_id": "request"})
+        except MalformedRecordError as error:
+            raise MalformedRecordError(f"leg {i}: {error}") from None
+        legs.append(leg)
+    return str(request.get("aircraft") or default_aircraft), legs
+
+
+async def write_response(writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict, keep_alive: bool) -> None:
+    """
+    :param writer: the connection
+    :param status: HTTP status
+    :param payload: JSON payload
+    :param keep_alive: keep the connection open for further requests
+    :return: None
+    """
+    body = json.dumps(payload).encode()
+    headers = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-Type: application/json",
+               f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if status == HTTPStatus.SERVICE_UNAVAILABLE:
+        headers.append("Retry-After: 1")
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves plan evaluation requests over HTTP/JSON, in micro-batches.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--aircraft", default=DEFAULT_AIRCRAFT, help="default aircraft call sign")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="maximum number of plans per batch")
+    parser.add_argument("--batch-delay-ms", type=float, default=DEFAULT_MAX_BATCH_DELAY * 1e3,
+                        help="maximum time the first plan of a batch waits for more plans (ms)")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="maximum number of plans waiting for a batch before requests are shed")
+    args = parser.parse_args()
+
+    server = PlanningServer(default_aircraft=args.aircraft, host=args.host, port=args.port,
+                            max_batch_size=args.batch_size, max_batch_delay=args.batch_delay_ms / 1e3,
+                            max_pending=args.max_pending)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
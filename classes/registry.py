@@ -0,0 +1,217 @@
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+from classes.aircraft import Aircraft
+from common.array_file import save_array, load_array
+from models.modeling.model_artifact import data_hash, load_models
+from models.performance_grid import MODEL_NAMES
+
+PROFILE_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "aircraft", "profiles")
+PROFILE_SUFFIX: str = ".json"
+STORE_NAME: str = "fleet_models.npy"
+
+
+class AircraftRegistry:
+    """
+    Aircraft discovered from profile files, one "<callsign>.json" per aircraft:
+
+        {"category": "Airplane", "class": "SEI", "type": "PA-28-181", "callsign": "N8273V",
+         "performance_profile": {"climb_speed_kts": 76, ..., "mag_dev_lookup": {"0": -1, "30": 0, ...}},
+         "models": {"charts": "../../models/modeling/data"}}
+
+    "models" either holds the coefficients of every model of models.performance_grid.MODEL_NAMES, or "charts", a
+    chart directory (relative to the profile) fitted with models/modeling/fit_models.py.
+
+    The registry only lists the profile directory when created. A profile is read, and its aircraft built, the
+    first time its call sign is requested. When a fleet coefficient store is open (see build_store()), the climb
+    and descent models are read-only views of a single memory-mapped (n_aircraft, 6, order + 1) array, so the
+    pages are shared by every process mapping the store. Pickling a registry (e.g., to send it to pool workers)
+    only pickles the paths; the store is mapped again on the other side.
+    """
+    def __init__(self, profile_dir: str = PROFILE_DIR, store_path: str | None = None) -> None:
+        """
+        :param profile_dir: directory of the profile files
+        :param store_path: fleet coefficient store, opened if it exists
+        """
+        self.profile_dir: str = profile_dir
+        self.profile_paths: dict[str, str] = {entry.name[:-len(PROFILE_SUFFIX)]: entry.path
+                                              for entry in os.scandir(profile_dir)
+                                              if entry.name.endswith(PROFILE_SUFFIX) and entry.is_file()}
+        self.store_path: str | None = store_path
+        self.store: np.ndarray | None = None
+        self.store_rows: dict[str, int] = {}
+        self.store_digests: dict[str, str] = {}
+        self._aircraft: dict[str, Aircraft] = {}
+
+        if store_path is not None and os.path.exists(store_path):
+            self.open_store(store_path)
+
+    def __len__(self) -> int:
+        return len(self.profile_paths)
+
+    def __contains__(self, callsign: str) -> bool:
+        return callsign in self.profile_paths
+
+    def __iter__(self):
+        return iter(sorted(self.profile_paths))
+
+    def __getitem__(self, callsign: str) -> Aircraft:
+        return self.get(callsign)
+
+    def __getstate__(self) -> dict:
+        return {"profile_dir": self.profile_dir, "store_path": self.store_path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["profile_dir"], state["store_path"])
+
+    @property
+    def loaded(self) -> list[str]:
+        """
+        :return: the call signs of the aircraft built so far
+        """
+        return list(self._aircraft)
+
+    def get(self, callsign: str) -> Aircraft:
+        """
+        :param callsign: the call sign (tail number) of the aircraft
+        :return: the aircraft, built from its profile on the first request
+        """
+        aircraft = self._aircraft.get(callsign)
+        if aircraft is None:
+            aircraft = self._aircraft[callsign] = self.load(callsign)
+        return aircraft
+
+    def read_profile(self, callsign: str) -> dict:
+        """
+        :param callsign: the call sign (tail number) of the aircraft
+        :return: the parsed profile file, with numeric mag_dev_lookup headings
+        """
+        assert callsign in self.profile_paths, f"No profile for {callsign} in {self.profile_dir}."
+        with open(self.profile_paths[callsign]) as file:
+            profile = json.load(file)
+
+        performance_profile = profile["performance_profile"]
+        if "mag_dev_lookup" in performance_profile:
+            performance_profile["mag_dev_lookup"] = {float(heading): correction for heading, correction in
+                                                     performance_profile["mag_dev_lookup"].items()}
+        return profile
+
+    def read_models(self, callsign: str, profile: dict | None = None) -> np.ndarray:
+        """
+        :param callsign: the call sign (tail number) of the aircraft
+        :param profile: the parsed profile, read if None
+        :return: (6, order + 1) coefficients of the climb and descent models, ordered as MODEL_NAMES (models of
+                 lower order are padded with leading zeros)
+        """
+        profile = self.read_profile(callsign) if profile is None else profile
+        models = profile["models"]
+        if "charts" in models:
+            models = load_models(data_dir=self._charts_dir(callsign, profile))
+        coefficients = [np.asarray(models[name], dtype=float) for name in MODEL_NAMES]
+        padded = np.zeros((len(coefficients), max(len(model) for model in coefficients)))
+        for row, model in zip(padded, coefficients):
+            row[len(row) - len(model):] = model
+        return padded
+
+    def models_digest(self, callsign: str, profile: dict | None = None) -> str:
+        """
+        :return: a hash of the model source of the profile, used to detect profiles changed since the store was
+                 built (a chart directory is hashed by its contents)
+        """
+        profile = self.read_profile(callsign) if profile is None else profile
+        models = profile["models"]
+        if "charts" in models:
+            models = {"charts": data_hash(self._charts_dir(callsign, profile))}
+        return hashlib.sha256(json.dumps(models, sort_keys=True).encode()).hexdigest()
+
+    def load(self, callsign: str, aircraft: Aircraft | None = None) -> Aircraft:
+        """
+        Builds an aircraft from its profile, bypassing the cache of get(). The models are taken from the store if
+        it holds the current models of the aircraft, and from the profile otherwise.
+
+        :param callsign: the call sign (tail number) of the aircraft
+        :param aircraft: an instance to initialize from the profile (e.g., from the constructor of a subclass such
+            as aircraft.N8273V), a new Aircraft if None
+        :return: the aircraft
+        """
+        profile = self.read_profile(callsign)
+        arguments = {"category": profile["category"],
+                     "class_": profile["class"],
+                     "type": profile["type"],
+                     "callsign": profile.get("callsign", callsign),
+                     "performance_profile": profile["performance_profile"]}
+        if aircraft is None:
+            aircraft = Aircraft(**arguments)
+        else:
+            Aircraft.__init__(aircraft, **arguments)
+
+        row = self.store_rows.get(callsign)
+        if row is not None and self.store_digests[callsign] == self.models_digest(callsign, profile):
+            models = self.store[row].view(np.ndarray)
+        else:
+            models = self.read_models(callsign, profile)
+
+        for name, model in zip(MODEL_NAMES, models):
+            setattr(aircraft, f"{name}_model", model)
+        return aircraft
+
+    def build_store(self, store_path: str | None = None) -> str:
+        """
+        Writes the models of every profile into a single .npy array, followed by its index (the call sign and
+        models digest of every row, see common.array_file.save_array()), and opens it.
+        Models of lower order are padded with leading zero coefficients (which np.polyval evaluates exactly).
+
+        :param store_path: path of the store, defaults to STORE_NAME in the profile directory
+        :return: the path of the store
+        """
+        store_path = os.path.join(self.profile_dir, STORE_NAME) if store_path is None else store_path
+        callsigns = list(self)
+        profiles = [self.read_profile(callsign) for callsign in callsigns]
+        models = [self.read_models(callsign, profile) for callsign, profile in zip(callsigns, profiles)]
+
+        order = max((model.shape[1] for model in models), default=1)
+        store = np.zeros((len(models), len(MODEL_NAMES), order), dtype=float)
+        for row, model in enumerate(models):
+            store[row, :, order - model.shape[1]:] = model
+
+        index = {"callsigns": callsigns,
+                 "digests": [self.models_digest(callsign, profile) for callsign, profile in zip(callsigns, profiles)]}
+
+        # the array and its index are replaced as one file, so processes mapping the previous store keep a
+        # consistent view
+        save_array(store_path, store, index)
+
+        self._aircraft.clear()
+        self.open_store(store_path)
+        return store_path
+
+    def open_store(self, store_path: str) -> None:
+        """
+        Memory-maps a fleet coefficient store.
+
+        :param store_path: path of the store
+        :return: None
+        """
+        store, index = load_array(store_path)
+
+        self.store_path = store_path
+        self.store = store
+        self.store_rows = {callsign: row for row, callsign in enumerate(index["callsigns"])}
+        self.store_digests = dict(zip(index["callsigns"], index["digests"]))
+
+    def _charts_dir(self, callsign: str, profile: dict) -> str:
+        return os.path.normpath(os.path.join(os.path.dirname(self.profile_paths[callsign]),
+                                             profile["models"]["charts"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds the fleet coefficient store of a profile directory.")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="directory of the profile files")
+    parser.add_argument("--store", default=None, help=f"path of the store (default: <profile-dir>/{STORE_NAME})")
+    args = parser.parse_args()
+
+    registry = AircraftRegistry(args.profile_dir)
+    path = registry.build_store(args.store)
+    print(f"Models of {len(registry)} aircraft written to {path}")
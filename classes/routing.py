@@ -0,0 +1,288 @@
+import heapq
+import numpy as np
+from classes.aircraft import Aircraft
+from classes.flightplan import FlightPlan
+from classes.legs import Leg, Climb, Cruise, Descend
+from classes.waypoint_database import WaypointDatabase
+from classes.waypoints import Waypoint
+from models.geodesy import great_circle, intermediate_point, distance_to_chord
+from models.magnetic_variation import MagneticVariationGrid
+from models.wind_field import WindField
+from models.winds import compute_wind_triangle
+from models.winds_aloft import WindsAloft
+
+ROUTE_OBJECTIVES: tuple = ("time", "fuel")
+
+
+class WaypointGraph:
+    """
+    Graph of waypoints (with positions) and the edges allowed between them (e.g., airways, or any pair of waypoints
+    within a maximum leg length), stored in compressed sparse row form. The course and distance of every edge are
+    computed once, in bulk.
+    """
+    def __init__(self, waypoints: list[Waypoint], edges: np.ndarray, bidirectional: bool = True) -> None:
+        """
+        :param waypoints: the waypoints, every waypoint must have a position
+        :param edges: (E, 2) indices of the from and to waypoints of every allowed edge
+        :param bidirectional: also allow every edge in the opposite direction
+        """
+        assert all(waypoint.has_position for waypoint in waypoints), "Every waypoint must have a position."
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        assert np.all((edges >= 0) & (edges < len(waypoints))), "Edge waypoint index out of range."
+        if bidirectional:
+            edges = np.concatenate([edges, edges[:, ::-1]])
+        edges = edges[edges[:, 0] != edges[:, 1]]
+
+        order = np.lexsort((edges[:, 1], edges[:, 0]))
+        self.waypoints: list[Waypoint] = waypoints
+        self.edge_sources: np.ndarray = edges[order, 0]
+        self.edge_targets: np.ndarray = edges[order, 1]
+        self.offsets: np.ndarray = np.searchsorted(self.edge_sources, np.arange(len(waypoints) + 1))
+        self._indices: dict[str, int] = {waypoint.name: i for i, waypoint in enumerate(waypoints)}
+
+        self.latitudes: np.ndarray = np.array([waypoint.latitude for waypoint in waypoints], dtype=float)
+        self.longitudes: np.ndarray = np.array([waypoint.longitude for waypoint in waypoints], dtype=float)
+        self.edge_courses, self.edge_distances = great_circle(
+            self.latitudes[self.edge_sources], self.longitudes[self.edge_sources],
+            self.latitudes[self.edge_targets], self.longitudes[self.edge_targets])
+
+    @classmethod
+    def from_database(cls, database: WaypointDatabase, edges: list[tuple[str, str]],
+                      bidirectional: bool = True) -> "WaypointGraph":
+        """
+        :param database: the waypoint database
+        :param edges: (from identifier, to identifier) of every allowed edge
+        :param bidirectional: also allow every edge in the opposite direction
+        :return: the graph of the waypoints used by the edges
+        """
+        identifiers = list(dict.fromkeys(identifier for edge in edges for identifier in edge))
+        indices = {identifier: i for i, identifier in enumerate(identifiers)}
+        return cls(database.route(identifiers), [(indices[a], indices[b]) for a, b in edges], bidirectional)
+
+    @classmethod
+    def within_range(cls, database: WaypointDatabase, max_distance: float) -> "WaypointGraph":
+        """
+        :param database: the waypoint database
+        :param max_distance: maximum length of an edge in nautical miles
+        :return: the graph of every waypoint of the database, with an edge between every pair of waypoints closer
+                 than max_distance
+        """
+        points = database.tree.points
+        radius = float(distance_to_chord(max_distance))
+        edges = []
+        for i in range(len(database)):
+            _, neighbours = database.tree.query_radius(points[i], radius)
+            neighbours = neighbours[neighbours > i]
+            edges.append(np.stack([np.full(len(neighbours), i), neighbours], axis=1))
+        edges = np.concatenate(edges) if edges else np.zeros((0, 2), dtype=np.int64)
+        return cls(database.waypoints, edges, bidirectional=True)
+
+    def __len__(self) -> int:
+        return len(self.waypoints)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edge_sources)
+
+    def index(self, name: str) -> int:
+        """
+        :param name: waypoint name
+        :return: index of the waypoint in the graph
+        """
+        index = self._indices.get(name)
+        if index is None:
+            raise KeyError(f"No waypoint {name} in the graph.")
+        return index
+
+    def shortest_path(self, origin: int, destination: int, costs: np.ndarray,
+                      heuristic: np.ndarray | None = None) -> tuple[list[int], float]:
+        """
+        A* search (Dijkstra's algorithm without a heuristic) over the edges.
+
+        :param origin: index of the origin waypoint
+        :param destination: index of the destination waypoint
+        :param costs: (E,) non-negative cost of every edge, in the order of edge_sources/edge_targets; edges with an
+                      infinite or NaN cost are not used
+        :param heuristic: (W,) lower bound of the cost from every waypoint to the destination, must be admissible
+        :return: path: indices of the waypoints of the cheapest path, empty if the destination is unreachable
+        :return: cost: total cost of the path (inf if unreachable)
+        """
+        costs = np.where(np.isnan(costs), np.inf, costs).tolist()
+        heuristic = [0.0] * len(self) if heuristic is None else np.asarray(heuristic, dtype=float).tolist()
+        offsets = self.offsets.tolist()
+        targets = self.edge_targets.tolist()
+
+        best = [np.inf] * len(self)
+        previous = [-1] * len(self)
+        closed = [False] * len(self)
+        best[origin] = 0.0
+        queue = [(heuristic[origin], origin)]
+
+        while queue:
+            _, node = heapq.heappop(queue)
+            if closed[node]:
+                continue
+            if node == destination:
+                break
+            closed[node] = True
+
+            cost = best[node]
+            for edge in range(offsets[node], offsets[node + 1]):
+                target = targets[edge]
+                candidate = cost + costs[edge]
+                if candidate < best[target]:
+                    best[target] = candidate
+                    previous[target] = node
+                    heapq.heappush(queue, (candidate + heuristic[target], target))
+
+        if best[destination] == np.inf:
+            return [], np.inf
+
+        path = [destination]
+        while path[-1] != origin:
+            path.append(previous[path[-1]])
+        return path[::-1], best[destination]
+
+
+def sample_winds(winds: WindsAloft | WindField, from_latitude: np.ndarray, from_longitude: np.ndarray,
+                 to_latitude: np.ndarray, to_longitude: np.ndarray, start_altitude: np.ndarray,
+                 end_altitude: np.ndarray, time: float = 0.0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Samples the winds and temperature of many legs at once, at the middle of each leg.
+
+    :param winds: winds aloft at a single location, or a gridded forecast
+    :param time: time of the legs in hours, only used by gridded forecasts
+    :return: wind_direction: wind direction in degrees
+    :return: wind_speed: wind speed in kts
+    :return: temperature: outside temperature (F)
+    """
+    if isinstance(winds, WindField):
+        return winds.sample_legs(from_latitude, from_longitude, to_latitude, to_longitude, start_altitude,
+                                 end_altitude, time)
+    altitude = (np.asarray(start_altitude, dtype=float) + np.asarray(end_altitude, dtype=float)) / 2
+    return winds.sample(np.broadcast_to(altitude, np.broadcast_shapes(np.shape(from_latitude), np.shape(altitude))))
+
+
+def compute_edge_costs(graph: WaypointGraph, aircraft: Aircraft, winds: WindsAloft | WindField,
+                       altitude: float, objective: str = "time", time: float = 0.0,
+                       true_airspeed: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the cost of flying every edge of the graph at a cruise altitude, in one vectorized pass.
+
+    :param graph: the waypoint graph
+    :param aircraft: the aircraft
+    :param winds: winds aloft at a single location, or a gridded forecast
+    :param altitude: cruise pressure altitude (ft)
+    :param objective: "time" (min) or "fuel" (gal)
+    :param time: time of the flight in hours, only used by gridded forecasts
+    :param true_airspeed: cruise true airspeed in kts, the cruise speed of the aircraft if None
+    :return: costs: (E,) cost of every edge, inf where the ground speed is zero
+    :return: heuristic_speed: an upper bound of the ground speed on every edge (kts)
+    """
+    assert objective in ROUTE_OBJECTIVES, f"objective must be one of {ROUTE_OBJECTIVES}."
+    true_airspeed = aircraft.performance_profile["cruise_speed_kts"] if true_airspeed is None else true_airspeed
+
+    sources, targets = graph.edge_sources, graph.edge_targets
+    wind_direction, wind_speed, _ = sample_winds(winds, graph.latitudes[sources], graph.longitudes[sources],
+                                                 graph.latitudes[targets], graph.longitudes[targets],
+                                                 altitude, altitude, time)
+    _, ground_speed, _, _ = compute_wind_triangle(graph.edge_courses, true_airspeed, wind_direction, wind_speed)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        costs = np.where(ground_speed > 0, graph.edge_distances / ground_speed * 60, np.inf)
+    if objective == "fuel":
+        costs = costs * aircraft.performance_profile["fuel_rate_gph"] / 60
+
+    heuristic_speed = true_airspeed + (float(np.max(wind_speed)) if len(wind_speed) else 0.0)
+    return costs, heuristic_speed
+
+
+def find_route(graph: WaypointGraph, aircraft: Aircraft, origin: str, destination: str,
+               winds: WindsAloft | WindField, cruise_altitude: float, departure_altitude: float,
+               arrival_altitude: float, objective: str = "time", time: float = 0.0, mag_var: float | None = None,
+               mag_var_grid: MagneticVariationGrid | None = None) -> FlightPlan | None:
+    """
+    Finds the minimum time or minimum fuel route between two waypoints of the graph at a cruise altitude, under the
+    current winds. The edge costs are computed up front (see compute_edge_costs()) and the route is searched with
+    A*, using the great circle distance to the destination flown at the cruise airspeed plus the strongest wind as
+    an admissible heuristic.
+
+    The route is returned as a Climb leg on the first edge, Cruise legs and a Descend leg on the last edge (a
+    single-edge route is split at its middle), with the winds sampled at the mean altitude of every leg.
+
+    :param graph: the waypoint graph
+    :param aircraft: the aircraft
+    :param origin: name of the origin waypoint
+    :param destination: name of the destination waypoint
+    :param winds: winds aloft at a single location, or a gridded forecast
+    :param cruise_altitude: cruise pressure altitude (ft)
+    :param departure_altitude: pressure altitude at the origin (ft)
+    :param arrival_altitude: pressure altitude at the destination (ft)
+    :param objective: "time" or "fuel"
+    :param time: time of the flight in hours, only used by gridded forecasts
+    :param mag_var: magnetic variation of every leg in degrees, or None to interpolate it from mag_var_grid
+    :param mag_var_grid: magnetic variation table, required if mag_var is None
+    :return: the flight plan (not yet evaluated), None if the destination is unreachable
+    """
+    origin_index = graph.index(origin)
+    destination_index = graph.index(destination)
+    assert origin_index != destination_index, "The origin and destination must be different waypoints."
+
+    costs, heuristic_speed = compute_edge_costs(graph, aircraft, winds, cruise_altitude, objective, time)
+    _, remaining_distance = great_circle(graph.latitudes, graph.longitudes, graph.latitudes[destination_index],
+                                         graph.longitudes[destination_index])
+    heuristic = remaining_distance / heuristic_speed * 60
+    if objective == "fuel":
+        heuristic = heuristic * aircraft.performance_profile["fuel_rate_gph"] / 60
+
+    path, _ = graph.shortest_path(origin_index, destination_index, costs, heuristic)
+    if not path:
+        return None
+
+    waypoints = [graph.waypoints[i] for i in path]
+    if len(waypoints) == 2:
+        latitude, longitude = intermediate_point(waypoints[0].latitude, waypoints[0].longitude,
+                                                 waypoints[1].latitude, waypoints[1].longitude)
+        waypoints.insert(1, Waypoint("Top of Climb", float(latitude), float(longitude)))
+
+    return build_route_plan(waypoints, aircraft, winds, cruise_altitude, departure_altitude, arrival_altitude,
+                            time, mag_var, mag_var_grid)
+
+
+def build_route_plan(waypoints: list[Waypoint], aircraft: Aircraft, winds: WindsAloft | WindField,
+                     cruise_altitude: float, departure_altitude: float, arrival_altitude: float, time: float = 0.0,
+                     mag_var: float | None = None, mag_var_grid: MagneticVariationGrid | None = None) -> FlightPlan:
+    """
+    :param waypoints: the waypoints of the route (at least three), with positions
+    :return: a flight plan climbing on the first leg, cruising and descending on the last leg, with the winds of
+             every leg sampled in one pass (see find_route() for the other parameters)
+    """
+    assert len(waypoints) >= 3, "The route must have at least three waypoints."
+    n_legs = len(waypoints) - 1
+    start_altitude = np.full(n_legs, float(cruise_altitude))
+    end_altitude = start_altitude.copy()
+    start_altitude[0] = departure_altitude
+    end_altitude[-1] = arrival_altitude
+
+    wind_direction, wind_speed, temperature = sample_winds(
+        winds, [waypoint.latitude for waypoint in waypoints[:-1]], [waypoint.longitude for waypoint in waypoints[:-1]],
+        [waypoint.latitude for waypoint in waypoints[1:]], [waypoint.longitude for waypoint in waypoints[1:]],
+        start_altitude, end_altitude, time)
+
+    profile = aircraft.performance_profile
+    legs: list[Leg] = []
+    for i in range(n_legs):
+        arguments = dict(from_waypoint=waypoints[i], to_waypoint=waypoints[i + 1], distance=None, true_course=None,
+                         wind_direction=float(wind_direction[i]), wind_speed=float(wind_speed[i]),
+                         temperature=float(temperature[i]), mag_var=mag_var, mag_var_grid=mag_var_grid)
+        if i == 0:
+            legs.append(Climb(true_airspeed=profile["climb_speed_kts"], start_altitude=float(start_altitude[i]),
+                              end_altitude=float(end_altitude[i]), **arguments))
+        elif i == n_legs - 1:
+            legs.append(Descend(true_airspeed=profile["descend_speed_kts"], start_altitude=float(start_altitude[i]),
+                                end_altitude=float(end_altitude[i]), **arguments))
+        else:
+            legs.append(Cruise(true_airspeed=profile["cruise_speed_kts"], altitude=float(cruise_altitude),
+                               **arguments))
+
+    return FlightPlan(legs, aircraft=aircraft)
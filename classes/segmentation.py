@@ -0,0 +1,300 @@
+import numpy as np
+from classes.aircraft import Aircraft
+from classes.flightplan import FlightPlan
+from classes.legs import Leg, Climb, Cruise, Descend
+from classes.plan_table import PlanTable, LEG_CRUISE, LEG_CLIMB, LEG_DESCEND, reverse_cumsum_exclusive
+from classes.waypoints import Waypoint
+from models.geodesy import intermediate_point
+from models.winds import compute_wind_triangle
+
+# breakpoint origin codes of the inserted points, original route points use the index of the point (0 to M)
+TOP_OF_CLIMB: int = -1
+TOP_OF_DESCENT: int = -2
+BREAKPOINT_NAMES: dict = {TOP_OF_CLIMB: "Top of Climb", TOP_OF_DESCENT: "Top of Descent"}
+
+# breakpoints closer than this (nm) are merged, e.g. a top of climb falling on a route waypoint
+MERGE_TOLERANCE: float = 1e-9
+
+
+class Segmentation:
+    """
+    Climb/cruise/descent segmentation of N routes. Every route is cut at its original waypoints and at its top of
+    climb and top of descent, into up to M + 2 segments (padded like a PlanTable).
+    """
+    def __init__(self, breakpoints: np.ndarray, origins: np.ndarray, n_segments: np.ndarray, source: np.ndarray,
+                 kind: np.ndarray, altitudes: np.ndarray, top_of_climb: np.ndarray, top_of_descent: np.ndarray,
+                 feasible: np.ndarray) -> None:
+        """
+        :param breakpoints: (N, M + 3) distance of every breakpoint from the start of the route (nm)
+        :param origins: (N, M + 3) index of the route point of every breakpoint, TOP_OF_CLIMB or TOP_OF_DESCENT
+        :param n_segments: (N,) number of segments of every route
+        :param source: (N, M + 2) index of the route leg each segment is cut from
+        :param kind: (N, M + 2) leg kind code of every segment
+        :param altitudes: (N, M + 3) pressure altitude at every breakpoint (ft)
+        :param top_of_climb: (N,) distance of the top of climb from the start of the route (nm)
+        :param top_of_descent: (N,) distance of the top of descent from the start of the route (nm)
+        :param feasible: (N,) False where the climb and descent do not fit in the route
+        """
+        self.breakpoints: np.ndarray = breakpoints
+        self.origins: np.ndarray = origins
+        self.n_segments: np.ndarray = n_segments
+        self.source: np.ndarray = source
+        self.kind: np.ndarray = kind
+        self.altitudes: np.ndarray = altitudes
+        self.top_of_climb: np.ndarray = top_of_climb
+        self.top_of_descent: np.ndarray = top_of_descent
+        self.feasible: np.ndarray = feasible
+
+    @property
+    def distance(self) -> np.ndarray:
+        """
+        :return: (N, M + 2) length of every segment (nm)
+        """
+        return np.diff(self.breakpoints, axis=1)
+
+
+def solve_segmentation(aircraft: Aircraft, distance: np.ndarray, true_course: np.ndarray,
+                       wind_direction: np.ndarray, wind_speed: np.ndarray, temperature: np.ndarray,
+                       departure_altitude: np.ndarray, cruise_altitude: np.ndarray, arrival_altitude: np.ndarray,
+                       n_legs: np.ndarray | None = None) -> Segmentation:
+    """
+    Places the top of climb and top of descent of N routes of up to M legs at once. The climb and descent times
+    come from the aircraft's climb and descent models (at the temperature of the first and last leg). They are
+    flown at the climb and descent airspeeds of the performance profile, at the wind-adjusted ground speed of each
+    leg they cover, and the altitude changes linearly with time during the climb and the descent.
+
+    :param aircraft: the aircraft
+    :param distance: (N, M) distance of every route leg (nm)
+    :param true_course: (N, M) true course of every route leg in degrees
+    :param wind_direction: (N, M) wind direction of every route leg in degrees
+    :param wind_speed: (N, M) wind speed of every route leg in kts
+    :param temperature: (N, M) outside temperature of every route leg (F)
+    :param departure_altitude: (N,) pressure altitude at the start of the route (ft)
+    :param cruise_altitude: (N,) cruise pressure altitude (ft)
+    :param arrival_altitude: (N,) pressure altitude at the end of the route (ft)
+    :param n_legs: (N,) number of populated legs of every route, defaults to M
+    :return: the segmentation
+    """
+    distance, true_course, wind_direction, wind_speed, temperature = np.broadcast_arrays(
+        *(np.atleast_2d(np.asarray(column, dtype=float)) for column in (distance, true_course, wind_direction,
+                                                                         wind_speed, temperature)))
+    n_routes, max_legs = distance.shape
+    n_legs = np.full(n_routes, max_legs) if n_legs is None else np.asarray(n_legs, dtype=np.intp)
+    valid = np.arange(max_legs) < n_legs[:, np.newaxis]
+    rows = np.arange(n_routes)[:, np.newaxis]
+    departure_altitude, cruise_altitude, arrival_altitude = (np.broadcast_to(np.asarray(altitude, dtype=float),
+                                                                             (n_routes,))
+                                                             for altitude in (departure_altitude, cruise_altitude,
+                                                                              arrival_altitude))
+
+    distance = np.where(valid, distance, 0.0)
+    boundaries = np.zeros((n_routes, max_legs + 1))
+    boundaries[:, 1:] = np.cumsum(distance, axis=1)
+    total_distance = boundaries[np.arange(n_routes), n_legs]
+
+    # climb and descent times, 0 when the route starts or ends at the cruise altitude
+    last_temperature = temperature[np.arange(n_routes), np.maximum(n_legs - 1, 0)]
+    climb_time, _, _ = aircraft.compute_climb_batch(departure_altitude, cruise_altitude, temperature[:, 0])
+    descent_time, _, _ = aircraft.compute_descent_batch(cruise_altitude, arrival_altitude, last_temperature)
+    climb_time = np.where(departure_altitude == cruise_altitude, 0.0, climb_time)
+    descent_time = np.where(arrival_altitude == cruise_altitude, 0.0, descent_time)
+
+    profile = aircraft.performance_profile
+    _, climb_gs, _, _ = compute_wind_triangle(true_course, profile["climb_speed_kts"], wind_direction, wind_speed)
+    _, descent_gs, _, _ = compute_wind_triangle(true_course, profile["descend_speed_kts"], wind_direction, wind_speed)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        climb_leg_time = np.where(valid, distance / climb_gs * 60, 0.0)
+        descent_leg_time = np.where(valid, distance / descent_gs * 60, 0.0)
+    climb_time_before = np.cumsum(climb_leg_time, axis=1) - climb_leg_time
+    descent_time_after = reverse_cumsum_exclusive(descent_leg_time)
+
+    # top of climb: in the first leg whose end is reached after the climb time
+    climb_leg = np.minimum(np.sum(valid & (climb_time_before + climb_leg_time < climb_time[:, np.newaxis]), axis=1),
+                           max_legs - 1)
+    climb_fits = np.sum(climb_leg_time, axis=1) >= climb_time
+    top_of_climb = boundaries[np.arange(n_routes), climb_leg] + \
+        (climb_time - climb_time_before[np.arange(n_routes), climb_leg]) / 60 * climb_gs[np.arange(n_routes), climb_leg]
+    top_of_climb = np.where(climb_time == 0, 0.0, top_of_climb)
+
+    # top of descent: in the last leg whose start is left before the descent time
+    descent_leg = np.clip(np.sum(valid & (descent_time_after >= descent_time[:, np.newaxis]), axis=1), 0,
+                          np.maximum(n_legs - 1, 0))
+    descent_fits = np.sum(descent_leg_time, axis=1) >= descent_time
+    top_of_descent = boundaries[np.arange(n_routes), descent_leg + 1] - \
+        (descent_time - descent_time_after[np.arange(n_routes), descent_leg]) / 60 * \
+        descent_gs[np.arange(n_routes), descent_leg]
+    top_of_descent = np.where(descent_time == 0, total_distance, top_of_descent)
+
+    with np.errstate(invalid="ignore"):
+        feasible = climb_fits & descent_fits & (top_of_climb <= top_of_descent + MERGE_TOLERANCE) & (n_legs > 0)
+    top_of_climb = np.where(feasible, np.minimum(top_of_climb, top_of_descent), 0.0)
+    top_of_descent = np.where(feasible, top_of_descent, 0.0)
+
+    # sorted breakpoints, a route point wins over a top of climb/descent at the same distance
+    points = np.concatenate([boundaries, top_of_climb[:, np.newaxis], top_of_descent[:, np.newaxis]], axis=1)
+    origins = np.broadcast_to(np.concatenate([np.arange(max_legs + 1), [TOP_OF_CLIMB, TOP_OF_DESCENT]]),
+                              points.shape)
+    order = np.lexsort((origins < 0, points), axis=1)
+    points = np.take_along_axis(points, order, axis=1)
+    origins = np.take_along_axis(origins, order, axis=1)
+
+    keep = np.ones(points.shape, dtype=bool)
+    keep[:, 1:] = points[:, 1:] > points[:, :-1] + MERGE_TOLERANCE
+    compact = np.argsort(~keep, axis=1, kind="stable")
+    n_breakpoints = keep.sum(axis=1)
+    padding = np.arange(points.shape[1]) >= n_breakpoints[:, np.newaxis]
+    points = np.where(padding, total_distance[:, np.newaxis], np.take_along_axis(points, compact, axis=1))
+    origins = np.where(padding, max_legs, np.take_along_axis(origins, compact, axis=1))
+
+    # route leg of every segment and of every breakpoint (the leg ending at a route point)
+    interior = boundaries[:, np.newaxis, 1:max_legs]
+    middle = (points[:, :-1] + points[:, 1:]) / 2
+    source = np.sum(middle[:, :, np.newaxis] >= interior, axis=2)
+    point_leg = np.sum(points[:, :, np.newaxis] > interior, axis=2)
+
+    kind = np.where(middle < top_of_climb[:, np.newaxis], LEG_CLIMB,
+                    np.where(middle > top_of_descent[:, np.newaxis], LEG_DESCEND, LEG_CRUISE)).astype(np.int8)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        climb_elapsed = climb_time_before[rows, point_leg] + \
+            (points - boundaries[rows, point_leg]) / climb_gs[rows, point_leg] * 60
+        descent_remaining = descent_time_after[rows, point_leg] + \
+            (boundaries[rows, point_leg + 1] - points) / descent_gs[rows, point_leg] * 60
+        climb_fraction = np.where(climb_time[:, np.newaxis] > 0,
+                                  np.clip(climb_elapsed / climb_time[:, np.newaxis], 0, 1), 1.0)
+        descent_fraction = np.where(descent_time[:, np.newaxis] > 0,
+                                    np.clip(descent_remaining / descent_time[:, np.newaxis], 0, 1), 1.0)
+
+    cruise = cruise_altitude[:, np.newaxis]
+    climb_altitude = departure_altitude[:, np.newaxis] + (cruise - departure_altitude[:, np.newaxis]) * climb_fraction
+    descent_altitude = arrival_altitude[:, np.newaxis] + (cruise - arrival_altitude[:, np.newaxis]) * descent_fraction
+    at_cruise = (points >= top_of_climb[:, np.newaxis] - MERGE_TOLERANCE) & \
+        (points <= top_of_descent[:, np.newaxis] + MERGE_TOLERANCE)
+    altitudes = np.where(at_cruise, cruise, np.where(points < top_of_climb[:, np.newaxis], climb_altitude,
+                                                     descent_altitude))
+    altitudes[:, 0] = np.where(top_of_climb > 0, departure_altitude, altitudes[:, 0])
+    altitudes[rows[:, 0], n_breakpoints - 1] = np.where(top_of_descent < total_distance, arrival_altitude,
+                                                        altitudes[rows[:, 0], n_breakpoints - 1])
+
+    # infeasible routes are left as their original legs, at the cruise altitude
+    kind[~feasible] = LEG_CRUISE
+    altitudes[~feasible] = cruise[~feasible]
+    top_of_climb = np.where(feasible, top_of_climb, np.nan)
+    top_of_descent = np.where(feasible, top_of_descent, np.nan)
+
+    return Segmentation(points, origins, np.maximum(n_breakpoints - 1, 0), source, kind, altitudes, top_of_climb,
+                        top_of_descent, feasible)
+
+
+def segment_plan_table(route: PlanTable, aircraft: Aircraft, departure_altitude: np.ndarray,
+                       cruise_altitude: np.ndarray, arrival_altitude: np.ndarray) -> tuple[PlanTable, np.ndarray]:
+    """
+    Vectorized mode: re-segments many routes at once (e.g., after a forecast update). Only the lateral columns of
+    the route table are used (distance, true course, winds, temperature and magnetic variation); leg kinds,
+    airspeeds and altitudes are replaced.
+
+    :param route: (N, M) table of the routes
+    :param aircraft: the aircraft
+    :param departure_altitude: (N,) or scalar pressure altitude at the start of the routes (ft)
+    :param cruise_altitude: (N,) or scalar cruise pressure altitude (ft)
+    :param arrival_altitude: (N,) or scalar pressure altitude at the end of the routes (ft)
+    :return: table: the (N, M + 2) segmented plans, not evaluated; distances of infeasible plans are NaN
+    :return: feasible: (N,) False where the climb and descent do not fit in the route
+    """
+    segmentation = solve_segmentation(aircraft, route.distance, route.true_course, route.wind_direction,
+                                      route.wind_speed, route.temperature, departure_altitude, cruise_altitude,
+                                      arrival_altitude, n_legs=route.n_legs)
+    source = segmentation.source
+    profile = aircraft.performance_profile
+
+    def from_source(column: np.ndarray) -> np.ndarray:
+        return np.take_along_axis(column, source, axis=1)
+
+    true_airspeed = np.select([segmentation.kind == LEG_CLIMB, segmentation.kind == LEG_DESCEND],
+                              [profile["climb_speed_kts"], profile["descend_speed_kts"]], profile["cruise_speed_kts"])
+    distance = segmentation.distance
+    distance[~segmentation.feasible] = np.nan
+
+    from_waypoints = to_waypoints = None
+    if route.from_waypoints is not None and route.to_waypoints is not None:
+        names = np.concatenate([route.from_waypoints[:, :1], route.to_waypoints], axis=1)
+        origins = segmentation.origins
+        point_names = np.take_along_axis(names, np.clip(origins, 0, names.shape[1] - 1), axis=1)
+        for origin, name in BREAKPOINT_NAMES.items():
+            point_names[origins == origin] = name
+        from_waypoints, to_waypoints = point_names[:, :-1], point_names[:, 1:]
+
+    table = PlanTable(kind=segmentation.kind, distance=distance, true_course=from_source(route.true_course),
+                      true_airspeed=true_airspeed, start_altitude=segmentation.altitudes[:, :-1],
+                      end_altitude=segmentation.altitudes[:, 1:], wind_direction=from_source(route.wind_direction),
+                      wind_speed=from_source(route.wind_speed), temperature=from_source(route.temperature),
+                      mag_var=from_source(route.mag_var), n_legs=segmentation.n_segments,
+                      from_waypoints=from_waypoints, to_waypoints=to_waypoints)
+    return table, segmentation.feasible
+
+
+def segment_route(legs: list[Leg], aircraft: Aircraft, departure_altitude: float, cruise_altitude: float,
+                  arrival_altitude: float) -> FlightPlan:
+    """
+    Places the top of climb and top of descent on a route and splits the legs they fall on (see
+    solve_segmentation()). Legs before the top of climb become Climb legs, legs after the top of descent Descend
+    legs and the others Cruise legs; the split parts keep the course, winds, temperature and magnetic variation of
+    their leg. The inserted waypoints are positioned along the great circle of their leg if its waypoints have
+    positions.
+
+    :param legs: the route; only the waypoints, distances, courses, winds, temperatures and magnetic variations
+                 are used (e.g., Cruise legs from the origin to the destination)
+    :param aircraft: the aircraft
+    :param departure_altitude: pressure altitude at the origin (ft)
+    :param cruise_altitude: cruise pressure altitude (ft)
+    :param arrival_altitude: pressure altitude at the destination (ft)
+    :return: the segmented flight plan, not evaluated
+    """
+    assert len(legs) > 0, "The route must have at least one leg."
+    segmentation = solve_segmentation(aircraft, [[leg.distance for leg in legs]],
+                                      [[leg.true_course for leg in legs]], [[leg.wind_direction for leg in legs]],
+                                      [[leg.wind_speed for leg in legs]], [[leg.temperature for leg in legs]],
+                                      departure_altitude, cruise_altitude, arrival_altitude)
+    assert segmentation.feasible[0], "The climb and descent to and from the cruise altitude do not fit in the route."
+
+    boundaries = np.concatenate([[0.0], np.cumsum([leg.distance for leg in legs])])
+    route_points = [legs[0].from_waypoint] + [leg.to_waypoint for leg in legs]
+    points = segmentation.breakpoints[0].tolist()
+    origins = segmentation.origins[0].tolist()
+    sources = segmentation.source[0].tolist()
+
+    waypoints = []
+    for k in range(segmentation.n_segments[0] + 1):
+        if origins[k] >= 0:
+            waypoints.append(route_points[origins[k]])
+            continue
+
+        # the leg the inserted point falls on
+        leg = legs[sources[k] if k < len(sources) else sources[k - 1]]
+        waypoint = Waypoint(BREAKPOINT_NAMES[origins[k]])
+        if leg.from_waypoint.has_position and leg.to_waypoint.has_position and leg.distance > 0:
+            fraction = (points[k] - boundaries[legs.index(leg)]) / leg.distance
+            latitude, longitude = intermediate_point(leg.from_waypoint.latitude, leg.from_waypoint.longitude,
+                                                     leg.to_waypoint.latitude, leg.to_waypoint.longitude, fraction)
+            waypoint.latitude, waypoint.longitude = float(latitude), float(longitude)
+        waypoints.append(waypoint)
+
+    profile = aircraft.performance_profile
+    altitudes = segmentation.altitudes[0].tolist()
+    plan: list[Leg] = []
+    for k in range(segmentation.n_segments[0]):
+        leg = legs[sources[k]]
+        arguments = dict(from_waypoint=waypoints[k], to_waypoint=waypoints[k + 1], distance=points[k + 1] - points[k],
+                         true_course=leg.true_course, wind_direction=leg.wind_direction, wind_speed=leg.wind_speed,
+                         temperature=leg.temperature, mag_var=leg.mag_var)
+        kind = segmentation.kind[0, k]
+        if kind == LEG_CLIMB:
+            plan.append(Climb(true_airspeed=profile["climb_speed_kts"], start_altitude=altitudes[k],
+                              end_altitude=altitudes[k + 1], **arguments))
+        elif kind == LEG_DESCEND:
+            plan.append(Descend(true_airspeed=profile["descend_speed_kts"], start_altitude=altitudes[k],
+                                end_altitude=altitudes[k + 1], **arguments))
+        else:
+            plan.append(Cruise(true_airspeed=profile["cruise_speed_kts"], altitude=altitudes[k], **arguments))
+
+    return FlightPlan(plan, aircraft=aircraft)
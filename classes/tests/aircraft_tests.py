@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+
+
+class TestMagneticDeviation(unittest.TestCase):
+    """
+    Tests to ensure that the compiled magnetic deviation table matches the deviation card.
+    """
+    def setUp(self):
+        self.aircraft = N8273V()
+        self.card = self.aircraft.performance_profile["mag_dev_lookup"]
+
+    def test_nearest_card_entry(self):
+        test_cases = [
+            {"heading": 0, "expected": self.card[0]},
+            {"heading": 151, "expected": self.card[150]},
+            {"heading": 166, "expected": self.card[180]},
+            {"heading": 355, "expected": self.card[0]},
+            {"heading": 359.9, "expected": self.card[0]},
+            {"heading": 340, "expected": self.card[330]},
+            {"heading": -10, "expected": self.card[0]},
+            {"heading": 400, "expected": self.card[30]},
+        ]
+
+        for case in test_cases:
+            with self.subTest(heading=case["heading"]):
+                self.assertEqual(self.aircraft.compute_mag_dev(case["heading"]), case["expected"])
+
+    def test_linear_interpolation(self):
+        self.aircraft.compile_mag_dev_table(resolution=0.5, interpolation="linear")
+
+        self.assertAlmostEqual(self.aircraft.compute_mag_dev(75), (self.card[60] + self.card[90]) / 2)
+        self.assertAlmostEqual(self.aircraft.compute_mag_dev(345), (self.card[330] + self.card[0]) / 2)
+        self.assertAlmostEqual(self.aircraft.compute_mag_dev(160), self.card[150] + (self.card[180] - self.card[150]) / 3)
+
+    def test_batch_matches_scalar(self):
+        headings = np.random.default_rng(0).uniform(-360, 720, 1000)
+
+        for interpolation in ("nearest", "linear"):
+            self.aircraft.compile_mag_dev_table(interpolation=interpolation)
+            batch = self.aircraft.compute_mag_dev_batch(headings.reshape(10, 100))
+            self.assertEqual(batch.shape, (10, 100))
+            for heading, result in zip(headings, batch.ravel()):
+                with self.subTest(interpolation=interpolation, heading=heading):
+                    self.assertAlmostEqual(result, self.aircraft.compute_mag_dev(heading))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.altitude_optimizer import evaluate_cruise_altitudes, optimize_cruise_altitudes
+from classes.flightplan import FlightPlan
+from classes.legs import Climb, Cruise, Descend
+from classes.waypoints import Waypoint
+from models.winds_aloft import WindsAloft
+
+
+aircraft = N8273V()
+TOLERANCE = 1e-9
+
+
+def build_route() -> FlightPlan:
+    return FlightPlan([
+        Climb(from_waypoint=Waypoint("KPDK"), to_waypoint=Waypoint("Top of Climb"), distance=15, true_course=43,
+              true_airspeed=76, start_altitude=998, end_altitude=5500, wind_direction=289, wind_speed=4,
+              temperature=73.4, mag_var=6),
+        Cruise(from_waypoint=Waypoint("Top of Climb"), to_waypoint=Waypoint("Lake Lanier"), distance=26,
+               true_course=43, true_airspeed=115, altitude=5500, wind_direction=289, wind_speed=8,
+               temperature=66.2, mag_var=6),
+        Cruise(from_waypoint=Waypoint("Lake Lanier"), to_waypoint=Waypoint("GVL"), distance=26, true_course=43,
+               true_airspeed=115, altitude=5500, wind_direction=290, wind_speed=16, temperature=73.4, mag_var=6),
+        Descend(from_waypoint=Waypoint("GVL"), to_waypoint=Waypoint("Habersham"), distance=15, true_course=45,
+                true_airspeed=122, start_altitude=5500, end_altitude=998, wind_direction=289, wind_speed=4,
+                temperature=73.4, mag_var=6),
+    ], aircraft=aircraft)
+
+
+class TestCruiseAltitudeOptimizer(unittest.TestCase):
+    """
+    Tests to ensure that the cruise altitude search ranks candidates consistently with FlightPlan.evaluate().
+    """
+    def setUp(self):
+        self.route = build_route()
+        self.winds_aloft = WindsAloft(altitudes=[0, 3000, 6000, 9000, 12000, 15000],
+                                      wind_direction=[280, 290, 300, 310, 320, 330],
+                                      wind_speed=[5, 10, 20, 30, 40, 50],
+                                      temperature=[75, 68, 60, 50, 40, 30])
+
+    def test_ranking(self):
+        result = evaluate_cruise_altitudes(self.route, self.winds_aloft, objective="fuel")
+        ranking = result.ranking
+
+        feasible_fuel = ranking["total_fuel"][ranking["feasible"]]
+        self.assertTrue(np.all(np.diff(feasible_fuel) >= 0))
+        self.assertEqual(result.best_altitude, ranking["altitude"][0])
+        self.assertFalse(np.any(ranking["feasible"][ranking["altitude"] <= 998]))
+
+        total_distance = sum(leg.distance for leg in self.route.plan)
+        np.testing.assert_allclose(ranking["total_distance"][ranking["feasible"]], total_distance)
+
+    def test_best_plan_matches_flight_plan(self):
+        result = evaluate_cruise_altitudes(self.route, self.winds_aloft)
+        best = result.best_flight_plan(aircraft)
+
+        flight_plan = FlightPlan([type(leg)(**{name: getattr(leg, name) for name in
+                                               ("from_waypoint", "to_waypoint", "distance", "true_course",
+                                                "true_airspeed", "wind_direction", "wind_speed", "temperature",
+                                                "mag_var")},
+                                            **({"altitude": leg.start_altitude} if isinstance(leg, Cruise) else
+                                               {"start_altitude": leg.start_altitude,
+                                                "end_altitude": leg.end_altitude}))
+                                  for leg in best.plan], aircraft=aircraft)
+        flight_plan.evaluate()
+
+        self.assertEqual(best.plan[1].start_altitude, result.best_altitude)
+        self.assertAlmostEqual(best.total_time, flight_plan.total_time, delta=TOLERANCE)
+        self.assertAlmostEqual(best.plan[0].climb_distance_nm, flight_plan.plan[0].climb_distance_nm, delta=TOLERANCE)
+
+    def test_process_pool_matches_serial(self):
+        serial = optimize_cruise_altitudes([self.route] * 4, self.winds_aloft)
+        parallel = optimize_cruise_altitudes([self.route] * 4, self.winds_aloft, processes=2)
+
+        for serial_result, parallel_result in zip(serial, parallel):
+            self.assertEqual(serial_result.best_altitude, parallel_result.best_altitude)
+            np.testing.assert_array_equal(serial_result.ranking["altitude"], parallel_result.ranking["altitude"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.dispatch import evaluate_dispatch_matrix, build_route_table, ROUTE_COLUMNS
+from classes.legs import Cruise
+from classes.segmentation import segment_route
+from classes.waypoints import Waypoint
+from common.shared_array import SharedArray
+
+
+def build_fleet() -> list[N8273V]:
+    fleet = []
+    for callsign, fuel_capacity, fuel_rate in (("N8273V", 48, 7.6), ("N101AB", 24, 8.4), ("N202CD", 50, 6.0)):
+        aircraft = N8273V()
+        aircraft.callsign = callsign
+        aircraft.performance_profile = {**aircraft.performance_profile, "fuel_capacity_g": fuel_capacity,
+                                        "fuel_rate_gph": fuel_rate}
+        fleet.append(aircraft)
+    return fleet
+
+
+def build_routes(n_routes: int, max_legs: int = 5, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    columns = np.stack([rng.uniform(5, 60, (n_routes, max_legs)), rng.uniform(0, 360, (n_routes, max_legs)),
+                        rng.uniform(0, 360, (n_routes, max_legs)), rng.uniform(0, 30, (n_routes, max_legs)),
+                        rng.uniform(40, 80, (n_routes, max_legs)), rng.uniform(-10, 10, (n_routes, max_legs))])
+    n_legs = rng.integers(1, max_legs + 1, n_routes)
+    return build_route_table(columns, n_legs)
+
+
+class TestDispatchMatrix(unittest.TestCase):
+    """
+    Tests to ensure that the dispatch matrix matches the scalar planner and does not depend on the process count.
+    """
+    def setUp(self):
+        self.fleet = build_fleet()
+        self.routes = build_routes(60)
+        self.cruise_altitude = np.where(np.arange(60) % 2 == 0, 5500, 9500)
+
+    def evaluate(self, processes: int | None = None):
+        return evaluate_dispatch_matrix(self.fleet, self.routes, 1000, self.cruise_altitude, 1200,
+                                        processes=processes, chunk_size=1)
+
+    def test_matches_flight_plans(self):
+        matrix = self.evaluate()
+        self.assertEqual(matrix.shape, (3, 60))
+        self.assertTrue(matrix.feasible.any())
+        self.assertFalse(matrix.feasible.all())
+
+        for i, aircraft in enumerate(self.fleet):
+            for r in range(0, 60, 7):
+                legs = [Cruise(from_waypoint=Waypoint(f"WP{j}"), to_waypoint=Waypoint(f"WP{j + 1}"),
+                               altitude=self.cruise_altitude[r], true_airspeed=115,
+                               **{name: float(getattr(self.routes, name)[r, j]) for name in ROUTE_COLUMNS})
+                        for j in range(self.routes.n_legs[r])]
+                with self.subTest(aircraft=aircraft.callsign, route=r):
+                    try:
+                        flight_plan = segment_route(legs, aircraft, 1000, self.cruise_altitude[r], 1200)
+                    except AssertionError:
+                        self.assertFalse(matrix.feasible[i, r])
+                        continue
+                    flight_plan.evaluate()
+                    self.assertAlmostEqual(matrix.time_min[i, r], flight_plan.total_time, places=6)
+                    self.assertAlmostEqual(matrix.fuel_gal[i, r], flight_plan.total_fuel, places=6)
+                    reserve_margin = aircraft.performance_profile["fuel_capacity_g"] - flight_plan.total_fuel - \
+                        aircraft.performance_profile["fuel_rate_gph"] / 2
+                    self.assertAlmostEqual(matrix.reserve_margin_gal[i, r], reserve_margin, places=6)
+                    self.assertEqual(matrix.feasible[i, r], reserve_margin >= 0)
+
+        # the small tank runs out of reserve first
+        self.assertLessEqual(matrix.feasible[1].sum(), matrix.feasible[0].sum())
+        route = int(np.flatnonzero(matrix.feasible[0])[0])
+        self.assertIn("N8273V", matrix.feasible_aircraft(route))
+
+    def test_process_pool_matches_single_process(self):
+        reference = self.evaluate()
+        matrix = self.evaluate(processes=2)
+        np.testing.assert_array_equal(matrix.feasible, reference.feasible)
+        np.testing.assert_allclose(matrix.time_min, reference.time_min, equal_nan=True)
+        np.testing.assert_allclose(matrix.reserve_margin_gal, reference.reserve_margin_gal, equal_nan=True)
+
+    def test_shared_array(self):
+        with SharedArray.from_array(np.arange(6.0).reshape(2, 3)) as shared:
+            with SharedArray.attach(shared.spec) as view:
+                view.array[1, 2] = -1
+            self.assertEqual(shared.array[1, 2], -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
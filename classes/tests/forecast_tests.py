@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.flightplan import FlightPlan
+from classes.forecast import apply_wind_field
+from classes.legs import Climb, Cruise, Descend
+from classes.waypoints import Waypoint
+from models.wind_field import WindField
+
+
+def build_geographic_route() -> FlightPlan:
+    kpdk = Waypoint("KPDK", 33.8756, -84.3020)
+    top_of_climb = Waypoint("Top of Climb", 33.98, -84.18)
+    lake_lanier = Waypoint("Lake Lanier", 34.18, -83.95)
+    gvl = Waypoint("GVL", 34.2726, -83.8302)
+    habersham = Waypoint("Habersham", 34.3997, -83.5561)
+
+    def winds() -> dict:
+        return dict(wind_direction=0, wind_speed=0, temperature=59)
+
+    return FlightPlan([
+        Climb(from_waypoint=kpdk, to_waypoint=top_of_climb, distance=None, true_course=None, true_airspeed=76,
+              start_altitude=998, end_altitude=5500, mag_var=6, **winds()),
+        Cruise(from_waypoint=top_of_climb, to_waypoint=lake_lanier, distance=None, true_course=None,
+               true_airspeed=115, altitude=5500, mag_var=6, **winds()),
+        Cruise(from_waypoint=lake_lanier, to_waypoint=gvl, distance=None, true_course=None, true_airspeed=115,
+               altitude=5500, mag_var=6, **winds()),
+        Descend(from_waypoint=gvl, to_waypoint=habersham, distance=None, true_course=None, true_airspeed=122,
+                start_altitude=5500, end_altitude=998, mag_var=6, **winds()),
+    ], aircraft=N8273V())
+
+
+class TestApplyWindField(unittest.TestCase):
+    """
+    Tests to ensure that legs are sampled from the gridded forecast at their position, altitude and time.
+    """
+    def setUp(self):
+        # wind from 270, increasing with altitude and time, temperature decreasing with altitude
+        times, altitudes = np.array([0.0, 12.0]), np.array([0.0, 12000.0])
+        latitudes, longitudes = np.array([30.0, 40.0]), np.array([-90.0, -80.0])
+        t, a, _, _ = np.meshgrid(times, altitudes, latitudes, longitudes, indexing="ij")
+        self.field = WindField.from_forecast(times, altitudes, latitudes, longitudes,
+                                             wind_direction=np.full(t.shape, 270.0), wind_speed=a / 400 + t,
+                                             temperature=75 - a / 300)
+
+    def test_legs_are_sampled(self):
+        flight_plans = [build_geographic_route(), build_geographic_route()]
+        apply_wind_field(flight_plans, self.field, departure_time=[0.0, 6.0])
+
+        for flight_plan, departure_time in zip(flight_plans, (0.0, 6.0)):
+            for leg in flight_plan.plan:
+                altitude = (leg.start_altitude + leg.end_altitude) / 2
+                self.assertAlmostEqual(leg.wind_direction, 270, places=3)
+                self.assertAlmostEqual(leg.wind_speed, altitude / 400 + departure_time, places=3)
+                self.assertAlmostEqual(leg.temperature, 75 - altitude / 300, places=3)
+
+        # evaluated plans are sampled at the time flown to the middle of each leg
+        flight_plan = flight_plans[0]
+        flight_plan.evaluate()
+        apply_wind_field([flight_plan], self.field, departure_time=0.0, method="integrate")
+        elapsed = 0.0
+        for leg in flight_plan.plan:
+            altitude = (leg.start_altitude + leg.end_altitude) / 2
+            self.assertAlmostEqual(leg.wind_speed, altitude / 400 + (elapsed + leg.time_min / 2) / 60, places=3)
+            elapsed += leg.time_min
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import copy
+import unittest
+from classes.incremental_flightplan import IncrementalFlightPlan
+from classes.tests.altitude_optimizer_tests import build_route
+from common.instrumentation import profile
+
+
+TOLERANCE = 1e-9
+
+
+class TestIncrementalFlightPlan(unittest.TestCase):
+    """
+    Tests to ensure that incremental re-evaluation matches a from-scratch evaluation.
+    """
+    def setUp(self):
+        route = build_route()
+        self.plan = IncrementalFlightPlan(route.plan, aircraft=route.aircraft)
+        self.plan.evaluate()
+
+    def test_evaluate_does_not_double_count(self):
+        route = build_route()
+        route.evaluate()
+        total_time = route.total_time
+        route.evaluate()
+        self.assertAlmostEqual(route.total_time, total_time, delta=TOLERANCE)
+
+    def test_only_dirty_legs_are_recomputed(self):
+        with profile() as profiler:
+            self.plan.update_leg(2, wind_direction=120, wind_speed=25)
+            self.plan.evaluate()
+
+        self.assertEqual(profiler.stats["Leg.evaluate"].calls, 1)
+
+    def test_matches_from_scratch(self):
+        self.plan.update_leg(1, wind_speed=30, temperature=50)
+        self.plan.update_leg(0, end_altitude=7500)
+        self.plan.update_leg(1, start_altitude=7500, end_altitude=7500)
+        self.plan.update_leg(2, start_altitude=7500, end_altitude=7500)
+        self.plan.update_leg(3, start_altitude=7500)
+        self.plan.evaluate()
+        self.plan.materialize_remaining()
+
+        fresh = IncrementalFlightPlan(copy.deepcopy(self.plan.plan), aircraft=self.plan.aircraft)
+        fresh.evaluate()
+        fresh.materialize_remaining()
+
+        reference = build_route()
+        reference.plan = copy.deepcopy(self.plan.plan)
+        reference.evaluate()
+
+        self.assertEqual(self.plan.total_fuel, fresh.total_fuel)
+        self.assertAlmostEqual(self.plan.total_fuel, reference.total_fuel, delta=TOLERANCE)
+        self.assertAlmostEqual(self.plan.total_time, reference.total_time, delta=TOLERANCE)
+
+        for leg, fresh_leg, reference_leg in zip(self.plan.plan, fresh.plan, reference.plan):
+            for name in ("remaining_time_min", "remaining_distance_nm", "remaining_fuel_gal", "TH", "GS"):
+                self.assertEqual(getattr(leg, name), getattr(fresh_leg, name))
+                self.assertAlmostEqual(getattr(leg, name), getattr(reference_leg, name), delta=TOLERANCE)
+        self.assertAlmostEqual(self.plan.plan[0].climb_time_min, reference.plan[0].climb_time_min, delta=TOLERANCE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from aircraft.N8273V import N8273V
+from classes.flightplan import FlightPlan
+from classes.leg_cache import LegCache
+from classes.plan_table import OUTPUT_COLUMNS
+from classes.tests.altitude_optimizer_tests import build_route
+
+
+TOLERANCE = 1e-9
+EXACT = {"true_course": 0, "true_airspeed": 0, "wind_direction": 0, "wind_speed": 0, "altitude": 0, "temperature": 0}
+
+
+def cached_route(cache: LegCache) -> FlightPlan:
+    route = build_route()
+    return FlightPlan(route.plan, aircraft=route.aircraft, leg_cache=cache)
+
+
+class TestLegCache(unittest.TestCase):
+    """
+    Tests to ensure that cached evaluations match FlightPlan.evaluate() and that the cache tiers behave.
+    """
+    def assertPlansEqual(self, flight_plan: FlightPlan, reference: FlightPlan, delta: float = TOLERANCE):
+        self.assertAlmostEqual(flight_plan.total_time, reference.total_time, delta=delta)
+        self.assertAlmostEqual(flight_plan.total_fuel, reference.total_fuel, delta=delta)
+        for leg, reference_leg in zip(flight_plan.plan, reference.plan):
+            for name in OUTPUT_COLUMNS:
+                if hasattr(reference_leg, name):
+                    self.assertAlmostEqual(getattr(leg, name), getattr(reference_leg, name), delta=delta, msg=name)
+
+    def test_matches_uncached_evaluation(self):
+        reference = build_route()
+        reference.evaluate()
+
+        cache = LegCache(quanta=EXACT)
+        for _ in range(3):
+            flight_plan = cached_route(cache)
+            flight_plan.evaluate()
+            self.assertPlansEqual(flight_plan, reference, delta=0)
+
+        self.assertEqual(cache.stats["misses"], 4)
+        self.assertEqual(cache.stats["hits"], 8)
+        self.assertAlmostEqual(cache.stats["hit_rate"], 2 / 3)
+
+    def test_quantized_inputs_hit(self):
+        cache = LegCache(quanta={"wind_speed": 0.5, "temperature": 1.0})
+        cached_route(cache).evaluate()
+
+        flight_plan = cached_route(cache)
+        for leg in flight_plan.plan:
+            leg.wind_speed += 0.1
+            leg.temperature += 0.05
+        flight_plan.evaluate()
+        self.assertEqual(cache.stats["hits"], 4)
+        cached_time, leg_time = flight_plan.total_time, flight_plan.plan[1].time_min
+
+        # hits reuse the wind triangle of the first leg, within the quanta
+        reference = FlightPlan(flight_plan.plan, aircraft=flight_plan.aircraft)
+        reference.evaluate()
+        self.assertAlmostEqual(cached_time, reference.total_time, delta=0.1)
+
+        # the distance is not part of the key, the leg time follows it
+        flight_plan.plan[1].distance *= 2
+        flight_plan.evaluate()
+        self.assertEqual(cache.stats["misses"], 4)
+        self.assertAlmostEqual(flight_plan.plan[1].time_min, 2 * leg_time, delta=TOLERANCE)
+
+    def test_lru_eviction(self):
+        cache = LegCache(max_entries=2)
+        cached_route(cache).evaluate()
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats["evictions"], 2)
+
+        # the last two legs are kept, the first two are computed again
+        cached_route(cache).evaluate()
+        self.assertEqual(cache.stats["misses"], 8)
+
+    def test_aircraft_identity(self):
+        cache = LegCache()
+        cached_route(cache).evaluate()
+
+        flight_plan = cached_route(cache)
+        flight_plan.aircraft = N8273V()
+        flight_plan.aircraft.enable_performance_grid()
+        flight_plan.evaluate()
+        self.assertEqual(cache.stats["misses"], 8)
+
+    def test_replaced_models(self):
+        cache = LegCache(quanta=EXACT)
+        aircraft = N8273V()
+        flight_plan = FlightPlan(build_route().plan, aircraft=aircraft, leg_cache=cache)
+        flight_plan.evaluate()
+        climb_fuel = flight_plan.plan[0].climb_fuel_gal
+
+        aircraft.fuel_to_climb_model = 2 * aircraft.fuel_to_climb_model
+        flight_plan.evaluate()
+        self.assertEqual(cache.stats["misses"], 8)
+        self.assertAlmostEqual(flight_plan.plan[0].climb_fuel_gal, 2 * climb_fuel, delta=TOLERANCE)
+        self.assertAlmostEqual(flight_plan.plan[0].climb_fuel_gal, aircraft.compute_climb(
+            flight_plan.plan[0].start_altitude, flight_plan.plan[0].end_altitude, flight_plan.plan[0].temperature)[2],
+            delta=TOLERANCE)
+
+        aircraft.performance_profile["fuel_rate_gph"] = 9.0
+        flight_plan.evaluate()
+        self.assertEqual(cache.stats["misses"], 12)
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "legs.sqlite")
+            with LegCache(path=path) as cache:
+                cached_route(cache).evaluate()
+
+            reference = build_route()
+            reference.evaluate()
+            with LegCache(path=path) as cache:
+                flight_plan = cached_route(cache)
+                flight_plan.evaluate()
+                self.assertEqual(cache.stats["disk_hits"], 4)
+                self.assertEqual(cache.stats["misses"], 0)
+            self.assertPlansEqual(flight_plan, reference)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from classes.leg_store import LegStore
+from classes.plan_table import OUTPUT_COLUMNS, INPUT_COLUMNS
+from classes.tests.altitude_optimizer_tests import build_route
+
+
+class TestCompactLegs(unittest.TestCase):
+    """
+    Tests to ensure that the compact leg representations keep the Leg attribute interface.
+    """
+    def setUp(self):
+        self.route = build_route()
+        self.route.evaluate()
+
+    def test_slotted_legs(self):
+        for leg in self.route.plan:
+            self.assertFalse(hasattr(leg, "__dict__"))
+            self.assertFalse(hasattr(leg.from_waypoint, "__dict__"))
+        self.assertIs(self.route.plan[0].to_waypoint.name, self.route.plan[1].from_waypoint.name)
+
+    def test_store_round_trip(self):
+        store = LegStore.from_flight_plans([self.route, self.route])
+        self.assertEqual(len(store), 2 * len(self.route.plan))
+
+        for leg, array_leg in zip(self.route.plan * 2, store):
+            self.assertEqual(array_leg.from_waypoint.name, leg.from_waypoint.name)
+            for name in INPUT_COLUMNS + OUTPUT_COLUMNS:
+                if hasattr(leg, name):
+                    with self.subTest(name=name):
+                        self.assertAlmostEqual(getattr(array_leg, name), getattr(leg, name))
+
+            converted = array_leg.to_leg()
+            self.assertIs(type(converted), type(leg))
+            self.assertAlmostEqual(converted.remaining_fuel_gal, leg.remaining_fuel_gal)
+
+        self.assertEqual(store[-1].plan, 1)
+        self.assertEqual(len(store.waypoint_names), 5)
+
+    def test_store_append_and_write(self):
+        store = LegStore(capacity=1)
+        for leg in self.route.plan:
+            store.append(leg)
+
+        store[1].TH = 50.5
+        store[1].remaining_fuel_gal = None
+        self.assertEqual(store[1].TH, 50.5)
+        self.assertIsNone(store[1].remaining_fuel_gal)
+        self.assertIsNone(store[1].climb_time_min)
+        self.assertAlmostEqual(store[0].climb_time_min, self.route.plan[0].climb_time_min)
+
+
+if __name__ == '__main__':
+    unittest.main()
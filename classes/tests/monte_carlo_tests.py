@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from classes.monte_carlo import run_monte_carlo, uniform
+from classes.tests.altitude_optimizer_tests import build_route
+
+
+class TestMonteCarlo(unittest.TestCase):
+    """
+    Tests to ensure that the Monte Carlo analysis is reproducible and consistent with the nominal plan.
+    """
+    def setUp(self):
+        self.route = build_route()
+
+    def test_no_perturbation_matches_nominal(self):
+        result = run_monte_carlo(self.route, n_samples=100)
+        self.route.evaluate()
+
+        for percentile_time in result.total_time:
+            self.assertAlmostEqual(percentile_time, self.route.total_time, places=3)
+        for percentile_fuel in result.fuel_on_board_gal[:, -1]:
+            self.assertAlmostEqual(percentile_fuel, result.fuel_capacity_gal - self.route.total_fuel, places=3)
+        self.assertEqual(result.fuel_exhaustion_probability, 0)
+
+    def test_reproducible_across_chunk_sizes(self):
+        kwargs = {"n_samples": 5000, "wind_direction": 20, "wind_speed": uniform(10), "temperature": 5, "seed": 7}
+        result = run_monte_carlo(self.route, chunk_size=5000, **kwargs)
+        chunked = run_monte_carlo(self.route, chunk_size=333, **kwargs)
+
+        np.testing.assert_array_equal(result.time_min, chunked.time_min)
+        np.testing.assert_array_equal(result.fuel_on_board_gal, chunked.fuel_on_board_gal)
+        np.testing.assert_array_equal(result.maneuver_fuel_gal, chunked.maneuver_fuel_gal)
+
+    def test_reservoir(self):
+        kwargs = {"n_samples": 20000, "wind_direction": 20, "wind_speed": 10, "temperature": 5, "seed": 3}
+        exact = run_monte_carlo(self.route, **kwargs)
+        sampled = run_monte_carlo(self.route, chunk_size=3000, reservoir_size=4000, **kwargs)
+        chunked = run_monte_carlo(self.route, chunk_size=777, reservoir_size=4000, **kwargs)
+
+        np.testing.assert_array_equal(sampled.time_min, chunked.time_min)
+        np.testing.assert_array_equal(sampled.fuel_on_board_gal, chunked.fuel_on_board_gal)
+        np.testing.assert_allclose(sampled.total_time, exact.total_time, rtol=0.01)
+        np.testing.assert_allclose(sampled.fuel_on_board_gal, exact.fuel_on_board_gal, rtol=0.01)
+        self.assertEqual(sampled.n_samples, 20000)
+        self.assertEqual(sampled.fuel_exhaustion_probability, exact.fuel_exhaustion_probability)
+
+    def test_percentiles_are_ordered(self):
+        result = run_monte_carlo(self.route, n_samples=5000, wind_speed=10, temperature=5, percentiles=(5, 50, 95))
+
+        self.assertTrue(np.all(np.diff(result.time_min, axis=0) >= 0))
+        self.assertTrue(np.all(np.diff(result.fuel_on_board_gal, axis=0) >= 0))
+        self.assertTrue(np.all(np.isnan(result.maneuver_fuel_gal[:, 1:-1])))
+        self.assertFalse(np.any(np.isnan(result.maneuver_fuel_gal[:, [0, -1]])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+from classes.plan_export import PlanColumns, write_plan_table, write_flight_plans
+from classes.plan_table import PlanTable, OUTPUT_COLUMNS
+from classes.tests.altitude_optimizer_tests import build_route
+from classes.tests.forecast_tests import build_geographic_route
+
+
+def summarize(flight_plans) -> str:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        for flight_plan in flight_plans:
+            flight_plan.summarize()
+    return output.getvalue()
+
+
+class TestPlanExport(unittest.TestCase):
+    """
+    Tests to ensure that the exported columns round trip and render the summarize() layout.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "plans.cols")
+        route = build_route()
+        self.aircraft = route.aircraft
+        self.table = PlanTable.from_flight_plans([route, build_geographic_route(), route])
+        self.table.evaluate(self.aircraft)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        write_plan_table(self.path, self.table)
+        columns = PlanColumns(self.path)
+        self.assertEqual(len(columns), 3)
+        self.assertEqual(columns.n_legs, self.table.n_legs.sum())
+        self.assertIsInstance(columns["TC"], np.memmap)
+
+        for i in range(3):
+            legs = columns.plan_legs(i)
+            for name in OUTPUT_COLUMNS:
+                np.testing.assert_array_equal(columns[name][legs], getattr(self.table, name)[i, :self.table.n_legs[i]])
+            self.assertEqual(columns["total_fuel"][i], self.table.total_fuel[i])
+            self.assertEqual(columns.waypoints[columns["to_waypoint"][legs][-1]],
+                             self.table.to_waypoints[i, self.table.n_legs[i] - 1])
+
+        # float32 columns halve the leg data
+        compact = os.path.join(self.directory.name, "compact.cols")
+        write_plan_table(compact, self.table, dtype=np.float32)
+        np.testing.assert_allclose(PlanColumns(compact)["GS"], columns["GS"], rtol=1e-6)
+        self.assertLess(os.path.getsize(compact), os.path.getsize(self.path))
+
+    def test_render_matches_summarize(self):
+        flight_plans = self.table.to_flight_plans(self.aircraft)
+        write_plan_table(self.path, self.table)
+        columns = PlanColumns(self.path)
+        self.assertEqual(columns.render_summary(), summarize(flight_plans))
+        self.assertEqual(columns.render_summary([2, 0]), summarize([flight_plans[2], flight_plans[0]]))
+        self.assertEqual(columns.render_summary([]), "")
+
+    def test_write_flight_plans(self):
+        flight_plans = self.table.to_flight_plans(self.aircraft)
+        for flight_plan in flight_plans:
+            flight_plan.evaluate()
+        write_flight_plans(self.path, flight_plans)
+        columns = PlanColumns(self.path)
+        np.testing.assert_allclose(columns["total_time"], [plan.total_time for plan in flight_plans])
+        self.assertEqual(columns.render_summary(), summarize(flight_plans))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from aircraft.N8273V import N8273V
+from classes.plan_stream import process_plan_file
+
+
+aircraft = N8273V()
+TOLERANCE = 1e-9
+
+
+def leg_record(plan_id: str, kind: str, from_waypoint: str, to_waypoint: str, start_altitude: float,
+               end_altitude: float, **overrides) -> dict:
+    record = {"plan_id": plan_id, "kind": kind, "from_waypoint": from_waypoint, "to_waypoint": to_waypoint,
+              "distance": 15, "true_course": 43, "true_airspeed": 76, "start_altitude": start_altitude,
+              "end_altitude": end_altitude, "wind_direction": 289, "wind_speed": 4, "temperature": 73.4,
+              "mag_var": 6}
+    record.update(overrides)
+    return record
+
+
+def plan_records(plan_id: str, **overrides) -> list[dict]:
+    return [leg_record(plan_id, "Climb", "KPDK", "TOC", 998, 5500),
+            leg_record(plan_id, "Cruise", "TOC", "GVL", 5500, 5500, true_airspeed=115, distance=12),
+            leg_record(plan_id, "Descend", "GVL", "Habersham", 5500, 998, true_airspeed=122, **overrides)]
+
+
+class TestPlanStream(unittest.TestCase):
+    """
+    Tests to ensure that plan files are streamed, evaluated and rejected correctly.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.records = (plan_records("A") +
+                        plan_records("B", distance="not a number") +
+                        plan_records("C", temperature=150) +
+                        [leg_record("D", "Cruise", "X", "Y", 5500, 5500)] +
+                        plan_records("E"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def check_results(self, output_path: str, counts: dict) -> None:
+        with open(self.path("rejects.jsonl")) as file:
+            rejects = [json.loads(line) for line in file]
+
+        rejected_plans = {reject["plan_id"] for reject in rejects} - {None}
+        self.assertEqual(rejected_plans, {"B", "C", "D"})
+        self.assertEqual(counts["rejects"], len(rejects))
+        self.assertEqual(counts["rows"], 6)
+
+        if output_path.endswith(".csv"):
+            with open(output_path, newline="") as file:
+                rows = list(csv.DictReader(file))
+        else:
+            with open(output_path) as file:
+                rows = [json.loads(line) for line in file]
+
+        self.assertEqual([row["plan_id"] for row in rows], ["A"] * 3 + ["E"] * 3)
+        self.assertAlmostEqual(float(rows[0]["remaining_distance_nm"]), 27, delta=TOLERANCE)
+        self.assertEqual(rows[1]["kind"], "Cruise")
+
+    def test_jsonl(self):
+        with open(self.path("plans.jsonl"), "w") as file:
+            for record in self.records:
+                file.write(json.dumps(record) + "\n")
+            file.write("{not json\n")
+
+        counts = process_plan_file(self.path("plans.jsonl"), self.path("results.jsonl"),
+                                   self.path("rejects.jsonl"), aircraft, batch_size=2)
+        self.check_results(self.path("results.jsonl"), counts)
+
+    def test_csv(self):
+        with open(self.path("plans.csv"), "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(self.records[0]))
+            writer.writeheader()
+            writer.writerows(self.records)
+
+        counts = process_plan_file(self.path("plans.csv"), self.path("results.csv"),
+                                   self.path("rejects.jsonl"), aircraft)
+        self.check_results(self.path("results.csv"), counts)
+
+
+if __name__ == '__main__':
+    unittest.main()
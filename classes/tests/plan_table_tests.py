@@ -0,0 +1,98 @@
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.flightplan import FlightPlan
+from classes.legs import Climb, Cruise, Descend
+from classes.plan_table import PlanTable, OUTPUT_COLUMNS
+from classes.waypoints import Waypoint
+
+
+aircraft = N8273V()
+TOLERANCE = 1e-9
+
+
+def build_plan(rng: np.random.Generator, n_cruise_legs: int) -> FlightPlan:
+    cruise_altitude = rng.uniform(3000, 9000)
+    legs = [Climb(from_waypoint=Waypoint("DEP"),
+                  to_waypoint=Waypoint("TOC"),
+                  distance=rng.uniform(5, 20),
+                  true_course=rng.uniform(0, 360),
+                  true_airspeed=76,
+                  start_altitude=rng.uniform(0, 2000),
+                  end_altitude=cruise_altitude,
+                  wind_direction=rng.uniform(0, 360),
+                  wind_speed=rng.uniform(0, 30),
+                  temperature=rng.uniform(0, 90),
+                  mag_var=rng.uniform(-15, 15))]
+
+    for k in range(n_cruise_legs):
+        legs.append(Cruise(from_waypoint=legs[-1].to_waypoint,
+                           to_waypoint=Waypoint(f"WP{k}"),
+                           distance=rng.uniform(5, 50),
+                           true_course=rng.uniform(0, 360),
+                           true_airspeed=115,
+                           altitude=cruise_altitude,
+                           wind_direction=rng.uniform(0, 360),
+                           wind_speed=rng.uniform(0, 30),
+                           temperature=rng.uniform(0, 90),
+                           mag_var=rng.uniform(-15, 15)))
+
+    legs.append(Descend(from_waypoint=legs[-1].to_waypoint,
+                        to_waypoint=Waypoint("ARR"),
+                        distance=rng.uniform(5, 20),
+                        true_course=rng.uniform(0, 360),
+                        true_airspeed=122,
+                        start_altitude=cruise_altitude,
+                        end_altitude=rng.uniform(0, 2000),
+                        wind_direction=rng.uniform(0, 360),
+                        wind_speed=rng.uniform(0, 30),
+                        temperature=rng.uniform(0, 90),
+                        mag_var=rng.uniform(-15, 15)))
+
+    return FlightPlan(legs, aircraft=aircraft)
+
+
+class TestPlanTable(unittest.TestCase):
+    """
+    Tests to ensure that the batch plan table matches the per-object FlightPlan evaluation.
+    """
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.flight_plans = [build_plan(rng, n_cruise_legs) for n_cruise_legs in rng.integers(0, 6, size=50)]
+
+    def test_evaluate_matches_flight_plan(self):
+        table = PlanTable.from_flight_plans(self.flight_plans)
+        table.evaluate(aircraft)
+
+        for i, flight_plan in enumerate(self.flight_plans):
+            flight_plan.evaluate()
+            self.assertAlmostEqual(table.total_time[i], flight_plan.total_time, delta=TOLERANCE)
+            self.assertAlmostEqual(table.total_distance[i], flight_plan.total_distance, delta=TOLERANCE)
+            self.assertAlmostEqual(table.total_fuel[i], flight_plan.total_fuel, delta=TOLERANCE)
+
+            for j, leg in enumerate(flight_plan.plan):
+                for name in OUTPUT_COLUMNS:
+                    if not hasattr(leg, name):
+                        continue
+                    with self.subTest(plan=i, leg=j, column=name):
+                        self.assertAlmostEqual(getattr(table, name)[i, j], getattr(leg, name), delta=TOLERANCE)
+
+            self.assertTrue(np.all(np.isnan(table.time_min[i, len(flight_plan.plan):])))
+
+    def test_round_trip(self):
+        table = PlanTable.from_flight_plans(self.flight_plans)
+        table.evaluate(aircraft)
+        converted = table.to_flight_plans(aircraft)
+
+        for original, flight_plan in zip(self.flight_plans, converted):
+            original.evaluate()
+            self.assertEqual(len(original.plan), len(flight_plan.plan))
+            self.assertAlmostEqual(original.total_fuel, flight_plan.total_fuel, delta=TOLERANCE)
+            for original_leg, leg in zip(original.plan, flight_plan.plan):
+                self.assertIs(type(original_leg), type(leg))
+                self.assertEqual(original_leg.from_waypoint.name, leg.from_waypoint.name)
+                self.assertAlmostEqual(original_leg.remaining_fuel_gal, leg.remaining_fuel_gal, delta=TOLERANCE)
+
+
+if __name__ == '__main__':
+    unittest.main()
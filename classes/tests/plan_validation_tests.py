@@ -0,0 +1,111 @@
+import unittest
+import numpy as np
+from classes.flightplan import FlightPlan
+from classes.leg_cache import LegCache
+from classes.plan_table import PlanTable, LEG_CLIMB
+from classes.plan_validation import validate_plan_table, valid_plans, describe_violations, INVALID_INPUT, \
+    TEMPERATURE_ENVELOPE, ALTITUDE_ENVELOPE, CLIMB_DIRECTION, DESCENT_DIRECTION, ALTITUDE_DISCONTINUITY, \
+    ROUTE_DISCONTINUITY, INSUFFICIENT_FUEL, TOO_FEW_LEGS
+from classes.tests.altitude_optimizer_tests import build_route
+from classes.tests.forecast_tests import build_geographic_route
+
+
+class TestPlanValidation(unittest.TestCase):
+    """
+    Tests to ensure that the vectorized validation flags the legs the scalar planner asserts on.
+    """
+    def setUp(self):
+        route = build_route()
+        self.aircraft = route.aircraft
+        self.table = PlanTable.from_flight_plans([route] * 9 + [build_geographic_route()])
+
+    def test_valid_plans(self):
+        violations = validate_plan_table(self.table, self.aircraft)
+        self.assertEqual(violations.shape, self.table.shape)
+        self.assertFalse(violations.any())
+        self.table.evaluate(self.aircraft)
+        np.testing.assert_array_equal(validate_plan_table(self.table, self.aircraft), violations)
+
+    def test_violations(self):
+        table = self.table
+        table.temperature[1, 0] = 120
+        table.end_altitude[2, 0], table.start_altitude[2, 1] = 15500, 15500
+        table.end_altitude[3, 3] = 6000
+        table.start_altitude[4, 2] = 6500
+        table.to_waypoints[5, 1] = "KAHN"
+        table.distance[6, 2] = np.nan
+        table.kind[7, 1] = LEG_CLIMB
+        table.n_legs[8] = 1
+        table.valid[8, 1:] = False
+
+        violations = validate_plan_table(table, self.aircraft)
+        self.assertEqual(violations[1, 0], TEMPERATURE_ENVELOPE)
+        self.assertEqual(violations[2, 0], ALTITUDE_ENVELOPE)
+        self.assertEqual(violations[2, 1], 0)
+        self.assertEqual(violations[3, 3], DESCENT_DIRECTION)
+        self.assertEqual(violations[4, 2], ALTITUDE_DISCONTINUITY)
+        self.assertEqual(violations[5, 2], ROUTE_DISCONTINUITY)
+        self.assertEqual(violations[6, 2], INVALID_INPUT)
+        self.assertEqual(violations[7, 1], CLIMB_DIRECTION)
+        np.testing.assert_array_equal(violations[8], [TOO_FEW_LEGS, 0, 0, 0])
+        self.assertEqual(describe_violations(violations[3, 3]), ["descent leg does not descend"])
+
+        # a single pass reports every bad plan, the good ones are kept
+        np.testing.assert_array_equal(valid_plans(violations), [True] + [False] * 8 + [True])
+        self.assertEqual(len(table.take(valid_plans(violations))), 2)
+
+        # the scalar planner rejects the legs flagged for the performance models
+        for i, j in ((1, 0), (2, 0), (7, 1)):
+            compute = self.aircraft.compute_climb if table.kind[i, j] == LEG_CLIMB else self.aircraft.compute_descent
+            with self.assertRaises(AssertionError):
+                compute(table.start_altitude[i, j].item(), table.end_altitude[i, j].item(),
+                        table.temperature[i, j].item())
+
+    def test_fuel(self):
+        self.table.evaluate(self.aircraft)
+        fuel_on_board = self.table.total_fuel + self.aircraft.performance_profile["fuel_rate_gph"] / 2
+        fuel_on_board[3] -= 0.5 * self.table.fuel_gal[3, -1]
+        violations = validate_plan_table(self.table, self.aircraft, fuel_on_board=fuel_on_board)
+        np.testing.assert_array_equal(violations[3], [0, 0, 0, INSUFFICIENT_FUEL])
+        np.testing.assert_array_equal(valid_plans(violations), np.arange(10) != 3)
+        np.testing.assert_array_equal(valid_plans(violations, ignore=INSUFFICIENT_FUEL), True)
+
+        # the fuel of an unevaluated table is solved from the wind triangle
+        unevaluated = PlanTable.from_flight_plans([build_route()])
+        self.assertEqual(validate_plan_table(unevaluated, self.aircraft, fuel_on_board=fuel_on_board[3:4])[0, -1],
+                         INSUFFICIENT_FUEL)
+
+    def test_skip_validation(self):
+        route = build_route()
+        route.evaluate()
+        unchecked = FlightPlan(build_route().plan, self.aircraft, validate=False)
+        unchecked.evaluate()
+        self.assertEqual(unchecked.total_fuel, route.total_fuel)
+        self.assertEqual(unchecked.plan[-1].descend_time_min, route.plan[-1].descend_time_min)
+
+        FlightPlan(route.plan[:1], self.aircraft, validate=False)
+        with self.assertRaises(AssertionError):
+            FlightPlan(route.plan[:1], self.aircraft)
+        with self.assertRaises(AssertionError):
+            self.aircraft.compute_climb(5000, 4000, 60)
+        self.aircraft.compute_descent(5000, 4000, 60, validate=False)
+
+    def test_skip_validation_with_leg_cache(self):
+        # a climb with a temperature outside of the envelope of the performance models
+        plan = build_route().plan
+        plan[0].temperature = 120
+        with self.assertRaises(AssertionError):
+            FlightPlan(plan, self.aircraft, leg_cache=LegCache()).evaluate()
+
+        cache = LegCache()
+        unchecked = FlightPlan(plan, self.aircraft, leg_cache=cache, validate=False)
+        unchecked.evaluate()
+        self.assertEqual(cache.misses, len(plan))
+        expected = FlightPlan(build_route().plan, self.aircraft, validate=False)
+        expected.plan[0].temperature = 120
+        expected.evaluate()
+        self.assertEqual(unchecked.plan[0].climb_time_min, expected.plan[0].climb_time_min)
+
+
+if __name__ == '__main__':
+    unittest.main()
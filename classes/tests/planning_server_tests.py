@@ -0,0 +1,108 @@
+import asyncio
+import json
+import unittest
+from http import HTTPStatus
+from aircraft.N8273V import N8273V
+from benchmarks.load_generator import run_load
+from classes.flightplan import FlightPlan
+from classes.plan_stream import parse_leg
+from classes.planning_server import PlanningServer
+from classes.tests.plan_stream_tests import plan_records
+
+
+def plan_request(**overrides) -> dict:
+    legs = []
+    for record in plan_records("A", **overrides):
+        record.pop("plan_id")
+        legs.append(record)
+    return {"legs": legs}
+
+
+class TestPlanningServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests to ensure that concurrent requests are batched, answered individually and shed when the queue is full.
+    """
+    async def asyncSetUp(self):
+        self.server = PlanningServer(port=0, max_batch_size=16, max_batch_delay=0.02)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def request(self, payload: dict) -> tuple[int, dict]:
+        body = json.dumps(payload).encode()
+        reader, writer = await asyncio.open_connection(self.server.host, self.server.port)
+        try:
+            writer.write(f"POST /evaluate HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+                         .encode() + body)
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, reply = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(reply)
+
+    async def test_concurrent_requests(self):
+        temperatures = [40 + i for i in range(20)]
+        replies = await asyncio.gather(*(self.request(plan_request(temperature=temperature))
+                                         for temperature in temperatures))
+
+        for temperature, (status, reply) in zip(temperatures, replies):
+            legs = [parse_leg(record)[1] for record in plan_records("A", temperature=temperature)]
+            flight_plan = FlightPlan(legs, aircraft=N8273V())
+            flight_plan.evaluate()
+
+            self.assertEqual(status, HTTPStatus.OK)
+            self.assertEqual(reply["aircraft"], "N8273V")
+            self.assertAlmostEqual(reply["total_time_min"], flight_plan.total_time)
+            self.assertAlmostEqual(reply["total_fuel_gal"], flight_plan.total_fuel)
+            self.assertEqual([leg["to_waypoint"] for leg in reply["legs"]], ["TOC", "GVL", "Habersham"])
+
+        self.assertEqual(self.server.stats["batched_plans"], len(temperatures))
+        self.assertLess(self.server.stats["batches"], len(temperatures))
+        self.assertLessEqual(self.server.stats["max_batch_size"], 16)
+
+    async def test_invalid_requests(self):
+        status, reply = await self.request(plan_request(distance="far"))
+        self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+        self.assertIn("distance", reply["error"])
+
+        status, _ = await self.request({**plan_request(), "aircraft": "N0000X"})
+        self.assertEqual(status, HTTPStatus.NOT_FOUND)
+
+        # outside of the atmospheric envelope
+        status, _ = await self.request(plan_request(temperature=150))
+        self.assertEqual(status, HTTPStatus.UNPROCESSABLE_ENTITY)
+
+    async def test_keep_alive_load(self):
+        results = await run_load(self.server.host, self.server.port, n_requests=200, concurrency=8)
+        self.assertEqual(results["statuses"], {HTTPStatus.OK: 200})
+        self.assertGreater(results["p99_ms"], 0)
+
+        reader, writer = await asyncio.open_connection(self.server.host, self.server.port)
+        writer.write(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+        health = json.loads((await reader.read()).partition(b"\r\n\r\n")[2])
+        writer.close()
+        self.assertEqual(health["batched_plans"], 200)
+        self.assertEqual(health["pending"], 0)
+
+
+class TestBackpressure(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_are_shed(self):
+        # not started: nothing drains the queue
+        server = PlanningServer(max_pending=2)
+        body = json.dumps(plan_request()).encode()
+        pending = [asyncio.create_task(server.handle_request("POST", "/evaluate", body)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        status, _ = await server.handle_request("POST", "/evaluate", body)
+        self.assertEqual(status, HTTPStatus.SERVICE_UNAVAILABLE)
+        self.assertEqual(server.stats["shed"], 1)
+
+        await server.close()
+        for status, _ in await asyncio.gather(*pending):
+            self.assertEqual(status, HTTPStatus.SERVICE_UNAVAILABLE)
+
+
+if __name__ == '__main__':
+    unittest.main()
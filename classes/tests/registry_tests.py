@@ -0,0 +1,90 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.registry import AircraftRegistry, PROFILE_DIR
+from models.performance_grid import MODEL_NAMES
+
+
+class TestAircraftRegistry(unittest.TestCase):
+    """
+    Tests to ensure that registry aircraft match the hand-written aircraft and that the store is used when current.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.profile_dir = self.directory.name
+        self.store_path = os.path.join(self.profile_dir, "fleet_models.npy")
+
+        with open(os.path.join(PROFILE_DIR, "N8273V.json")) as file:
+            profile = json.load(file)
+        models = {name: getattr(N8273V(), f"{name}_model").tolist() for name in MODEL_NAMES}
+
+        # a fleet of copies of N8273V, with cubic models on the odd tail numbers
+        for i in range(10):
+            profile["callsign"] = f"N{i:03d}"
+            profile["models"] = {name: coefficients[-4:] if i % 2 else coefficients
+                                 for name, coefficients in models.items()}
+            with open(os.path.join(self.profile_dir, f"N{i:03d}.json"), "w") as file:
+                json.dump(profile, file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_hand_written_aircraft(self):
+        registry = AircraftRegistry()
+        aircraft = registry["N8273V"]
+        reference = N8273V()
+
+        self.assertIs(registry["N8273V"], aircraft)
+        self.assertEqual(aircraft.compute_climb(1000, 5500, 60), reference.compute_climb(1000, 5500, 60))
+        self.assertEqual(aircraft.compute_descent(5500, 1000, 60), reference.compute_descent(5500, 1000, 60))
+        for heading in range(0, 360, 7):
+            self.assertEqual(aircraft.compute_mag_dev(heading), reference.compute_mag_dev(heading))
+
+    def test_lazy_loading(self):
+        registry = AircraftRegistry(self.profile_dir)
+        self.assertEqual(len(registry), 10)
+        self.assertEqual(registry.loaded, [])
+
+        registry.get("N004")
+        self.assertEqual(registry.loaded, ["N004"])
+
+    def test_store_matches_profiles(self):
+        expected = AircraftRegistry(self.profile_dir)
+        registry = AircraftRegistry(self.profile_dir)
+        registry.build_store(self.store_path)
+        self.assertEqual(registry.store.shape, (10, len(MODEL_NAMES), 6))
+        # the index is stored in the store file, no sidecar is written next to the profiles
+        self.assertEqual(sorted(os.listdir(self.profile_dir)),
+                         [f"N{i:03d}.json" for i in range(10)] + ["fleet_models.npy"])
+
+        for callsign in registry:
+            self.assertTrue(np.shares_memory(registry[callsign].time_to_climb_model, registry.store))
+            self.assertEqual(registry[callsign].compute_climb(2000, 8000, 40),
+                             expected[callsign].compute_climb(2000, 8000, 40))
+
+        # pickling keeps the store, not the loaded aircraft
+        unpickled = pickle.loads(pickle.dumps(registry))
+        self.assertEqual(unpickled.loaded, [])
+        self.assertTrue(np.shares_memory(unpickled["N001"].fuel_to_descend_model, unpickled.store))
+
+    def test_changed_profile_bypasses_store(self):
+        AircraftRegistry(self.profile_dir).build_store(self.store_path)
+
+        path = os.path.join(self.profile_dir, "N002.json")
+        with open(path) as file:
+            profile = json.load(file)
+        profile["models"]["time_to_climb"] = [0.0, 1.0, 0.0]
+        with open(path, "w") as file:
+            json.dump(profile, file)
+
+        registry = AircraftRegistry(self.profile_dir, self.store_path)
+        self.assertEqual(registry["N002"].time_to_climb_model.tolist(), [0.0, 0.0, 0.0, 0.0, 1.0, 0.0])
+        self.assertTrue(np.shares_memory(registry["N003"].time_to_climb_model, registry.store))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.legs import Climb, Cruise, Descend
+from classes.routing import WaypointGraph, compute_edge_costs, find_route
+from classes.waypoint_database import WaypointDatabase
+from classes.waypoints import Waypoint
+from models.geodesy import great_circle
+from models.wind_field import WindField
+from models.winds_aloft import WindsAloft
+
+
+aircraft = N8273V()
+
+
+def constant_winds(wind_direction: float, wind_speed: float) -> WindsAloft:
+    return WindsAloft(altitudes=[0, 15000], wind_direction=[wind_direction] * 2, wind_speed=[wind_speed] * 2,
+                      temperature=[70, 40])
+
+
+class TestRouting(unittest.TestCase):
+    """
+    Tests to ensure that the route search finds the cheapest route under the winds and builds a valid flight plan.
+    """
+    def test_a_star_matches_dijkstra(self):
+        rng = np.random.default_rng(0)
+        database = WaypointDatabase([f"WP{i}" for i in range(400)], rng.uniform(33, 36, 400),
+                                    rng.uniform(-86, -82, 400))
+        graph = WaypointGraph.within_range(database, 25)
+        winds = WindsAloft(altitudes=[0, 6000, 12000], wind_direction=[250, 270, 290], wind_speed=[10, 25, 45],
+                           temperature=[70, 55, 40])
+
+        costs, heuristic_speed = compute_edge_costs(graph, aircraft, winds, 5500)
+        for origin, destination in rng.integers(0, 400, (10, 2)):
+            _, distance = great_circle(graph.latitudes, graph.longitudes, graph.latitudes[destination],
+                                       graph.longitudes[destination])
+            with self.subTest(origin=origin, destination=destination):
+                path, cost = graph.shortest_path(origin, destination, costs, distance / heuristic_speed * 60)
+                reference_path, reference_cost = graph.shortest_path(origin, destination, costs)
+                self.assertAlmostEqual(cost, reference_cost)
+                if path:
+                    edge = {(a, b): i for i, (a, b) in enumerate(zip(graph.edge_sources, graph.edge_targets))}
+                    self.assertAlmostEqual(sum(costs[edge[a, b]] for a, b in zip(path[:-1], path[1:])), cost)
+
+    def test_wind_optimal_route(self):
+        # two routes of equal length around a diamond, north and south of the direct course
+        waypoints = [Waypoint("A", 34.0, -85.0), Waypoint("N", 34.5, -84.4), Waypoint("S", 33.5, -84.4),
+                     Waypoint("B", 34.0, -83.8)]
+        graph = WaypointGraph(waypoints, [(0, 1), (1, 3), (0, 2), (2, 3)])
+
+        # wind increasing from none in the south to 40 kts in the north
+        for wind_direction, expected in ((90, "S"), (270, "N")):
+            wind_speed = np.broadcast_to(np.reshape([0.0, 40.0], (1, 1, 2, 1)), (1, 2, 2, 2))
+            winds = WindField.from_forecast([0.0], [0.0, 12000.0], [33.0, 35.0], [-86.0, -83.0],
+                                            np.full((1, 2, 2, 2), float(wind_direction)), wind_speed,
+                                            np.full((1, 2, 2, 2), 60.0))
+            plan = find_route(graph, aircraft, "A", "B", winds, cruise_altitude=5500, departure_altitude=1000,
+                              arrival_altitude=1000, mag_var=5)
+            self.assertEqual([leg.to_waypoint.name for leg in plan.plan], [expected, "B"])
+
+        plan = find_route(graph, aircraft, "A", "B", constant_winds(0, 30), 5500, 1000, 1000, mag_var=5)
+        self.assertIsInstance(plan.plan[0], Climb)
+        self.assertIsInstance(plan.plan[-1], Descend)
+        plan.evaluate()
+        self.assertGreater(plan.total_time, 0)
+
+    def test_single_edge_and_unreachable(self):
+        waypoints = [Waypoint("A", 34.0, -85.0), Waypoint("B", 34.3, -84.5), Waypoint("C", 35.0, -84.0)]
+        graph = WaypointGraph(waypoints, [(0, 1)], bidirectional=False)
+
+        plan = find_route(graph, aircraft, "A", "B", constant_winds(270, 10), 4500, 1000, 1200, mag_var=5)
+        self.assertEqual([type(leg) for leg in plan.plan], [Climb, Descend])
+        self.assertEqual(plan.plan[0].to_waypoint.name, "Top of Climb")
+
+        self.assertIsNone(find_route(graph, aircraft, "B", "A", constant_winds(270, 10), 4500, 1000, 1200, mag_var=5))
+        self.assertIsNone(find_route(graph, aircraft, "A", "C", constant_winds(270, 10), 4500, 1000, 1200, mag_var=5))
+
+    def test_cruise_legs(self):
+        waypoints = [Waypoint(f"WP{i}", 34.0, -85.0 + 0.2 * i) for i in range(6)]
+        graph = WaypointGraph(waypoints, [(i, i + 1) for i in range(5)])
+
+        plan = find_route(graph, aircraft, "WP0", "WP5", constant_winds(270, 10), 5500, 1000, 1000, mag_var=5,
+                          objective="fuel")
+        self.assertEqual([type(leg) for leg in plan.plan], [Climb, Cruise, Cruise, Cruise, Descend])
+        self.assertTrue(all(abs(leg.true_course - 90) < 1 for leg in plan.plan))
+
+
+if __name__ == '__main__':
+    unittest.main()
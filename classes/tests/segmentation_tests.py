@@ -0,0 +1,121 @@
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.flightplan import FlightPlan
+from classes.legs import Climb, Cruise, Descend
+from classes.plan_table import PlanTable, LEG_CLIMB, LEG_DESCEND
+from classes.segmentation import segment_route, segment_plan_table
+from classes.waypoints import Waypoint
+from models.geodesy import great_circle
+from models.winds import compute_wind_triangle
+
+
+aircraft = N8273V()
+
+
+def build_lateral_route(wind_direction: float = 270, wind_speed: float = 20) -> list[Cruise]:
+    waypoints = [Waypoint("KPDK", 33.8756, -84.3020), Waypoint("Lake Lanier", 34.18, -83.95),
+                 Waypoint("GVL", 34.2726, -83.8302), Waypoint("Habersham", 34.3997, -83.5561)]
+    return [Cruise(from_waypoint=from_waypoint, to_waypoint=to_waypoint, distance=None, true_course=None,
+                   true_airspeed=115, altitude=5500, wind_direction=wind_direction, wind_speed=wind_speed,
+                   temperature=59, mag_var=6) for from_waypoint, to_waypoint in zip(waypoints[:-1], waypoints[1:])]
+
+
+def flown_time(legs: list, true_airspeed: float) -> float:
+    time = 0
+    for leg in legs:
+        _, gs, _, _ = compute_wind_triangle(leg.true_course, true_airspeed, leg.wind_direction, leg.wind_speed)
+        time += leg.distance / gs * 60
+    return time
+
+
+class TestSegmentation(unittest.TestCase):
+    """
+    Tests to ensure that the top of climb and top of descent are placed where the climb and descent times are flown
+    and that the scalar and vectorized modes agree.
+    """
+    def test_segment_route(self):
+        route = build_lateral_route()
+        flight_plan = segment_route(route, aircraft, departure_altitude=998, cruise_altitude=5500,
+                                    arrival_altitude=998)
+
+        self.assertEqual([type(leg) for leg in flight_plan.plan], [Climb, Cruise, Descend, Descend, Descend])
+        self.assertEqual([leg.to_waypoint.name for leg in flight_plan.plan],
+                         ["Top of Climb", "Top of Descent", "Lake Lanier", "GVL", "Habersham"])
+        self.assertAlmostEqual(sum(leg.distance for leg in flight_plan.plan), sum(leg.distance for leg in route))
+
+        # the climb and descent take the modeled times at the climb and descent airspeeds
+        profile = aircraft.performance_profile
+        climb_time, _, _ = aircraft.compute_climb(998, 5500, 59)
+        descent_time, _, _ = aircraft.compute_descent(5500, 998, 59)
+        climbs = [leg for leg in flight_plan.plan if isinstance(leg, Climb)]
+        descents = [leg for leg in flight_plan.plan if isinstance(leg, Descend)]
+        self.assertAlmostEqual(flown_time(climbs, profile["climb_speed_kts"]), climb_time)
+        self.assertAlmostEqual(flown_time(descents, profile["descend_speed_kts"]), descent_time)
+
+        # altitudes are continuous from the departure to the arrival
+        altitudes = [flight_plan.plan[0].start_altitude] + [leg.end_altitude for leg in flight_plan.plan]
+        self.assertEqual(altitudes[0], 998)
+        self.assertEqual(altitudes[-1], 998)
+        self.assertEqual(max(altitudes), 5500)
+        for leg, next_leg in zip(flight_plan.plan[:-1], flight_plan.plan[1:]):
+            self.assertEqual(leg.end_altitude, next_leg.start_altitude)
+
+        # the inserted waypoints lie on the great circle of their leg
+        top_of_climb = flight_plan.plan[0].to_waypoint
+        first_leg = route[0]
+        _, to_top = great_circle(first_leg.from_waypoint.latitude, first_leg.from_waypoint.longitude,
+                                 top_of_climb.latitude, top_of_climb.longitude)
+        _, from_top = great_circle(top_of_climb.latitude, top_of_climb.longitude, first_leg.to_waypoint.latitude,
+                                   first_leg.to_waypoint.longitude)
+        self.assertAlmostEqual(float(to_top), flight_plan.plan[0].distance, places=6)
+        self.assertAlmostEqual(float(to_top + from_top), first_leg.distance, places=6)
+
+        flight_plan.evaluate()
+        self.assertGreater(flight_plan.total_time, 0)
+
+    def test_route_at_cruise_altitude(self):
+        flight_plan = segment_route(build_lateral_route(), aircraft, departure_altitude=5500, cruise_altitude=5500,
+                                    arrival_altitude=998)
+        self.assertIsInstance(flight_plan.plan[0], Cruise)
+        self.assertEqual(flight_plan.plan[0].from_waypoint.name, "KPDK")
+        self.assertNotIn("Top of Climb", [leg.to_waypoint.name for leg in flight_plan.plan])
+
+    def test_infeasible_route(self):
+        with self.assertRaises(AssertionError):
+            segment_route(build_lateral_route(), aircraft, departure_altitude=998, cruise_altitude=12500,
+                          arrival_altitude=998)
+
+    def test_plan_table_matches_route(self):
+        routes = [build_lateral_route(270, 20), build_lateral_route(90, 30), build_lateral_route(0, 0)[:2]]
+        table = PlanTable.from_flight_plans([FlightPlan(route, aircraft=aircraft) for route in routes])
+        cruise_altitude = np.array([5500, 4500, 12500])
+        segmented, feasible = segment_plan_table(table, aircraft, departure_altitude=998,
+                                                 cruise_altitude=cruise_altitude, arrival_altitude=998)
+
+        np.testing.assert_array_equal(feasible, [True, True, False])
+        self.assertTrue(np.isnan(segmented.distance[2]).all())
+        for i, route in enumerate(routes[:2]):
+            flight_plan = segment_route(route, aircraft, departure_altitude=998,
+                                        cruise_altitude=cruise_altitude[i], arrival_altitude=998)
+            n_legs = len(flight_plan.plan)
+            self.assertEqual(segmented.n_legs[i], n_legs)
+            np.testing.assert_allclose(segmented.distance[i, :n_legs], [leg.distance for leg in flight_plan.plan])
+            np.testing.assert_allclose(segmented.start_altitude[i, :n_legs],
+                                       [leg.start_altitude for leg in flight_plan.plan])
+            np.testing.assert_allclose(segmented.end_altitude[i, :n_legs],
+                                       [leg.end_altitude for leg in flight_plan.plan])
+            self.assertEqual(segmented.kind[i, 0], LEG_CLIMB)
+            self.assertEqual(segmented.kind[i, n_legs - 1], LEG_DESCEND)
+            self.assertEqual(list(segmented.to_waypoints[i, :n_legs]),
+                             [leg.to_waypoint.name for leg in flight_plan.plan])
+
+        segmented.evaluate(aircraft)
+        reference = segment_route(routes[0], aircraft, departure_altitude=998, cruise_altitude=5500,
+                                  arrival_altitude=998)
+        reference.evaluate()
+        self.assertAlmostEqual(segmented.total_time[0], reference.total_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
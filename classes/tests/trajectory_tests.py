@@ -0,0 +1,107 @@
+import unittest
+import numpy as np
+from classes.flightplan import FlightPlan
+from classes.legs import Cruise
+from classes.plan_table import PlanTable
+from classes.tests.altitude_optimizer_tests import build_route
+from classes.tests.forecast_tests import build_geographic_route
+from classes.trajectory import simulate_flight_plans, simulate_trajectories
+from models.geodesy import great_circle
+from models.winds_aloft import WindsAloft
+
+
+def collect(chunks) -> dict:
+    chunks = [chunk.copy() for chunk in chunks]
+    return {name: np.concatenate([getattr(chunk, name) for chunk in chunks])
+            for name in ("time_s", "leg", "active", "distance_nm", "latitude", "longitude", "altitude",
+                         "ground_speed", "fuel_remaining_gal")}
+
+
+class TestTrajectorySimulator(unittest.TestCase):
+    """
+    Tests to ensure that the simulated trajectories follow the flight plans and the climb/descent models.
+    """
+    def test_matches_flight_plan(self):
+        flight_plans = [build_route(), build_geographic_route()]
+        trajectory = collect(simulate_flight_plans(flight_plans, time_step=1.0, chunk_size=256))
+        aircraft = flight_plans[0].aircraft
+        profile = aircraft.performance_profile
+
+        for i, flight_plan in enumerate(flight_plans):
+            flight_plan.evaluate()
+            active = trajectory["active"][:, i]
+
+            # flights land within a step of the planned time, at the planned distance
+            self.assertAlmostEqual(active.sum(), flight_plan.total_time * 60, delta=1)
+            self.assertAlmostEqual(trajectory["distance_nm"][-1, i], flight_plan.total_distance, places=3)
+            self.assertTrue(np.all(np.diff(trajectory["fuel_remaining_gal"][:, i]) <= 0))
+
+            # fuel burns at the modeled climb and descent fuel flows, then at the cruise fuel rate
+            burned = 0
+            for leg in flight_plan.plan:
+                maneuver_time = (leg.climb_time_min if leg.start_altitude < leg.end_altitude else
+                                 leg.descend_time_min if leg.start_altitude > leg.end_altitude else 0)
+                maneuver_fuel = (leg.climb_fuel_gal if leg.start_altitude < leg.end_altitude else
+                                 leg.descend_fuel_gal if leg.start_altitude > leg.end_altitude else 0)
+                flown = min(maneuver_time, leg.time_min)
+                burned += maneuver_fuel * flown / maneuver_time if maneuver_time else 0
+                burned += profile["fuel_rate_gph"] / 60 * (leg.time_min - flown)
+            self.assertAlmostEqual(profile["fuel_capacity_g"] - trajectory["fuel_remaining_gal"][-1, i], burned,
+                                   places=4)
+
+        # the climb reaches the cruise altitude at the modeled time to climb
+        climb = flight_plans[0].plan[0]
+        at_cruise = np.flatnonzero(trajectory["altitude"][:, 0] >= climb.end_altitude - 1e-3)[0]
+        self.assertAlmostEqual(trajectory["time_s"][at_cruise], climb.climb_time_min * 60, delta=1)
+        self.assertTrue(np.all(np.diff(trajectory["altitude"][:at_cruise + 1, 0]) > 0))
+
+    def test_positions(self):
+        flight_plan = build_geographic_route()
+        trajectory = collect(simulate_flight_plans([flight_plan], time_step=10.0))
+        first, last = flight_plan.plan[0].from_waypoint, flight_plan.plan[-1].to_waypoint
+
+        self.assertAlmostEqual(trajectory["latitude"][0, 0], first.latitude, places=4)
+        self.assertAlmostEqual(trajectory["longitude"][-1, 0], last.longitude, places=4)
+        _, step_distance = great_circle(trajectory["latitude"][:-1, 0], trajectory["longitude"][:-1, 0],
+                                        trajectory["latitude"][1:, 0], trajectory["longitude"][1:, 0])
+        self.assertLessEqual(step_distance.max(), trajectory["ground_speed"].max() * 10 / 3600 + 1e-3)
+
+    def test_lockstep_chunks(self):
+        # flights of different lengths: shorter flights hold their final state
+        plans = []
+        for distance in (10, 40, 25):
+            route = build_route()
+            plans.append(FlightPlan([route.plan[0]] + [Cruise(from_waypoint=route.plan[1].from_waypoint,
+                                                              to_waypoint=route.plan[1].to_waypoint,
+                                                              distance=distance, true_course=43,
+                                                              true_airspeed=115, altitude=5500, wind_direction=0,
+                                                              wind_speed=0, temperature=60, mag_var=6)],
+                                    aircraft=route.aircraft))
+        table = PlanTable.from_flight_plans(plans)
+
+        n_chunks, n_steps = 0, 0
+        for chunk in simulate_trajectories(table, plans[0].aircraft, time_step=5.0, chunk_size=64):
+            self.assertLessEqual(chunk.n_steps, 64)
+            self.assertEqual(chunk.altitude.shape, (chunk.n_steps, 3))
+            self.assertEqual(chunk.altitude.dtype, np.float32)
+            n_chunks += 1
+            n_steps += chunk.n_steps
+            final = chunk
+        self.assertGreater(n_chunks, 1)
+        self.assertFalse(final.active[-1].any())
+        np.testing.assert_allclose(final.distance_nm[-1], [25, 55, 40], atol=1e-4)
+
+    def test_winds_aloft(self):
+        flight_plan = build_route()
+        calm = collect(simulate_flight_plans([flight_plan], time_step=5.0,
+                                             winds=WindsAloft([0, 12000], [0, 0], [0, 0], [60, 60])))
+        headwind = collect(simulate_flight_plans([flight_plan], time_step=5.0,
+                                                 winds=WindsAloft([0, 12000], [43, 43], [0, 40], [60, 60])))
+        self.assertGreater(headwind["time_s"][-1], calm["time_s"][-1])
+        # the headwind grows with altitude
+        climbing = headwind["ground_speed"][1:60, 0]
+        self.assertTrue(np.all(np.diff(climbing) <= 1e-3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from classes.flightplan import FlightPlan
+from classes.legs import Cruise
+from classes.waypoint_database import WaypointDatabase
+from models.geodesy import great_circle
+from models.magnetic_variation import MagneticVariationGrid
+
+
+class TestWaypointDatabase(unittest.TestCase):
+    """
+    Tests to ensure that waypoint searches match brute force searches and that legs derive their geometry.
+    """
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.latitudes = np.degrees(np.arcsin(rng.uniform(-1, 1, 2000)))
+        self.longitudes = rng.uniform(-180, 180, 2000)
+        self.database = WaypointDatabase([f"WP{i}" for i in range(2000)], self.latitudes, self.longitudes)
+
+    def test_nearest_and_within(self):
+        rng = np.random.default_rng(1)
+        for latitude, longitude in zip(rng.uniform(-90, 90, 20), rng.uniform(-180, 180, 20)):
+            _, distances = great_circle(latitude, longitude, self.latitudes, self.longitudes)
+            order = np.argsort(distances)
+
+            nearest = self.database.nearest(latitude, longitude, k=3)
+            self.assertEqual([waypoint.name for waypoint, _ in nearest], [f"WP{i}" for i in order[:3]])
+            np.testing.assert_allclose([distance for _, distance in nearest], distances[order[:3]], rtol=1e-6)
+
+            within = self.database.within(latitude, longitude, 300)
+            self.assertEqual(sorted(waypoint.name for waypoint, _ in within),
+                             sorted(f"WP{i}" for i in np.flatnonzero(distances <= 300)))
+
+    def test_load_and_route(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "waypoints.csv")
+            with open(path, "w") as file:
+                file.write("identifier, latitude, longitude, name\n"
+                           "KPDK, 33.8756, -84.3020, DeKalb-Peachtree\n"
+                           "GVL, 34.2726, -83.8302, Lee Gilmer Memorial\n")
+            database = WaypointDatabase.load(path)
+
+        route = database.route(["KPDK", "GVL"])
+        self.assertEqual(route[1].latitude, 34.2726)
+        self.assertNotIn("KATL", database)
+        with self.assertRaises(KeyError):
+            database["KATL"]
+
+        grid = MagneticVariationGrid(latitudes=[33, 35], longitudes=[-85, -83], variation=[[5, 6], [5, 6]])
+        leg = Cruise(from_waypoint=route[0], to_waypoint=route[1], distance=None, true_course=None,
+                     true_airspeed=115, altitude=5500, wind_direction=289, wind_speed=8, temperature=66.2,
+                     mag_var_grid=grid)
+        course, distance = great_circle(33.8756, -84.3020, 34.2726, -83.8302)
+        self.assertAlmostEqual(leg.true_course, float(course))
+        self.assertAlmostEqual(leg.distance, float(distance))
+        self.assertAlmostEqual(leg.mag_var, 5.5, places=1)
+
+        back = Cruise(from_waypoint=route[1], to_waypoint=route[0], distance=None, true_course=None,
+                      true_airspeed=115, altitude=5500, wind_direction=289, wind_speed=8, temperature=66.2,
+                      mag_var_grid=grid, course_method="rhumb_line")
+        self.assertAlmostEqual(back.true_course, (leg.true_course + 180) % 360, delta=0.5)
+
+        flight_plan = FlightPlan([leg, back], aircraft=N8273V())
+        flight_plan.evaluate()
+        self.assertAlmostEqual(flight_plan.total_distance, leg.distance + back.distance)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+from collections.abc import Iterator
+import numpy as np
+from classes.aircraft import Aircraft
+from classes.flightplan import FlightPlan
+from classes.plan_table import PlanTable, LEG_CLIMB, LEG_DESCEND
+from models.geodesy import intermediate_point
+from models.winds import compute_wind_triangle
+from models.winds_aloft import WindsAloft
+
+# number of altitudes at which the climb/descent model is tabulated to interpolate the altitude along a maneuver
+N_PROFILE_POINTS: int = 17
+TRAJECTORY_COLUMNS: tuple = ("distance_nm", "latitude", "longitude", "altitude", "ground_speed",
+                             "fuel_remaining_gal")
+
+
+class TrajectoryChunk:
+    """
+    Consecutive steps of a simulation. Every per-flight array has shape (S, N) for S steps and N flights; finished
+    flights hold their final state with active False.
+    """
+    def __init__(self, buffers: dict, n_steps: int) -> None:
+        """
+        :param buffers: the preallocated buffers of the simulation, see simulate_trajectories()
+        :param n_steps: number of steps of the chunk
+        """
+        self.n_steps: int = n_steps
+        self.time_s: np.ndarray = buffers["time_s"][:n_steps]
+        self.leg: np.ndarray = buffers["leg"][:n_steps]
+        self.active: np.ndarray = buffers["active"][:n_steps]
+        self.distance_nm: np.ndarray = buffers["distance_nm"][:n_steps]
+        self.latitude: np.ndarray = buffers["latitude"][:n_steps]
+        self.longitude: np.ndarray = buffers["longitude"][:n_steps]
+        self.altitude: np.ndarray = buffers["altitude"][:n_steps]
+        self.ground_speed: np.ndarray = buffers["ground_speed"][:n_steps]
+        self.fuel_remaining_gal: np.ndarray = buffers["fuel_remaining_gal"][:n_steps]
+
+    def copy(self) -> "TrajectoryChunk":
+        """
+        :return: a chunk owning copies of the arrays, to keep after the simulation moves on
+        """
+        names = ("time_s", "leg", "active") + TRAJECTORY_COLUMNS
+        return TrajectoryChunk({name: getattr(self, name).copy() for name in names}, self.n_steps)
+
+
+def maneuver_profiles(table: PlanTable, aircraft: Aircraft) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Tabulates the climb and descent models along every climb and descent leg.
+
+    :param table: (N, M) plan table
+    :param aircraft: the aircraft
+    :return: altitudes: (N, M, K) altitudes from the start to the end altitude of every leg (ft)
+    :return: times: (N, M, K) time to climb or descend from the start altitude to each altitude (min), 0 for
+             cruise legs
+    :return: fuel: (N, M) fuel to climb or descend the whole leg (gal), 0 for cruise legs
+    """
+    fractions = np.linspace(0, 1, N_PROFILE_POINTS)
+    start, end = table.start_altitude[..., np.newaxis], table.end_altitude[..., np.newaxis]
+    altitudes = start + (end - start) * fractions
+    times = np.zeros(altitudes.shape)
+    fuel = np.zeros(table.shape)
+
+    for kind, compute_maneuver in ((LEG_CLIMB, aircraft.compute_climb_batch),
+                                   (LEG_DESCEND, aircraft.compute_descent_batch)):
+        mask = table.valid & (table.kind == kind)
+        if not mask.any():
+            continue
+        time, _, leg_fuel = compute_maneuver(start[mask], altitudes[mask], table.temperature[mask][:, np.newaxis])
+        time[:, 0] = 0.0
+        assert np.all(np.isfinite(time)), "Climbs and descents must be inside of the atmospheric envelope."
+        times[mask] = time
+        fuel[mask] = leg_fuel[:, -1]
+    return altitudes, times, fuel
+
+
+def simulate_trajectories(table: PlanTable, aircraft: Aircraft, time_step: float = 1.0, chunk_size: int = 600,
+                          fuel_on_board: float | np.ndarray | None = None, latitudes: np.ndarray | None = None,
+                          longitudes: np.ndarray | None = None,
+                          winds: WindsAloft | None = None) -> Iterator[TrajectoryChunk]:
+    """
+    Flies N flight plans in lockstep with a fixed time step and streams their state.
+
+    Along a climb or descent leg the altitude follows the aircraft's climb or descent model (the time to climb
+    or descend from the start altitude, interpolated between N_PROFILE_POINTS altitudes) until the end altitude
+    is reached, and fuel burns at the model's average climb or descent fuel flow; the rest of the leg is flown
+    level at the cruise fuel rate. Each step is split at leg ends and at the end of climbs and descents, so the
+    leg times match FlightPlan.evaluate() for the same winds (the fuel only matches on cruise legs, as
+    FlightPlan.evaluate() burns the cruise fuel rate on every leg). With winds, the wind is sampled at the
+    current altitude every step instead of using the winds of the leg.
+
+    The output buffers are allocated once (chunk_size steps × N flights per column, float32 for the per-flight
+    columns) and reused for every chunk: copy() a chunk to keep it past the next iteration.
+
+    :param table: (N, M) plan table of the flights
+    :param aircraft: the aircraft flying every flight
+    :param time_step: time step (s)
+    :param chunk_size: number of steps per chunk
+    :param fuel_on_board: (N,) or scalar fuel at departure (gal), defaults to the aircraft's fuel capacity
+    :param latitudes: (N, M + 1) optional latitude of the route points of every flight in degrees
+    :param longitudes: (N, M + 1) optional longitude of the route points of every flight in degrees
+    :param winds: optional winds aloft, sampled at the altitude of every flight every step
+    :return: generator of chunks, the last one may be shorter
+    """
+    assert time_step > 0 and chunk_size > 0, "time_step and chunk_size must be positive."
+    assert (latitudes is None) == (longitudes is None), "Must give both latitudes and longitudes, or neither."
+
+    n_flights, max_legs = table.shape
+    rows = np.arange(n_flights)
+    profile = aircraft.performance_profile
+    fuel_rate = profile["fuel_rate_gph"] / 60
+    if fuel_on_board is None:
+        fuel_on_board = profile["fuel_capacity_g"]
+
+    profile_altitudes, profile_times, maneuver_fuel = maneuver_profiles(table, aircraft)
+    maneuver_time = profile_times[..., -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        maneuver_flow = np.where(maneuver_time > 0, maneuver_fuel / maneuver_time, fuel_rate)
+    distance = np.where(table.valid, table.distance, 0.0)
+    distance_before = np.cumsum(distance, axis=1) - distance
+    if winds is None:
+        _, leg_gs, _, _ = compute_wind_triangle(table.true_course, table.true_airspeed, table.wind_direction,
+                                                table.wind_speed)
+
+    # state: current leg, distance flown along it (nm), time flown on it (min), altitude and fuel
+    leg = np.zeros(n_flights, dtype=np.intp)
+    along = np.zeros(n_flights)
+    leg_time = np.zeros(n_flights)
+    altitude = table.start_altitude[:, 0].copy()
+    fuel = np.broadcast_to(np.asarray(fuel_on_board, dtype=float), (n_flights,)).copy()
+    ground_speed = np.zeros(n_flights)
+    active = table.n_legs > 0
+
+    buffers = {"time_s": np.empty(chunk_size), "leg": np.empty((chunk_size, n_flights), dtype=np.int16),
+               "active": np.empty((chunk_size, n_flights), dtype=bool)}
+    for name in TRAJECTORY_COLUMNS:
+        buffers[name] = np.empty((chunk_size, n_flights), dtype=np.float32)
+
+    def record(step: int, time: float) -> None:
+        j = np.minimum(leg, max_legs - 1)
+        buffers["time_s"][step] = time
+        buffers["leg"][step] = j
+        buffers["active"][step] = active
+        buffers["distance_nm"][step] = distance_before[rows, j] + along
+        buffers["altitude"][step] = altitude
+        buffers["ground_speed"][step] = ground_speed
+        buffers["fuel_remaining_gal"][step] = fuel
+        if latitudes is None:
+            buffers["latitude"][step] = np.nan
+            buffers["longitude"][step] = np.nan
+            return
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(distance[rows, j] > 0, along / distance[rows, j], 0.0)
+        buffers["latitude"][step], buffers["longitude"][step] = intermediate_point(
+            latitudes[rows, j], longitudes[rows, j], latitudes[rows, j + 1], longitudes[rows, j + 1], fraction)
+
+    step, time = 0, 0.0
+    record(step, time)
+    step += 1
+    while active.any():
+        time += time_step
+        remaining = np.where(active, time_step / 60, 0.0)
+
+        while (flying := np.flatnonzero(remaining > 0)).size:
+            j = leg[flying]
+            if winds is None:
+                gs = leg_gs[flying, j]
+            else:
+                wind_direction, wind_speed, _ = winds.sample(altitude[flying])
+                _, gs, _, _ = compute_wind_triangle(table.true_course[flying, j], table.true_airspeed[flying, j],
+                                                    wind_direction, wind_speed)
+            assert np.all(gs > 0), "Ground speeds must be positive to fly the plans."
+            ground_speed[flying] = gs
+
+            # fly until the end of the step, of the leg or of the climb/descent, whichever comes first
+            maneuvering = leg_time[flying] < maneuver_time[flying, j]
+            with np.errstate(divide="ignore"):
+                to_leg_end = (distance[flying, j] - along[flying]) / gs * 60
+            to_maneuver_end = np.where(maneuvering, maneuver_time[flying, j] - leg_time[flying], np.inf)
+            dt = np.minimum(remaining[flying], np.minimum(to_leg_end, to_maneuver_end))
+
+            along[flying] += gs * dt / 60
+            leg_time[flying] += dt
+            fuel[flying] -= np.where(maneuvering, maneuver_flow[flying, j], fuel_rate) * dt
+            remaining[flying] -= dt
+
+            # altitude along the climb/descent profile, then level at the end altitude
+            times = profile_times[flying, j]
+            k = np.clip(np.sum(times <= leg_time[flying, np.newaxis], axis=1) - 1, 0, N_PROFILE_POINTS - 2)
+            lower, upper = times[np.arange(len(flying)), k], times[np.arange(len(flying)), k + 1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                weight = np.clip(np.where(upper > lower, (leg_time[flying] - lower) / (upper - lower), 1.0), 0, 1)
+            altitudes = profile_altitudes[flying, j]
+            altitude[flying] = altitudes[np.arange(len(flying)), k] + \
+                weight * (altitudes[np.arange(len(flying)), k + 1] - altitudes[np.arange(len(flying)), k])
+
+            # next leg
+            done = along[flying] >= distance[flying, j] - 1e-9
+            if done.any():
+                finished = flying[done]
+                leg[finished] += 1
+                along[finished] = 0.0
+                leg_time[finished] = 0.0
+                landed = leg[finished] >= table.n_legs[finished]
+                active[finished[landed]] = False
+                remaining[finished[landed]] = 0.0
+                leg[finished[landed]] -= 1
+                along[finished[landed]] = distance[finished[landed], leg[finished[landed]]]
+                ground_speed[finished[landed]] = 0.0
+                departing = finished[~landed]
+                altitude[departing] = table.start_altitude[departing, leg[departing]]
+
+        record(step, time)
+        step += 1
+        if step == chunk_size:
+            yield TrajectoryChunk(buffers, step)
+            step = 0
+
+    if step:
+        yield TrajectoryChunk(buffers, step)
+
+
+def simulate_flight_plans(flight_plans: list[FlightPlan], time_step: float = 1.0, chunk_size: int = 600,
+                          fuel_on_board: float | np.ndarray | None = None,
+                          winds: WindsAloft | None = None) -> Iterator[TrajectoryChunk]:
+    """
+    simulate_trajectories() for FlightPlan objects flown by the same aircraft. Positions are interpolated along
+    the great circles between the waypoints if every waypoint has a position.
+
+    :param flight_plans: the flight plans
+    :param time_step: time step (s)
+    :param chunk_size: number of steps per chunk
+    :param fuel_on_board: (N,) or scalar fuel at departure (gal), defaults to the aircraft's fuel capacity
+    :param winds: optional winds aloft, sampled at the altitude of every flight every step
+    :return: generator of chunks
+    """
+    aircraft = flight_plans[0].aircraft
+    table = PlanTable.from_flight_plans(flight_plans)
+
+    latitudes = longitudes = None
+    points = [[flight_plan.plan[0].from_waypoint] + [leg.to_waypoint for leg in flight_plan.plan]
+              for flight_plan in flight_plans]
+    if all(waypoint.has_position for route in points for waypoint in route):
+        latitudes = np.full((len(points), table.shape[1] + 1), np.nan)
+        longitudes = np.full(latitudes.shape, np.nan)
+        for i, route in enumerate(points):
+            latitudes[i, :len(route)] = [waypoint.latitude for waypoint in route]
+            longitudes[i, :len(route)] = [waypoint.longitude for waypoint in route]
+
+    return simulate_trajectories(table, aircraft, time_step=time_step, chunk_size=chunk_size,
+                                 fuel_on_board=fuel_on_board, latitudes=latitudes, longitudes=longitudes,
+                                 winds=winds)
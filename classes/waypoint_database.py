@@ -0,0 +1,96 @@
+import csv
+import numpy as np
+from classes.waypoints import Waypoint
+from common.kd_tree import KDTree
+from models.geodesy import to_unit_vectors, chord_to_distance, distance_to_chord
+
+
+class WaypointDatabase:
+    """
+    In-memory waypoint database (airports, navaids, fixes and VFR reporting points) with lookup by identifier and
+    a spatial index for nearest-neighbour and radius searches. Waypoints are indexed as Earth-centered unit
+    vectors, whose chord lengths order the same as great circle distances, so searches are exact across the
+    antimeridian and near the poles.
+    """
+    def __init__(self, identifiers: list[str], latitudes: np.ndarray, longitudes: np.ndarray) -> None:
+        """
+        :param identifiers: unique identifier of every waypoint (e.g., KPDK, GVL)
+        :param latitudes: latitude of every waypoint in degrees
+        :param longitudes: longitude of every waypoint in degrees
+        """
+        self.latitudes: np.ndarray = np.asarray(latitudes, dtype=float)
+        self.longitudes: np.ndarray = np.asarray(longitudes, dtype=float)
+        assert len(identifiers) == len(self.latitudes) == len(self.longitudes), \
+            "Must have one latitude and one longitude per identifier."
+
+        self.waypoints: list[Waypoint] = [Waypoint(identifier, latitude, longitude) for identifier, latitude, longitude
+                                          in zip(identifiers, self.latitudes.tolist(), self.longitudes.tolist())]
+        self._indices: dict[str, int] = {waypoint.name: i for i, waypoint in enumerate(self.waypoints)}
+        assert len(self._indices) == len(self.waypoints), "Waypoint identifiers must be unique."
+
+        self.tree: KDTree = KDTree(to_unit_vectors(self.latitudes, self.longitudes).reshape(-1, 3))
+
+    @classmethod
+    def load(cls, path: str) -> "WaypointDatabase":
+        """
+        Loads a CSV file with an "identifier, latitude, longitude" header, other columns are ignored.
+
+        :param path: path of the CSV file
+        :return: the database
+        """
+        identifiers, latitudes, longitudes = [], [], []
+        with open(path, newline="") as file:
+            reader = csv.DictReader(file, skipinitialspace=True)
+            for record in reader:
+                identifiers.append(record["identifier"].strip())
+                latitudes.append(float(record["latitude"]))
+                longitudes.append(float(record["longitude"]))
+        return cls(identifiers, latitudes, longitudes)
+
+    def __len__(self) -> int:
+        return len(self.waypoints)
+
+    def __contains__(self, identifier: str) -> bool:
+        return identifier in self._indices
+
+    def __getitem__(self, identifier: str) -> Waypoint:
+        return self.waypoints[self.index(identifier)]
+
+    def index(self, identifier: str) -> int:
+        """
+        :param identifier: waypoint identifier
+        :return: index of the waypoint in the database
+        """
+        index = self._indices.get(identifier)
+        if index is None:
+            raise KeyError(f"No waypoint {identifier} in the database.")
+        return index
+
+    def route(self, identifiers: list[str]) -> list[Waypoint]:
+        """
+        :param identifiers: identifiers of the waypoints of a route, in order
+        :return: the waypoints
+        """
+        return [self[identifier] for identifier in identifiers]
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1) -> list[tuple[Waypoint, float]]:
+        """
+        :param latitude: latitude of the query point in degrees
+        :param longitude: longitude of the query point in degrees
+        :param k: number of waypoints
+        :return: the k closest waypoints and their great circle distances (nm), closest first
+        """
+        chords, indices = self.tree.query(to_unit_vectors(latitude, longitude), k=k)
+        return [(self.waypoints[i], distance) for i, distance in zip(indices.tolist(),
+                                                                     chord_to_distance(chords).tolist())]
+
+    def within(self, latitude: float, longitude: float, radius: float) -> list[tuple[Waypoint, float]]:
+        """
+        :param latitude: latitude of the query point in degrees
+        :param longitude: longitude of the query point in degrees
+        :param radius: search radius in nautical miles
+        :return: every waypoint within the radius and its great circle distance (nm), closest first
+        """
+        chords, indices = self.tree.query_radius(to_unit_vectors(latitude, longitude), float(distance_to_chord(radius)))
+        return [(self.waypoints[i], distance) for i, distance in zip(indices.tolist(),
+                                                                     chord_to_distance(chords).tolist())]
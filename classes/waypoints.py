@@ -1,9 +1,22 @@
+import sys
+
 
 class Waypoint:
-    def __init__(self, name: str) -> None:
+    __slots__ = ("name", "latitude", "longitude")
+
+    def __init__(self, name: str, latitude: float | None = None, longitude: float | None = None) -> None:
         """
-        Generic class for a waypoint on a sectional map.
+        Generic class for a waypoint on a sectional map. Names are interned so that the many legs sharing a
+        waypoint share a single string.
 
         :param name: name of the waypoint
+        :param latitude: latitude in degrees (north positive), if known
+        :param longitude: longitude in degrees (east positive), if known
         """
-        self.name: str = name
+        self.name: str = sys.intern(name)
+        self.latitude: float | None = latitude
+        self.longitude: float | None = longitude
+
+    @property
+    def has_position(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
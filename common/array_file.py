@@ -0,0 +1,55 @@
+import json
+import struct
+import numpy as np
+from common.atomic_write import atomic_write
+
+# the metadata follows the .npy data: <JSON metadata> <uint64 length of the JSON> <FOOTER_MAGIC>
+FOOTER_MAGIC: bytes = b"NPYMETA1"
+FOOTER_SIZE: int = 8 + len(FOOTER_MAGIC)
+
+
+def save_array(path: str, array: np.ndarray, metadata: dict) -> None:
+    """
+    Writes an array as a .npy file with JSON metadata appended after the array data, replacing path atomically, so
+    that readers never pair the array with the metadata of another version of the file. The file is still read by
+    np.load(), which ignores the trailing metadata.
+
+    :param path: path of the file
+    :param array: the array
+    :param metadata: JSON serializable metadata
+    :return: None
+    """
+    encoded = json.dumps(metadata).encode()
+
+    def write(file) -> None:
+        np.save(file, array)
+        file.write(encoded + struct.pack("<Q", len(encoded)) + FOOTER_MAGIC)
+
+    atomic_write(path, write)
+
+
+def load_array(path: str, mmap: bool = True) -> tuple[np.ndarray, dict]:
+    """
+    :param path: path of a file written by save_array()
+    :param mmap: memory-map the array (read-only) instead of reading it, empty arrays are always read
+    :return: the array and its metadata
+    """
+    # the file is opened once, so the metadata and the array come from the same version of the file
+    with open(path, "rb") as file:
+        file.seek(-FOOTER_SIZE, 2)
+        length, = struct.unpack("<Q", file.read(8))
+        assert file.read(len(FOOTER_MAGIC)) == FOOTER_MAGIC, f"{path} has no metadata footer."
+        file.seek(-FOOTER_SIZE - length, 2)
+        metadata = json.loads(file.read(length))
+
+        file.seek(0)
+        version = np.lib.format.read_magic(file)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else \
+            np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(file)
+        order = "F" if fortran_order else "C"
+        if mmap and int(np.prod(shape)):
+            array = np.memmap(file, dtype=dtype, mode="r", offset=file.tell(), shape=shape, order=order)
+        else:
+            array = np.fromfile(file, dtype=dtype, count=int(np.prod(shape))).reshape(shape, order=order)
+    return array, metadata
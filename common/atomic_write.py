@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+
+def atomic_write(path: str, writer, mode: str = "wb") -> None:
+    """
+    Writes a file next to path and renames it over path, so that concurrent readers see either the previous file or
+    the complete new one, never a partial file. The temporary file is removed if writer raises.
+
+    :param path: path of the file
+    :param writer: writer(file), writes the contents to the open temporary file
+    :param mode: mode the temporary file is opened with ("wb" or "w")
+    :return: None
+    """
+    descriptor, temporary_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(descriptor, mode) as file:
+            writer(file)
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.unlink(temporary_path)
+        raise
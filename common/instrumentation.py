@@ -0,0 +1,198 @@
+import functools
+import importlib
+import sys
+import time
+from array import array
+from contextlib import contextmanager
+import numpy as np
+
+# (module, attribute) of the instrumented hot paths; attributes may be "Class.method" or module level functions
+DEFAULT_TARGETS: tuple = (
+    ("classes.flightplan", "FlightPlan.evaluate"),
+    ("classes.legs", "Leg.evaluate"),
+    ("classes.aircraft", "Aircraft.compute_climb"),
+    ("classes.aircraft", "Aircraft.compute_descent"),
+    ("classes.aircraft", "Aircraft.compute_mag_dev"),
+    ("models.atmosphere", "atmospheric_model"),
+)
+DEFAULT_PERCENTILES: tuple = (50, 90, 99)
+
+
+class CallStats:
+    """
+    Call statistics of one instrumented function. Latencies are inclusive of any instrumented callees.
+    """
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self.calls: int = 0
+        self.total_seconds: float = 0.0
+        self.rejections: int = 0
+        self.latencies: array = array("d")
+
+    def record(self, seconds: float) -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        self.latencies.append(seconds)
+
+    def as_dict(self, percentiles: tuple = DEFAULT_PERCENTILES) -> dict:
+        latencies = np.frombuffer(self.latencies, dtype=float) if self.calls else np.zeros(1)
+        return {"calls": self.calls,
+                "total_seconds": self.total_seconds,
+                "rejections": self.rejections,
+                "latency_seconds": {f"p{p:g}": float(value) for p, value in
+                                    zip(percentiles, np.percentile(latencies, percentiles))}}
+
+
+class Profiler:
+    """
+    Opt-in instrumentation of the planning hot paths. While started, every target is replaced by a wrapper that
+    records its call count, latency and the number of calls rejected with an AssertionError (e.g., out of the
+    atmospheric envelope). stop() puts the original functions back, so there is no cost when not profiling.
+
+    Module level functions are also replaced in every loaded module that imported them by name
+    (e.g., classes.aircraft imports atmospheric_model from models.atmosphere).
+    """
+    def __init__(self, targets: tuple = DEFAULT_TARGETS) -> None:
+        """
+        :param targets: (module, attribute) pairs of the functions to instrument.
+        """
+        self.targets: tuple = targets
+        self.stats: dict[str, CallStats] = {attribute: CallStats() for _, attribute in targets}
+        self._patches: list[tuple[object, str, object]] = []
+
+    @property
+    def active(self) -> bool:
+        return bool(self._patches)
+
+    def start(self) -> None:
+        """
+        Installs the wrappers.
+
+        :return: None
+        """
+        assert not self.active, "The profiler is already started."
+
+        for module_name, attribute in self.targets:
+            owner = importlib.import_module(module_name)
+            *path, name = attribute.split(".")
+            for part in path:
+                owner = getattr(owner, part)
+
+            original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+            wrapper = self._wrap(original, self.stats[attribute])
+            self._patch(owner, name, wrapper)
+
+            if not isinstance(owner, type):
+                for module in list(sys.modules.values()):
+                    if module is not None and module is not owner and \
+                            getattr(module, "__dict__", {}).get(name) is original:
+                        self._patch(module, name, wrapper)
+
+    def stop(self) -> None:
+        """
+        Restores the original functions.
+
+        :return: None
+        """
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    def reset(self) -> None:
+        """
+        Clears the recorded statistics.
+
+        :return: None
+        """
+        for stats in self.stats.values():
+            stats.clear()
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _patch(self, owner: object, name: str, wrapper) -> None:
+        original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+        self._patches.append((owner, name, original))
+        setattr(owner, name, wrapper)
+
+    @staticmethod
+    def _wrap(function, stats: CallStats):
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except AssertionError as error:
+                # counted only by the innermost instrumented function, not by every caller it propagates through
+                if not getattr(error, "_profiler_counted", False):
+                    error._profiler_counted = True
+                    stats.rejections += 1
+                raise
+            finally:
+                stats.record(perf_counter() - start)
+
+        return wrapper
+
+    def as_dict(self, percentiles: tuple = DEFAULT_PERCENTILES) -> dict:
+        """
+        :param percentiles: latency percentiles to report.
+        :return: the statistics of every instrumented function.
+        """
+        return {attribute: stats.as_dict(percentiles) for attribute, stats in self.stats.items()}
+
+    def to_prometheus(self, prefix: str = "vfr", percentiles: tuple = DEFAULT_PERCENTILES) -> str:
+        """
+        Exports the statistics in the Prometheus text exposition format.
+
+        :param prefix: metric name prefix.
+        :param percentiles: latency percentiles to report as summary quantiles.
+        :return: the metrics text.
+        """
+        statistics = self.as_dict(percentiles)
+        lines = [f"# HELP {prefix}_calls_total Number of calls of the instrumented function.",
+                 f"# TYPE {prefix}_calls_total counter"]
+        lines += [f'{prefix}_calls_total{{function="{name}"}} {stats["calls"]}' for name, stats in statistics.items()]
+
+        lines += [f"# HELP {prefix}_rejections_total Number of assertions (e.g., out of envelope) raised in the function.",
+                  f"# TYPE {prefix}_rejections_total counter"]
+        lines += [f'{prefix}_rejections_total{{function="{name}"}} {stats["rejections"]}'
+                  for name, stats in statistics.items()]
+
+        lines += [f"# HELP {prefix}_latency_seconds Latency of the instrumented function.",
+                  f"# TYPE {prefix}_latency_seconds summary"]
+        for name, stats in statistics.items():
+            for p in percentiles:
+                lines.append(f'{prefix}_latency_seconds{{function="{name}",quantile="{p / 100:g}"}} '
+                             f'{stats["latency_seconds"][f"p{p:g}"]:.9g}')
+            lines.append(f'{prefix}_latency_seconds_sum{{function="{name}"}} {stats["total_seconds"]:.9g}')
+            lines.append(f'{prefix}_latency_seconds_count{{function="{name}"}} {stats["calls"]}')
+
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profile(targets: tuple = DEFAULT_TARGETS):
+    """
+    Scopes a profiling session to a block, e.g. one nightly batch:
+
+        with profile() as profiler:
+            plan.evaluate()
+        print(profiler.to_prometheus())
+
+    :param targets: (module, attribute) pairs of the functions to instrument.
+    :return: the profiler, its statistics remain available after the block.
+    """
+    profiler = Profiler(targets)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
@@ -0,0 +1,134 @@
+import heapq
+import numpy as np
+
+
+class KDTree:
+    """
+    Static k-d tree over points in D dimensions for k-nearest-neighbour and radius queries with Euclidean
+    distances. Built in O(n log n) by median splits; the leaves hold up to leaf_size points, which are searched
+    with NumPy.
+    """
+    def __init__(self, points: np.ndarray, leaf_size: int = 16) -> None:
+        """
+        :param points: (N, D) points
+        :param leaf_size: maximum number of points of a leaf
+        """
+        self.points: np.ndarray = np.asarray(points, dtype=float)
+        assert self.points.ndim == 2, "points must be an (N, D) array."
+        self.leaf_size: int = max(1, leaf_size)
+        self.indices: np.ndarray = np.arange(len(self.points))
+
+        # node i covers self.indices[starts[i]:stops[i]]; internal nodes split on axes[i] at splits[i]
+        self.starts: list[int] = []
+        self.stops: list[int] = []
+        self.axes: list[int] = []
+        self.splits: list[float] = []
+        self.lefts: list[int] = []
+        self.rights: list[int] = []
+
+        if len(self.points):
+            self._build()
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _add_node(self, start: int, stop: int) -> int:
+        self.starts.append(start)
+        self.stops.append(stop)
+        self.axes.append(-1)
+        self.splits.append(0.0)
+        self.lefts.append(-1)
+        self.rights.append(-1)
+        return len(self.starts) - 1
+
+    def _build(self) -> None:
+        stack = [self._add_node(0, len(self.points))]
+        while stack:
+            node = stack.pop()
+            start, stop = self.starts[node], self.stops[node]
+            if stop - start <= self.leaf_size:
+                continue
+
+            indices = self.indices[start:stop]
+            coordinates = self.points[indices]
+            axis = int(np.argmax(np.ptp(coordinates, axis=0)))
+            middle = (stop - start) // 2
+            order = np.argpartition(coordinates[:, axis], middle)
+            self.indices[start:stop] = indices[order]
+
+            self.axes[node] = axis
+            self.splits[node] = float(coordinates[order[middle], axis])
+            self.lefts[node] = self._add_node(start, start + middle)
+            self.rights[node] = self._add_node(start + middle, stop)
+            stack += [self.lefts[node], self.rights[node]]
+
+    def query(self, point: np.ndarray, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :param point: (D,) query point
+        :param k: number of neighbours
+        :return: distances: (min(k, N),) distances to the nearest points, in increasing order
+        :return: indices: (min(k, N),) indices of the nearest points
+        """
+        point = np.asarray(point, dtype=float)
+        best: list[tuple[float, int]] = []   # max-heap of (-squared distance, index)
+        stack = [(0.0, 0)] if len(self.points) else []
+
+        while stack:
+            bound, node = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+
+            if self.axes[node] < 0:
+                indices = self.indices[self.starts[node]:self.stops[node]]
+                squared = np.sum((self.points[indices] - point) ** 2, axis=1)
+                for distance, index in zip(squared.tolist(), indices.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, index))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, index))
+                continue
+
+            difference = point[self.axes[node]] - self.splits[node]
+            near, far = (self.lefts[node], self.rights[node]) if difference < 0 else \
+                (self.rights[node], self.lefts[node])
+            stack.append((max(bound, difference ** 2), far))
+            stack.append((bound, near))
+
+        best.sort(reverse=True)
+        return np.sqrt([-distance for distance, _ in best]), np.array([index for _, index in best], dtype=int)
+
+    def query_radius(self, point: np.ndarray, radius: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :param point: (D,) query point
+        :param radius: search radius
+        :return: distances: distances to every point within the radius, in increasing order
+        :return: indices: indices of those points
+        """
+        point = np.asarray(point, dtype=float)
+        squared_radius = radius ** 2
+        found_distances, found_indices = [], []
+        stack = [(0.0, 0)] if len(self.points) else []
+
+        while stack:
+            bound, node = stack.pop()
+            if bound > squared_radius:
+                continue
+
+            if self.axes[node] < 0:
+                indices = self.indices[self.starts[node]:self.stops[node]]
+                squared = np.sum((self.points[indices] - point) ** 2, axis=1)
+                inside = squared <= squared_radius
+                found_distances.append(squared[inside])
+                found_indices.append(indices[inside])
+                continue
+
+            difference = point[self.axes[node]] - self.splits[node]
+            near, far = (self.lefts[node], self.rights[node]) if difference < 0 else \
+                (self.rights[node], self.lefts[node])
+            stack.append((max(bound, difference ** 2), far))
+            stack.append((bound, near))
+
+        distances = np.concatenate(found_distances) if found_distances else np.zeros(0)
+        indices = np.concatenate(found_indices) if found_indices else np.zeros(0, dtype=int)
+        order = np.argsort(distances, kind="stable")
+        return np.sqrt(distances[order]), indices[order]
@@ -0,0 +1,73 @@
+class SumSegmentTree:
+    """
+    Segment tree over a list of floats supporting point assignment and suffix sums in O(log n).
+    Every internal node is recomputed from its children rather than adjusted by deltas, so the sums only depend
+    on the current values (no rounding drift accumulates across updates).
+    """
+    def __init__(self, values: list[float]) -> None:
+        """
+        Builds the tree in O(n).
+
+        :param values: the initial values.
+        """
+        self.size: int = len(values)
+        self.capacity: int = 1
+        while self.capacity < max(self.size, 1):
+            self.capacity *= 2
+
+        self.nodes: list[float] = [0.0] * (2 * self.capacity)
+        self.nodes[self.capacity:self.capacity + self.size] = [float(value) for value in values]
+        for node in reversed(range(1, self.capacity)):
+            self.nodes[node] = self.nodes[2 * node] + self.nodes[2 * node + 1]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> float:
+        return self.nodes[self.capacity + index]
+
+    def __setitem__(self, index: int, value: float) -> None:
+        assert 0 <= index < self.size, "index out of range"
+        node = self.capacity + index
+        self.nodes[node] = float(value)
+        node //= 2
+        while node:
+            self.nodes[node] = self.nodes[2 * node] + self.nodes[2 * node + 1]
+            node //= 2
+
+    @property
+    def total(self) -> float:
+        """
+        :return: the sum of every value, in O(1).
+        """
+        return self.nodes[1]
+
+    def range_sum(self, start: int, stop: int) -> float:
+        """
+        :param start: first index (inclusive).
+        :param stop: last index (exclusive).
+        :return: the sum of the values in [start, stop).
+        """
+        left_sum = 0.0
+        right_sum = 0.0
+        left = self.capacity + max(start, 0)
+        right = self.capacity + min(stop, self.size)
+
+        while left < right:
+            if left & 1:
+                left_sum += self.nodes[left]
+                left += 1
+            if right & 1:
+                right -= 1
+                right_sum = self.nodes[right] + right_sum
+            left //= 2
+            right //= 2
+
+        return left_sum + right_sum
+
+    def suffix_sum(self, start: int) -> float:
+        """
+        :param start: first index (inclusive).
+        :return: the sum of the values from start to the end.
+        """
+        return self.range_sum(start, self.size)
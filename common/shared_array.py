@@ -0,0 +1,96 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedArray:
+    """
+    NumPy array backed by a named shared memory block, so that worker processes can map it instead of receiving
+    a pickled copy. spec is a small picklable description of the block, passed to attach() in the workers.
+
+    The process that created the block must unlink() it once every process is done with it; every process must
+    close() it (or drop its SharedArray) before exiting.
+    """
+    def __init__(self, block: shared_memory.SharedMemory, shape: tuple, dtype: np.dtype, owner: bool) -> None:
+        """
+        :param block: the shared memory block
+        :param shape: shape of the array
+        :param dtype: data type of the array
+        :param owner: True in the process that created the block
+        """
+        self.block: shared_memory.SharedMemory | None = block
+        self.owner: bool = owner
+        self.array: np.ndarray = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    @property
+    def spec(self) -> tuple[str, tuple, str]:
+        """
+        :return: the name, shape and data type of the block
+        """
+        return self.block.name, self.array.shape, self.array.dtype.str
+
+    @classmethod
+    def create(cls, shape: tuple, dtype: np.dtype = np.float64, fill_value=None) -> "SharedArray":
+        """
+        :param shape: shape of the array
+        :param dtype: data type of the array
+        :param fill_value: initial value of every element, left uninitialized if None
+        :return: a new shared array
+        """
+        dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        shared = cls(shared_memory.SharedMemory(create=True, size=size), tuple(shape), dtype, owner=True)
+        if fill_value is not None:
+            shared.array.fill(fill_value)
+        return shared
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "SharedArray":
+        """
+        :param array: the array to copy
+        :return: a new shared array holding a copy of array
+        """
+        array = np.asarray(array)
+        shared = cls.create(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec: tuple[str, tuple, str]) -> "SharedArray":
+        """
+        :param spec: the spec of a shared array created by another process
+        :return: the shared array, mapping the same block
+        """
+        name, shape, dtype = spec
+        return cls(shared_memory.SharedMemory(name=name), tuple(shape), np.dtype(dtype), owner=False)
+
+    def close(self) -> None:
+        """
+        Unmaps the block in this process. The array must not be used afterwards.
+
+        :return: None
+        """
+        if self.block is not None:
+            del self.array
+            self.block.close()
+            self.block = None
+
+    def unlink(self) -> None:
+        """
+        Closes and frees the block, in the process that created it.
+
+        :return: None
+        """
+        assert self.owner, "Only the process that created the shared array may unlink it."
+        block = self.block
+        self.close()
+        if block is not None:
+            block.unlink()
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from common.array_file import save_array, load_array
+
+
+class TestArrayFile(unittest.TestCase):
+    """
+    Tests to ensure that an array and its metadata are read back together from a single file.
+    """
+    def test_round_trip(self):
+        array = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "array.npy")
+            save_array(path, array, {"axes": [[0, 1], [2.5]]})
+
+            mapped, metadata = load_array(path)
+            self.assertIsInstance(mapped, np.memmap)
+            np.testing.assert_array_equal(mapped, array)
+            self.assertEqual(metadata, {"axes": [[0, 1], [2.5]]})
+
+            read, _ = load_array(path, mmap=False)
+            np.testing.assert_array_equal(read, array)
+            np.testing.assert_array_equal(np.load(path), array)
+
+            # a new version replaces the array and the metadata at once
+            save_array(path, np.zeros((0, 6)), {"axes": []})
+            empty, metadata = load_array(path)
+            self.assertEqual(empty.shape, (0, 6))
+            self.assertEqual(metadata, {"axes": []})
+            del mapped
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+from common.atomic_write import atomic_write
+
+
+class TestAtomicWrite(unittest.TestCase):
+    """
+    Tests to ensure that a failed write leaves the previous file and no temporary file behind.
+    """
+    def test_replace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.txt")
+            atomic_write(path, lambda file: file.write("first"), mode="w")
+            atomic_write(path, lambda file: file.write(b"second"))
+            with open(path) as file:
+                self.assertEqual(file.read(), "second")
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+
+    def test_failed_write(self):
+        def fail(file):
+            file.write(b"partial")
+            raise ValueError("write failed")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.txt")
+            atomic_write(path, lambda file: file.write(b"previous"))
+            with self.assertRaises(ValueError):
+                atomic_write(path, fail)
+            self.assertEqual(os.listdir(directory), ["data.txt"])
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), b"previous")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import classes.aircraft
+import models.atmosphere
+from aircraft.N8273V import N8273V
+from classes.aircraft import Aircraft
+from classes.flightplan import FlightPlan
+from classes.tests.altitude_optimizer_tests import build_route
+from common.instrumentation import Profiler, profile
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Tests to ensure that the profiler records the hot paths and leaves no wrappers behind.
+    """
+    def test_counts_and_restore(self):
+        originals = (FlightPlan.evaluate, Aircraft.compute_climb, models.atmosphere.atmospheric_model,
+                     classes.aircraft.atmospheric_model)
+        route = build_route()
+
+        with profile() as profiler:
+            route.evaluate()
+            statistics = profiler.as_dict()
+
+        self.assertEqual(statistics["FlightPlan.evaluate"]["calls"], 1)
+        self.assertEqual(statistics["Leg.evaluate"]["calls"], len(route.plan))
+        self.assertEqual(statistics["Aircraft.compute_mag_dev"]["calls"], len(route.plan))
+        self.assertEqual(statistics["Aircraft.compute_climb"]["calls"], 1)
+        self.assertEqual(statistics["Aircraft.compute_descent"]["calls"], 1)
+        self.assertEqual(statistics["atmospheric_model"]["calls"], 4)
+        self.assertGreater(statistics["FlightPlan.evaluate"]["total_seconds"],
+                           statistics["Aircraft.compute_climb"]["total_seconds"])
+
+        self.assertEqual((FlightPlan.evaluate, Aircraft.compute_climb, models.atmosphere.atmospheric_model,
+                          classes.aircraft.atmospheric_model), originals)
+        self.assertFalse(profiler.active)
+
+    def test_rejections_and_prometheus(self):
+        aircraft = N8273V()
+        profiler = Profiler()
+
+        with profiler:
+            with self.assertRaises(AssertionError):
+                aircraft.compute_climb(1000, 5500, 150)
+
+        self.assertEqual(profiler.stats["atmospheric_model"].rejections, 1)
+        # the rejection propagates through compute_climb but is counted once
+        self.assertEqual(profiler.stats["Aircraft.compute_climb"].rejections, 0)
+        self.assertEqual(profiler.stats["Aircraft.compute_climb"].calls, 1)
+
+        text = profiler.to_prometheus()
+        self.assertIn('vfr_rejections_total{function="atmospheric_model"} 1', text)
+        self.assertIn('vfr_calls_total{function="Aircraft.compute_climb"} 1', text)
+        self.assertIn('vfr_latency_seconds{function="Leg.evaluate",quantile="0.99"} 0', text)
+
+        profiler.reset()
+        self.assertEqual(profiler.stats["atmospheric_model"].calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
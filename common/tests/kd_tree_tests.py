@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+from common.kd_tree import KDTree
+
+
+class TestKDTree(unittest.TestCase):
+    """
+    Tests to ensure that the k-d tree searches match brute force searches.
+    """
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        for size in (1, 5, 16, 17, 500):
+            points = rng.uniform(-1, 1, (size, 3))
+            tree = KDTree(points, leaf_size=4)
+
+            for _ in range(20):
+                point = rng.uniform(-1, 1, 3)
+                distances = np.linalg.norm(points - point, axis=1)
+                order = np.argsort(distances)
+
+                with self.subTest(size=size):
+                    nearest_distances, nearest_indices = tree.query(point, k=3)
+                    np.testing.assert_allclose(nearest_distances, distances[order[:3]])
+                    np.testing.assert_array_equal(nearest_indices, order[:3])
+
+                    radius_distances, radius_indices = tree.query_radius(point, 0.5)
+                    np.testing.assert_array_equal(np.sort(radius_indices), np.flatnonzero(distances <= 0.5))
+                    self.assertTrue(np.all(np.diff(radius_distances) >= 0))
+
+    def test_empty(self):
+        tree = KDTree(np.zeros((0, 3)))
+        self.assertEqual(len(tree.query(np.zeros(3))[1]), 0)
+        self.assertEqual(len(tree.query_radius(np.zeros(3), 1.0)[1]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+import numpy as np
+from common.segment_tree import SumSegmentTree
+
+
+class TestSumSegmentTree(unittest.TestCase):
+    """
+    Tests to ensure that the segment tree sums match direct sums after updates.
+    """
+    def test_suffix_sums(self):
+        rng = np.random.default_rng(0)
+        for size in (1, 2, 7, 16, 33):
+            values = rng.uniform(0, 10, size)
+            tree = SumSegmentTree(list(values))
+
+            for _ in range(20):
+                index = int(rng.integers(size))
+                values[index] = rng.uniform(0, 10)
+                tree[index] = values[index]
+
+            for start in range(size + 1):
+                with self.subTest(size=size, start=start):
+                    self.assertAlmostEqual(tree.suffix_sum(start), values[start:].sum())
+            self.assertAlmostEqual(tree.total, values.sum())
+            self.assertEqual(tree.total, SumSegmentTree(list(values)).total)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
+import math
 import numpy as np
+from models.polynomial import is_scalar
 
 MIN_TEMPERATURE: int = -20
 MAX_TEMPERATURE: int = 100
@@ -23,8 +25,13 @@ ATMOSPHERE = {
     14000: [-0.000177501407124483, 0.139735658894387, 26.9913719349442],
 }
 
+# ATMOSPHERE compiled once into a (15,) altitude grid and a (15, 3) coefficient matrix for the batched model
+ATMOSPHERE_ALTITUDES: np.ndarray = np.array(sorted(ATMOSPHERE.keys()), dtype=float)
+ATMOSPHERE_COEFFICIENTS: np.ndarray = np.array([ATMOSPHERE[altitude] for altitude in sorted(ATMOSPHERE.keys())],
+                                               dtype=float)
 
-def evaluate_atmospheric_model(temperature: float, pressure_alt: float) -> float:
+
+def evaluate_atmospheric_model(temperature: float, pressure_alt: float, validate: bool = True) -> float:
     """
     Computes the y-axis performance value based on a temperature and pressure altitude. The pressure
     altitude MUST be in the ATMOSPHERE model. For interplation, use the atmospheric_model() function.
@@ -32,50 +39,124 @@ def evaluate_atmospheric_model(temperature: float, pressure_alt: float) -> float
 
     :param temperature: float = outside air temperature (F)
     :param pressure_alt: float = pressure altitude (ft)
+    :param validate: bool = if False, the inputs are not checked (e.g., already checked by
+        classes.plan_validation.validate_plan_table())
 
     :return: performance: float = computed aircraft performance value. see POH for details
     """
-    assert (pressure_alt >= MIN_PRESSURE_ALT) and (pressure_alt <= MAX_PRESSURE_ALT), \
-        f"Pressure altitude must be between {MIN_PRESSURE_ALT} and {MAX_PRESSURE_ALT} ft."
+    if validate:
+        assert (pressure_alt >= MIN_PRESSURE_ALT) and (pressure_alt <= MAX_PRESSURE_ALT), \
+            f"Pressure altitude must be between {MIN_PRESSURE_ALT} and {MAX_PRESSURE_ALT} ft."
 
-    assert pressure_alt in ATMOSPHERE, \
-        "Pressure altitude is not in the ATMOSPHERE model. Use the atmospheric_model() for interpolation."
+        assert pressure_alt in ATMOSPHERE, \
+            "Pressure altitude is not in the ATMOSPHERE model. Use the atmospheric_model() for interpolation."
 
     model: list = ATMOSPHERE[pressure_alt]
-    performance: float = np.polyval(model, temperature)
+    if not is_scalar(temperature):
+        return np.polyval(model, temperature)
+
+    # Horner's rule on plain floats, in the order of operations of np.polyval()
+    temperature = float(temperature)
+    performance: float = (model[0] * temperature + model[1]) * temperature + model[2]
     return performance
 
 
-def atmospheric_model(temperature: float, pressure_alt: float) -> float:
+def atmospheric_model(temperature: float, pressure_alt: float, validate: bool = True) -> float:
     """
     Computes the y-axis performance value based on a temperature and pressure altitude.
-    Model fit using cubic polynomial approximation.
+    Model fit using cubic polynomial approximation. Scalar inputs are evaluated on plain floats; array inputs
+    are passed to atmospheric_model_batch().
     See Piper Cherokee Archer II POH, Figure 5-11
 
     :param temperature: float = outside air temperature (F)
     :param pressure_alt: float = pressure altitude (ft)
+    :param validate: bool = if False, the inputs are not checked (e.g., already checked by
+        classes.plan_validation.validate_plan_table())
 
     :return: performance: float = computed aircraft performance value. see POH for details
     """
+    if not is_scalar(temperature, pressure_alt):
+        assert not validate or np.all(atmospheric_envelope_mask(temperature, pressure_alt)), \
+            "Temperature and pressure altitudes must be inside the atmospheric envelope."
+        return atmospheric_model_batch(temperature, pressure_alt)
 
-    assert (temperature >= MIN_TEMPERATURE) and (temperature <= MAX_TEMPERATURE), \
-        f"Temperature must be between {MIN_TEMPERATURE} and {MAX_TEMPERATURE} degrees F."
+    temperature, pressure_alt = float(temperature), float(pressure_alt)
+    if validate:
+        assert (temperature >= MIN_TEMPERATURE) and (temperature <= MAX_TEMPERATURE), \
+            f"Temperature must be between {MIN_TEMPERATURE} and {MAX_TEMPERATURE} degrees F."
 
-    assert (pressure_alt >= MIN_PRESSURE_ALT) and (pressure_alt <= MAX_PRESSURE_ALT), \
-        f"Pressure altitude must be between {MIN_PRESSURE_ALT} and {MAX_PRESSURE_ALT} ft."
+        assert (pressure_alt >= MIN_PRESSURE_ALT) and (pressure_alt <= MAX_PRESSURE_ALT), \
+            f"Pressure altitude must be between {MIN_PRESSURE_ALT} and {MAX_PRESSURE_ALT} ft."
 
     if pressure_alt % 1000 == 0:
-        return evaluate_atmospheric_model(temperature, pressure_alt)
+        return evaluate_atmospheric_model(temperature, pressure_alt, validate=False)
 
     # linear interpolation step
-    lower_pressure_alt: int = np.floor(pressure_alt / 1000) * 1000
-    upper_pressure_alt: int = np.ceil(pressure_alt / 1000) * 1000
-    lower_performance = evaluate_atmospheric_model(temperature, lower_pressure_alt)
-    upper_performance = evaluate_atmospheric_model(temperature, upper_pressure_alt)
-    xp = np.array([lower_pressure_alt, upper_pressure_alt])
-    fp = np.array([lower_performance, upper_performance])
-    performance: float = np.interp(pressure_alt, xp, fp)
+    lower_pressure_alt: int = math.floor(pressure_alt / 1000) * 1000
+    upper_pressure_alt: int = math.ceil(pressure_alt / 1000) * 1000
+    lower_performance = evaluate_atmospheric_model(temperature, lower_pressure_alt, validate=False)
+    upper_performance = evaluate_atmospheric_model(temperature, upper_pressure_alt, validate=False)
+    slope = (upper_performance - lower_performance) / (upper_pressure_alt - lower_pressure_alt)
+    performance: float = slope * (pressure_alt - lower_pressure_alt) + lower_performance
+
+    return performance
+
+
+def atmospheric_envelope_mask(temperature: np.ndarray, pressure_alt: np.ndarray) -> np.ndarray:
+    """
+    Flags which temperature/pressure altitude pairs are inside the envelope of the ATMOSPHERE model.
+    NaN inputs are reported as out of the envelope.
+
+    :param temperature: np.ndarray = outside air temperature (F)
+    :param pressure_alt: np.ndarray = pressure altitude (ft)
 
+    :return: in_envelope: np.ndarray = boolean mask, True where the inputs are inside the envelope
+    """
+    temperature = np.asarray(temperature, dtype=float)
+    pressure_alt = np.asarray(pressure_alt, dtype=float)
+
+    return ((temperature >= MIN_TEMPERATURE) & (temperature <= MAX_TEMPERATURE) &
+            (pressure_alt >= MIN_PRESSURE_ALT) & (pressure_alt <= MAX_PRESSURE_ALT))
+
+
+def atmospheric_model_batch(temperature: np.ndarray, pressure_alt: np.ndarray, return_mask: bool = False):
+    """
+    Vectorized version of atmospheric_model(). Evaluates every temperature/pressure altitude pair in a single pass
+    over the precomputed ATMOSPHERE_COEFFICIENTS matrix. The inputs may be scalars or arrays of any broadcastable
+    shape. Pairs outside of the envelope are returned as NaN instead of raising.
+
+    :param temperature: np.ndarray = outside air temperature (F)
+    :param pressure_alt: np.ndarray = pressure altitude (ft)
+    :param return_mask: bool = if True, the envelope mask is returned alongside the performance values
+
+    :return: performance: np.ndarray = computed aircraft performance values, NaN where out of the envelope
+    :return: in_envelope: np.ndarray = boolean mask, True where the inputs are inside the envelope [return_mask only]
+    """
+    temperature, pressure_alt = np.broadcast_arrays(np.asarray(temperature, dtype=float),
+                                                    np.asarray(pressure_alt, dtype=float))
+    in_envelope = atmospheric_envelope_mask(temperature, pressure_alt)
+
+    # out of envelope values are evaluated at a safe point and masked afterwards
+    temperature = np.where(in_envelope, temperature, MIN_TEMPERATURE)
+    pressure_alt = np.where(in_envelope, pressure_alt, MIN_PRESSURE_ALT)
+
+    # linear interpolation step between the two bracketing altitudes of the model
+    lower_index = np.searchsorted(ATMOSPHERE_ALTITUDES, pressure_alt, side="right") - 1
+    lower_index = np.clip(lower_index, 0, len(ATMOSPHERE_ALTITUDES) - 2)
+    lower_pressure_alt = ATMOSPHERE_ALTITUDES[lower_index]
+    upper_pressure_alt = ATMOSPHERE_ALTITUDES[lower_index + 1]
+    weight = (pressure_alt - lower_pressure_alt) / (upper_pressure_alt - lower_pressure_alt)
+
+    lower_model = ATMOSPHERE_COEFFICIENTS[lower_index]
+    upper_model = ATMOSPHERE_COEFFICIENTS[lower_index + 1]
+    lower_performance = (lower_model[..., 0] * temperature + lower_model[..., 1]) * temperature + lower_model[..., 2]
+    upper_performance = (upper_model[..., 0] * temperature + upper_model[..., 1]) * temperature + upper_model[..., 2]
+
+    performance = lower_performance + weight * (upper_performance - lower_performance)
+    performance = np.where(in_envelope, performance, np.nan)
+
+    if return_mask:
+        return performance, in_envelope
     return performance
 
 
@@ -0,0 +1,157 @@
+import numpy as np
+
+EARTH_RADIUS_NM: float = 3440.065   # mean Earth radius
+METHODS: tuple = ("great_circle", "rhumb_line")
+
+
+def great_circle(from_latitude: np.ndarray, from_longitude: np.ndarray, to_latitude: np.ndarray,
+                 to_longitude: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the initial true course and the distance of the great circle between two points on a spherical Earth.
+    The inputs may be scalars or arrays of any broadcastable shape.
+
+    :param from_latitude: latitude of the starting points in degrees (north positive)
+    :param from_longitude: longitude of the starting points in degrees (east positive)
+    :param to_latitude: latitude of the ending points in degrees
+    :param to_longitude: longitude of the ending points in degrees
+    :return: true_course: initial true course in degrees, in [0, 360)
+    :return: distance: distance in nautical miles
+    """
+    phi_1 = np.deg2rad(from_latitude)
+    phi_2 = np.deg2rad(to_latitude)
+    delta_lambda = np.deg2rad(np.subtract(to_longitude, from_longitude))
+
+    cos_phi_1 = np.cos(phi_1)
+    cos_phi_2 = np.cos(phi_2)
+    sin_phi_1 = np.sin(phi_1)
+    sin_phi_2 = np.sin(phi_2)
+    cos_delta_lambda = np.cos(delta_lambda)
+
+    # haversine formula, accurate for short legs
+    a = np.sin((phi_2 - phi_1) / 2) ** 2 + cos_phi_1 * cos_phi_2 * np.sin(delta_lambda / 2) ** 2
+    distance = 2 * EARTH_RADIUS_NM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+    true_course = np.arctan2(np.sin(delta_lambda) * cos_phi_2,
+                             cos_phi_1 * sin_phi_2 - sin_phi_1 * cos_phi_2 * cos_delta_lambda)
+
+    return np.rad2deg(true_course) % 360, distance
+
+
+def rhumb_line(from_latitude: np.ndarray, from_longitude: np.ndarray, to_latitude: np.ndarray,
+               to_longitude: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the constant true course and the distance of the rhumb line (loxodrome) between two points on a
+    spherical Earth, the shorter way around in longitude. The inputs may be scalars or arrays of any broadcastable
+    shape.
+
+    :param from_latitude: latitude of the starting points in degrees (north positive)
+    :param from_longitude: longitude of the starting points in degrees (east positive)
+    :param to_latitude: latitude of the ending points in degrees
+    :param to_longitude: longitude of the ending points in degrees
+    :return: true_course: true course in degrees, in [0, 360)
+    :return: distance: distance in nautical miles
+    """
+    phi_1 = np.deg2rad(from_latitude)
+    phi_2 = np.deg2rad(to_latitude)
+    delta_phi = phi_2 - phi_1
+    delta_lambda = np.deg2rad((np.subtract(to_longitude, from_longitude) + 180) % 360 - 180)
+
+    # stretched latitude difference on a Mercator projection
+    delta_psi = np.log(np.tan(np.pi / 4 + phi_2 / 2) / np.tan(np.pi / 4 + phi_1 / 2))
+
+    # on (nearly) east-west lines the ratio delta_phi / delta_psi tends to cos(latitude)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.where(np.abs(delta_psi) > 1e-12, delta_phi / delta_psi, np.cos(phi_1))
+
+    distance = EARTH_RADIUS_NM * np.hypot(delta_phi, q * delta_lambda)
+    true_course = np.arctan2(delta_lambda, delta_psi)
+
+    return np.rad2deg(true_course) % 360, distance
+
+
+def intermediate_point(from_latitude: np.ndarray, from_longitude: np.ndarray, to_latitude: np.ndarray,
+                       to_longitude: np.ndarray, fraction: np.ndarray = 0.5) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the point at a fraction of the great circle between two points (e.g., 0.5 for the midpoint of a leg).
+    The inputs may be scalars or arrays of any broadcastable shape.
+
+    :param from_latitude: latitude of the starting points in degrees
+    :param from_longitude: longitude of the starting points in degrees
+    :param to_latitude: latitude of the ending points in degrees
+    :param to_longitude: longitude of the ending points in degrees
+    :param fraction: fraction of the distance from the starting points, in [0, 1]
+    :return: latitude: latitude in degrees
+    :return: longitude: longitude in degrees, in [-180, 180)
+    """
+    start = to_unit_vectors(from_latitude, from_longitude)
+    end = to_unit_vectors(to_latitude, to_longitude)
+
+    angle = np.arccos(np.clip(np.sum(start * end, axis=-1), -1, 1))[..., np.newaxis]
+    fraction = np.asarray(fraction, dtype=float)[..., np.newaxis]
+
+    # spherical linear interpolation, linear interpolation of the vectors for coincident points
+    sin_angle = np.sin(angle)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = np.where(sin_angle > 1e-12, np.sin((1 - fraction) * angle) / sin_angle, 1 - fraction)
+        b = np.where(sin_angle > 1e-12, np.sin(fraction * angle) / sin_angle, fraction)
+
+    return from_unit_vectors(a * start + b * end)
+
+
+def route_geometry(latitudes: np.ndarray, longitudes: np.ndarray,
+                   method: str = "great_circle") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the true course and distance of every leg of one or many routes at once.
+
+    :param latitudes: (..., W) latitudes of the waypoints of each route in degrees
+    :param longitudes: (..., W) longitudes of the waypoints of each route in degrees
+    :param method: "great_circle" (initial course of each leg) or "rhumb_line" (constant course of each leg)
+    :return: true_course: (..., W - 1) true course of each leg in degrees
+    :return: distance: (..., W - 1) distance of each leg in nautical miles
+    """
+    assert method in METHODS, f"method must be one of {METHODS}."
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+
+    kernel = great_circle if method == "great_circle" else rhumb_line
+    return kernel(latitudes[..., :-1], longitudes[..., :-1], latitudes[..., 1:], longitudes[..., 1:])
+
+
+def to_unit_vectors(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """
+    :param latitude: latitudes in degrees, any shape
+    :param longitude: longitudes in degrees, any shape
+    :return: (..., 3) Earth-centered unit vectors
+    """
+    phi = np.deg2rad(latitude)
+    lam = np.deg2rad(longitude)
+    cos_phi = np.cos(phi)
+    return np.stack(np.broadcast_arrays(cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)), axis=-1)
+
+
+def from_unit_vectors(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :param vectors: (..., 3) Earth-centered vectors (not necessarily of unit length)
+    :return: latitude: latitudes in degrees
+    :return: longitude: longitudes in degrees, in [-180, 180)
+    """
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+    latitude = np.rad2deg(np.arctan2(z, np.hypot(x, y)))
+    longitude = (np.rad2deg(np.arctan2(y, x)) + 180) % 360 - 180
+    return latitude, longitude
+
+
+def chord_to_distance(chord: np.ndarray) -> np.ndarray:
+    """
+    :param chord: straight-line distances between unit vectors
+    :return: the corresponding great circle distances in nautical miles
+    """
+    return 2 * EARTH_RADIUS_NM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+def distance_to_chord(distance: np.ndarray) -> np.ndarray:
+    """
+    :param distance: great circle distances in nautical miles
+    :return: the corresponding straight-line distances between unit vectors
+    """
+    return 2 * np.sin(np.minimum(np.asarray(distance) / (2 * EARTH_RADIUS_NM), np.pi / 2))
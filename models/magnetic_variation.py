@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class MagneticVariationGrid:
+    """
+    Magnetic variation tabulated on a regular latitude/longitude grid (e.g., exported from a World Magnetic Model
+    calculator for the area flown), interpolated bilinearly. Variations use the sign convention of the legs,
+    MH = TH + mag_var, i.e., west variation is positive.
+
+    Variations are interpolated as unit vectors, so that grids spanning the agonic line or large variations near
+    the poles interpolate correctly.
+    """
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, variation: np.ndarray) -> None:
+        """
+        :param latitudes: (A,) increasing grid latitudes in degrees
+        :param longitudes: (B,) increasing grid longitudes in degrees
+        :param variation: (A, B) magnetic variation at the grid points in degrees (west positive)
+        """
+        self.latitudes: np.ndarray = np.asarray(latitudes, dtype=float)
+        self.longitudes: np.ndarray = np.asarray(longitudes, dtype=float)
+        self.variation: np.ndarray = np.asarray(variation, dtype=float)
+
+        assert self.latitudes.ndim == 1 and len(self.latitudes) > 1, "Must have at least two grid latitudes."
+        assert self.longitudes.ndim == 1 and len(self.longitudes) > 1, "Must have at least two grid longitudes."
+        assert np.all(np.diff(self.latitudes) > 0), "Grid latitudes must be increasing."
+        assert np.all(np.diff(self.longitudes) > 0), "Grid longitudes must be increasing."
+        assert self.variation.shape == (len(self.latitudes), len(self.longitudes)), \
+            "The variation table must have one row per latitude and one column per longitude."
+
+        radians = np.deg2rad(self.variation)
+        self._cos: np.ndarray = np.cos(radians)
+        self._sin: np.ndarray = np.sin(radians)
+
+    def sample(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        """
+        Interpolates the magnetic variation. Points outside of the grid are NaN.
+
+        :param latitude: latitudes in degrees, any shape
+        :param longitude: longitudes in degrees, any shape (broadcast with latitude)
+        :return: magnetic variation in degrees (west positive)
+        """
+        latitude, longitude = np.broadcast_arrays(np.asarray(latitude, dtype=float),
+                                                  np.asarray(longitude, dtype=float))
+
+        i = np.clip(np.searchsorted(self.latitudes, latitude, side="right") - 1, 0, len(self.latitudes) - 2)
+        j = np.clip(np.searchsorted(self.longitudes, longitude, side="right") - 1, 0, len(self.longitudes) - 2)
+        u = (latitude - self.latitudes[i]) / (self.latitudes[i + 1] - self.latitudes[i])
+        v = (longitude - self.longitudes[j]) / (self.longitudes[j + 1] - self.longitudes[j])
+
+        def bilinear(table: np.ndarray) -> np.ndarray:
+            return (table[i, j] * (1 - u) * (1 - v) + table[i + 1, j] * u * (1 - v) +
+                    table[i, j + 1] * (1 - u) * v + table[i + 1, j + 1] * u * v)
+
+        variation = np.rad2deg(np.arctan2(bilinear(self._sin), bilinear(self._cos)))
+
+        outside = (u < 0) | (u > 1) | (v < 0) | (v > 1)
+        return np.where(outside, np.nan, variation)
+
+    def save(self, path: str) -> None:
+        """
+        :param path: .npz file
+        :return: None
+        """
+        np.savez(path, latitudes=self.latitudes, longitudes=self.longitudes, variation=self.variation)
+
+    @classmethod
+    def load(cls, path: str) -> "MagneticVariationGrid":
+        """
+        Loads a grid from an .npz file written by save(), or from a CSV file with a "latitude, longitude, variation"
+        header and one row per grid point.
+
+        :param path: .npz or .csv file
+        :return: the grid
+        """
+        if path.endswith(".npz"):
+            with np.load(path) as data:
+                return cls(data["latitudes"], data["longitudes"], data["variation"])
+
+        data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+        latitudes, row = np.unique(data[:, 0], return_inverse=True)
+        longitudes, column = np.unique(data[:, 1], return_inverse=True)
+        assert len(data) == len(latitudes) * len(longitudes), f"{path} is not a complete latitude/longitude grid."
+
+        variation = np.full((len(latitudes), len(longitudes)), np.nan)
+        variation[row, column] = data[:, 2]
+        assert not np.isnan(variation).any(), f"{path} is not a complete latitude/longitude grid."
+        return cls(latitudes, longitudes, variation)
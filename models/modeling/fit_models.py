@@ -0,0 +1,116 @@
+import argparse
+import os
+import numpy as np
+from common.atomic_write import atomic_write
+from models.modeling.model_artifact import ARTIFACT_DIR, ARTIFACT_VERSION, DATA_DIR, DEFAULT_ATMOSPHERE_ORDER, \
+    DEFAULT_MODEL_ORDER, MODEL_FILES, artifact_path, atmosphere_files, clear_cache, data_hash, load_models, read_chart
+from models.performance_grid import MODEL_NAMES
+
+
+def fit_polynomial(x: np.ndarray, y: np.ndarray, order: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Least squares polynomial fit, equivalent to MATLAB's polyfit().
+
+    :param x: independent variable
+    :param y: dependent variable
+    :param order: polynomial order
+    :return: coefficients: (order + 1,) highest power first (as np.polyval), residuals: y - fit(x)
+    """
+    assert len(x) > order, f"Must have more than {order} points to fit a polynomial of order {order}."
+    coefficients = np.polyfit(x, y, order)
+    return coefficients, y - np.polyval(coefficients, x)
+
+
+def fit_models(data_dir: str = DATA_DIR, model_order: int = DEFAULT_MODEL_ORDER,
+               atmosphere_order: int = DEFAULT_ATMOSPHERE_ORDER) -> dict[str, np.ndarray]:
+    """
+    Fits every model from the charts, as the MATLAB scripts do. The climb/descent charts are fitted as
+    value(performance) (i.e., polyfit(y, x)) and the atmospheric charts as performance(temperature) at each
+    pressure altitude (i.e., polyfit(x, y)).
+
+    :param data_dir: the chart directory
+    :param model_order: order of the climb/descent polynomials
+    :param atmosphere_order: order of the atmospheric polynomials
+    :return: the contents of the artifact: "<model>" coefficients, "<model>_rms" and "<model>_max_error"
+             residuals for each of MODEL_NAMES, "atmosphere_altitudes", "atmosphere_coefficients",
+             "atmosphere_rms", "atmosphere_max_error", "version" and "data_hash"
+    """
+    models = {"version": np.array(ARTIFACT_VERSION),
+              "data_hash": np.array(data_hash(data_dir, model_order, atmosphere_order))}
+
+    for name in MODEL_NAMES:
+        x, y = read_chart(os.path.join(data_dir, MODEL_FILES[name]))
+        coefficients, residuals = fit_polynomial(y, x, model_order)
+        models[name] = coefficients
+        models[f"{name}_rms"] = np.sqrt(np.mean(residuals ** 2))
+        models[f"{name}_max_error"] = np.max(np.abs(residuals))
+
+    altitudes, coefficients, rms, max_error = [], [], [], []
+    for altitude, path in atmosphere_files(data_dir):
+        x, y = read_chart(path)
+        fit, residuals = fit_polynomial(x, y, atmosphere_order)
+        altitudes.append(altitude)
+        coefficients.append(fit)
+        rms.append(np.sqrt(np.mean(residuals ** 2)))
+        max_error.append(np.max(np.abs(residuals)))
+
+    models["atmosphere_altitudes"] = np.array(altitudes, dtype=float)
+    models["atmosphere_coefficients"] = np.array(coefficients).reshape(len(altitudes), atmosphere_order + 1)
+    models["atmosphere_rms"] = np.array(rms)
+    models["atmosphere_max_error"] = np.array(max_error)
+    return models
+
+
+def build_models(data_dir: str = DATA_DIR, artifact_dir: str = ARTIFACT_DIR, model_order: int = DEFAULT_MODEL_ORDER,
+                 atmosphere_order: int = DEFAULT_ATMOSPHERE_ORDER, force: bool = False) -> str:
+    """
+    Fits the models and writes the artifact, unless an artifact of the same charts and settings already exists.
+
+    :param data_dir: the chart directory
+    :param artifact_dir: the artifact directory
+    :param model_order: order of the climb/descent polynomials
+    :param atmosphere_order: order of the atmospheric polynomials
+    :param force: refit even if the artifact exists
+    :return: the path of the artifact
+    """
+    path = artifact_path(data_dir, artifact_dir, model_order, atmosphere_order)
+    if os.path.exists(path) and not force:
+        return path
+
+    models = fit_models(data_dir, model_order, atmosphere_order)
+    os.makedirs(artifact_dir, exist_ok=True)
+    # written next to the artifact and renamed, so concurrent readers never see a partial file
+    atomic_write(path, lambda file: np.savez(file, **models))
+    clear_cache()
+    return path
+
+
+def report(models: dict[str, np.ndarray]) -> str:
+    """
+    :param models: the contents of an artifact
+    :return: a table of the fit residuals of every model
+    """
+    lines = [f"{'Model':<24}{'RMS':>12}{'Max Error':>12}"]
+    for name in MODEL_NAMES:
+        lines.append(f"{name:<24}{float(models[f'{name}_rms']):>12.4g}{float(models[f'{name}_max_error']):>12.4g}")
+    for altitude, rms, max_error in zip(models["atmosphere_altitudes"], models["atmosphere_rms"],
+                                        models["atmosphere_max_error"]):
+        lines.append(f"{f'atmosphere {altitude:g} ft':<24}{rms:>12.4g}{max_error:>12.4g}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fits the climb, descent and atmospheric models from the "
+                                                 "digitized POH charts and writes them to an .npz artifact.")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="chart directory")
+    parser.add_argument("--artifact-dir", default=ARTIFACT_DIR, help="artifact directory")
+    parser.add_argument("--model-order", type=int, default=DEFAULT_MODEL_ORDER,
+                        help="order of the climb/descent polynomials")
+    parser.add_argument("--atmosphere-order", type=int, default=DEFAULT_ATMOSPHERE_ORDER,
+                        help="order of the atmospheric polynomials")
+    parser.add_argument("--force", action="store_true", help="refit even if the artifact is up to date")
+    args = parser.parse_args()
+
+    artifact = build_models(args.data_dir, args.artifact_dir, args.model_order, args.atmosphere_order, args.force)
+    print(report(load_models(artifact)))
+    print(f"Models written to {artifact}")
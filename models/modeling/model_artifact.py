@@ -0,0 +1,137 @@
+import functools
+import glob
+import hashlib
+import os
+import re
+import numpy as np
+from models.performance_grid import MODEL_NAMES
+
+# bump when the layout of the artifact or the fitting procedure changes, older artifacts are then refitted
+ARTIFACT_VERSION: int = 1
+
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+ARTIFACT_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts")
+
+# digitized POH chart of every climb/descent model, ordered as MODEL_NAMES
+MODEL_FILES: dict = {"time_to_climb": "climb_time_min.csv",
+                     "distance_to_climb": "climb_distance_nm.csv",
+                     "fuel_to_climb": "climb_fuel_gal.csv",
+                     "time_to_descend": "descent_time_min.csv",
+                     "distance_to_descend": "descent_distance_nm.csv",
+                     "fuel_to_descend": "descent_fuel_gal.csv"}
+ATMOSPHERE_DIR: str = "atmospheric"
+ATMOSPHERE_PATTERN: re.Pattern = re.compile(r"altitude_(-?\d+)_ft\.csv$")
+
+DEFAULT_MODEL_ORDER: int = 5        # climb_models.m, descent_models.m
+DEFAULT_ATMOSPHERE_ORDER: int = 2   # atmospheric_model.m
+
+
+def read_chart(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reads a digitized chart (a CSV file with an "x, y" header).
+
+    :param path: path of the CSV file
+    :return: x, y: the columns of the chart
+    """
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    return data[:, 0], data[:, 1]
+
+
+def atmosphere_files(data_dir: str) -> list[tuple[int, str]]:
+    """
+    :param data_dir: the chart directory
+    :return: (pressure altitude (ft), path) of every atmospheric chart, by increasing altitude
+    """
+    files = []
+    for path in glob.glob(os.path.join(data_dir, ATMOSPHERE_DIR, "*.csv")):
+        match = ATMOSPHERE_PATTERN.search(os.path.basename(path))
+        assert match is not None, f"Unexpected atmospheric chart name: {path}"
+        files.append((int(match.group(1)), path))
+    return sorted(files)
+
+
+def data_hash(data_dir: str = DATA_DIR, model_order: int = DEFAULT_MODEL_ORDER,
+              atmosphere_order: int = DEFAULT_ATMOSPHERE_ORDER) -> str:
+    """
+    Content hash of the charts and of the fitting settings. The parsed chart values are hashed rather than the
+    file bytes, so that line endings (e.g., a CRLF checkout) and formatting do not change the artifact.
+
+    :param data_dir: the chart directory
+    :param model_order: order of the climb/descent polynomials
+    :param atmosphere_order: order of the atmospheric polynomials
+    :return: hex SHA-256 digest
+    """
+    digest = hashlib.sha256(f"v{ARTIFACT_VERSION};{model_order};{atmosphere_order}".encode())
+    names = list(MODEL_FILES.values()) + \
+        [f"{ATMOSPHERE_DIR}/{os.path.basename(path)}" for _, path in atmosphere_files(data_dir)]
+    for name in names:
+        digest.update(name.encode())
+        path = os.path.join(data_dir, name)
+        stat = os.stat(path)
+        digest.update(_chart_digest(path, stat.st_mtime_ns, stat.st_size))
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _chart_digest(path: str, mtime_ns: int, size: int) -> bytes:
+    # keyed by the modification time and size, so unchanged charts are only parsed once per process
+    x, y = read_chart(path)
+    return hashlib.sha256(np.ascontiguousarray([x, y], dtype="<f8").tobytes()).digest()
+
+
+def artifact_path(data_dir: str = DATA_DIR, artifact_dir: str = ARTIFACT_DIR, model_order: int = DEFAULT_MODEL_ORDER,
+                  atmosphere_order: int = DEFAULT_ATMOSPHERE_ORDER) -> str:
+    """
+    :return: the path of the artifact of the current charts and settings (which may not be built yet)
+    """
+    digest = data_hash(data_dir, model_order, atmosphere_order)
+    return os.path.join(artifact_dir, f"performance_models_v{ARTIFACT_VERSION}_{digest[:16]}.npz")
+
+
+@functools.lru_cache(maxsize=None)
+def _current_artifact(data_dir: str, artifact_dir: str, model_order: int, atmosphere_order: int) -> str:
+    # only found artifacts are cached (lru_cache does not cache exceptions), a missing one is looked up again
+    path = artifact_path(data_dir, artifact_dir, model_order, atmosphere_order)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No model artifact matches the charts of {data_dir} (expected {path}): it is "
+                                f"missing, or the charts changed since it was built. Build it with "
+                                f"python -m models.modeling.fit_models --data-dir {data_dir}")
+    return os.path.abspath(path)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_artifact(path: str) -> dict[str, np.ndarray]:
+    with np.load(path) as artifact:
+        models = {name: artifact[name] for name in artifact.files}
+    assert int(models["version"]) == ARTIFACT_VERSION, \
+        f"{path} is a version {int(models['version'])} artifact, expected version {ARTIFACT_VERSION}."
+    for array in models.values():
+        array.flags.writeable = False
+    return models
+
+
+def load_models(path: str | None = None, data_dir: str = DATA_DIR, artifact_dir: str = ARTIFACT_DIR,
+                model_order: int = DEFAULT_MODEL_ORDER, atmosphere_order: int = DEFAULT_ATMOSPHERE_ORDER
+                ) -> dict[str, np.ndarray]:
+    """
+    Loads an artifact. Only reads files: the artifact of the current charts of data_dir must have been built (by
+    models.modeling.fit_models.build_models() or its command line) and committed, so that loading works on
+    read-only installs. The artifact of a chart directory is looked up, and every artifact read, once per process
+    (see clear_cache()); the arrays are read-only.
+
+    :param path: path of an existing artifact, the artifact of data_dir is used if None
+    :return: the contents of the artifact (see models.modeling.fit_models.fit_models())
+    """
+    if path is None:
+        path = _current_artifact(data_dir, artifact_dir, model_order, atmosphere_order)
+    return _read_artifact(os.path.abspath(path))
+
+
+def clear_cache() -> None:
+    """
+    Forgets the artifacts found and read by load_models(), e.g., after the charts or the artifacts changed.
+
+    :return: None
+    """
+    _current_artifact.cache_clear()
+    _read_artifact.cache_clear()
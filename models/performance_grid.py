@@ -0,0 +1,208 @@
+import numpy as np
+from models.atmosphere import MIN_TEMPERATURE, MAX_TEMPERATURE, MIN_PRESSURE_ALT, MAX_PRESSURE_ALT, \
+    ATMOSPHERE_COEFFICIENTS, atmospheric_model_batch
+
+MODEL_NAMES: tuple = ("time_to_climb", "distance_to_climb", "fuel_to_climb",
+                      "time_to_descend", "distance_to_descend", "fuel_to_descend")
+CLIMB_MODELS: slice = slice(0, 3)
+DESCEND_MODELS: slice = slice(3, 6)
+
+
+def evaluate_performance_models(models: np.ndarray, temperature: np.ndarray, pressure_alt: np.ndarray) -> np.ndarray:
+    """
+    Evaluates the climb and descent polynomial models exactly (i.e., the path used by Aircraft.compute_climb() and
+    Aircraft.compute_descent()) at the given temperatures and pressure altitudes.
+
+    :param models: (6, order + 1) array of polynomial coefficients, ordered as MODEL_NAMES
+    :param temperature: np.ndarray = outside air temperature (F)
+    :param pressure_alt: np.ndarray = pressure altitude (ft)
+
+    :return: values: np.ndarray = (6, ...) array of model values
+    """
+    performance = atmospheric_model_batch(temperature=temperature, pressure_alt=pressure_alt)
+    return np.stack([np.polyval(model, performance) for model in models])
+
+
+class PerformanceGrid:
+    """
+    Climb and descent performance models tabulated over a temperature x pressure altitude grid covering the
+    envelope of the atmospheric model. Queries are answered by bilinear interpolation of the table instead of
+    evaluating the atmospheric model and the polynomial models on every call.
+    """
+    def __init__(self, models: np.ndarray, temperatures: np.ndarray, pressure_alts: np.ndarray, tables: np.ndarray,
+                 max_errors: np.ndarray, requested_steps: np.ndarray | None = None,
+                 atmosphere: np.ndarray | None = None) -> None:
+        """
+        Use PerformanceGrid.build() or PerformanceGrid.load() rather than calling the constructor directly.
+
+        :param models: (6, order + 1) array of the polynomial coefficients the grid was built from
+        :param temperatures: (T,) evenly spaced grid temperatures (F)
+        :param pressure_alts: (A,) evenly spaced grid pressure altitudes (ft)
+        :param tables: (6, T, A) tabulated model values
+        :param max_errors: (6,) maximum absolute error of each tabulated model against the exact models, measured at
+            the cell centers
+        :param requested_steps: (2,) temperature and pressure altitude steps passed to build(), None if unknown
+        :param atmosphere: coefficients of the atmospheric model the grid was built from (ATMOSPHERE_COEFFICIENTS),
+            None if unknown
+        """
+        self.models: np.ndarray = np.asarray(models, dtype=float)
+        self.temperatures: np.ndarray = np.asarray(temperatures, dtype=float)
+        self.pressure_alts: np.ndarray = np.asarray(pressure_alts, dtype=float)
+        self.tables: np.ndarray = np.asarray(tables, dtype=float)
+        self.max_errors: np.ndarray = np.asarray(max_errors, dtype=float)
+        self.requested_steps: np.ndarray | None = None if requested_steps is None else \
+            np.asarray(requested_steps, dtype=float)
+        self.atmosphere: np.ndarray | None = None if atmosphere is None else np.asarray(atmosphere, dtype=float)
+
+        self.temperature_step: float = self.temperatures[1] - self.temperatures[0]
+        self.pressure_alt_step: float = self.pressure_alts[1] - self.pressure_alts[0]
+
+    @classmethod
+    def build(cls, models: np.ndarray, temperature_step: float = 1.0, pressure_alt_step: float = 100.0,
+              tolerance: float | None = None) -> "PerformanceGrid":
+        """
+        Tabulates the models over the MIN/MAX_TEMPERATURE x MIN/MAX_PRESSURE_ALT envelope. The grid spacing is
+        rounded down so that the envelope edges fall on grid points. The interpolation error of each model is
+        measured against the exact models at the center of every grid cell, where bilinear interpolation is least
+        accurate.
+
+        :param models: (6, order + 1) array of polynomial coefficients, ordered as MODEL_NAMES
+        :param temperature_step: maximum temperature spacing of the grid (F)
+        :param pressure_alt_step: maximum pressure altitude spacing of the grid (ft)
+        :param tolerance: if given, the maximum absolute error allowed for every model at the cell centers (min, nm
+            or gal)
+
+        :return: grid: PerformanceGrid = the tabulated models
+        """
+        assert temperature_step > 0 and pressure_alt_step > 0, "The grid steps must be positive."
+
+        n_temperatures = int(np.ceil((MAX_TEMPERATURE - MIN_TEMPERATURE) / temperature_step)) + 1
+        n_pressure_alts = int(np.ceil((MAX_PRESSURE_ALT - MIN_PRESSURE_ALT) / pressure_alt_step)) + 1
+        temperatures = np.linspace(MIN_TEMPERATURE, MAX_TEMPERATURE, n_temperatures)
+        pressure_alts = np.linspace(MIN_PRESSURE_ALT, MAX_PRESSURE_ALT, n_pressure_alts)
+
+        models = np.asarray(models, dtype=float)
+        tables = evaluate_performance_models(models, *np.meshgrid(temperatures, pressure_alts, indexing="ij"))
+        grid = cls(models, temperatures, pressure_alts, tables, max_errors=np.zeros(len(models)),
+                   requested_steps=np.array([temperature_step, pressure_alt_step]), atmosphere=ATMOSPHERE_COEFFICIENTS)
+
+        cell_temperatures = (temperatures[:-1] + temperatures[1:]) / 2
+        cell_pressure_alts = (pressure_alts[:-1] + pressure_alts[1:]) / 2
+        cell_temperatures, cell_pressure_alts = np.meshgrid(cell_temperatures, cell_pressure_alts, indexing="ij")
+        exact = evaluate_performance_models(models, cell_temperatures, cell_pressure_alts)
+        interpolated = grid.lookup(cell_temperatures, cell_pressure_alts)
+        grid.max_errors = np.abs(interpolated - exact).reshape(len(models), -1).max(axis=1)
+
+        if tolerance is not None:
+            assert np.all(grid.max_errors <= tolerance), \
+                f"Performance grid error {grid.max_errors.max():.3g} exceeds the tolerance {tolerance}. Use a finer grid."
+
+        return grid
+
+    def lookup(self, temperature: np.ndarray, pressure_alt: np.ndarray, models: slice = slice(None)) -> np.ndarray:
+        """
+        Bilinear lookup of the tabulated models. The inputs may be scalars or arrays of any broadcastable shape.
+        Inputs outside of the envelope are returned as NaN.
+
+        :param temperature: np.ndarray = outside air temperature (F)
+        :param pressure_alt: np.ndarray = pressure altitude (ft)
+        :param models: the models to look up (e.g., CLIMB_MODELS or DESCEND_MODELS), all of them by default
+
+        :return: values: np.ndarray = (n_models, ...) array of interpolated model values
+        """
+        temperature, pressure_alt = np.broadcast_arrays(np.asarray(temperature, dtype=float),
+                                                        np.asarray(pressure_alt, dtype=float))
+        in_envelope = ((temperature >= self.temperatures[0]) & (temperature <= self.temperatures[-1]) &
+                       (pressure_alt >= self.pressure_alts[0]) & (pressure_alt <= self.pressure_alts[-1]))
+
+        temperature_position = (np.where(in_envelope, temperature, self.temperatures[0]) - self.temperatures[0]) / \
+            self.temperature_step
+        pressure_alt_position = (np.where(in_envelope, pressure_alt, self.pressure_alts[0]) - self.pressure_alts[0]) / \
+            self.pressure_alt_step
+
+        i = np.clip(np.floor(temperature_position).astype(np.intp), 0, len(self.temperatures) - 2)
+        j = np.clip(np.floor(pressure_alt_position).astype(np.intp), 0, len(self.pressure_alts) - 2)
+        u = temperature_position - i
+        v = pressure_alt_position - j
+
+        tables = self.tables[models]
+        values = ((1 - u) * (1 - v) * tables[:, i, j] + u * (1 - v) * tables[:, i + 1, j] +
+                  (1 - u) * v * tables[:, i, j + 1] + u * v * tables[:, i + 1, j + 1])
+
+        return np.where(in_envelope, values, np.nan)
+
+    def compute_climb(self, from_altitude: np.ndarray, to_altitude: np.ndarray, temperature: np.ndarray):
+        """
+        Grid version of Aircraft.compute_climb(). Entries where from_altitude >= to_altitude are returned as NaN.
+        The error of each output is estimated at up to twice the corresponding entry of max_errors; this is not a
+        strict bound, as max_errors is measured at the cell centers only.
+
+        :param from_altitude: np.ndarray = outside pressure altitude (ft)
+        :param to_altitude: np.ndarray = desired pressure altitude (ft) [must be > pressure_alt]
+        :param temperature: np.ndarray = outside air temperature (F)
+        :return: time, distance, fuel: np.ndarray = time (min), distance (nm) and fuel (gal) to climb
+        """
+        values = self.lookup(temperature, to_altitude, CLIMB_MODELS) - \
+            self.lookup(temperature, from_altitude, CLIMB_MODELS)
+        values = np.where(np.asarray(from_altitude) < np.asarray(to_altitude), values, np.nan)
+        return values[0][()], values[1][()], values[2][()]
+
+    def compute_descent(self, from_altitude: np.ndarray, to_altitude: np.ndarray, temperature: np.ndarray):
+        """
+        Grid version of Aircraft.compute_descent(). The error of each output is estimated at up to twice the
+        corresponding entry of max_errors; this is not a strict bound, as max_errors is measured at the cell centers
+        only.
+
+        :param from_altitude: np.ndarray = outside pressure altitude (ft)
+        :param to_altitude: np.ndarray = desired pressure altitude (ft)
+        :param temperature: np.ndarray = outside air temperature (F)
+        :return: time, distance, fuel: np.ndarray = time (min), distance (nm) and fuel (gal) to descend
+        """
+        values = self.lookup(temperature, from_altitude, DESCEND_MODELS) - \
+            self.lookup(temperature, to_altitude, DESCEND_MODELS)
+        return values[0][()], values[1][()], values[2][()]
+
+    def matches(self, models: np.ndarray, temperature_step: float | None = None,
+                pressure_alt_step: float | None = None) -> bool:
+        """
+        :param models: (6, order + 1) array of polynomial coefficients
+        :param temperature_step: the temperature step requested from build(), None to accept any
+        :param pressure_alt_step: the pressure altitude step requested from build(), None to accept any
+        :return: True if the grid was built from these models, the current atmospheric model and the given steps
+        """
+        models = np.asarray(models, dtype=float)
+        if models.shape != self.models.shape or not np.array_equal(models, self.models):
+            return False
+        if self.atmosphere is None or not np.array_equal(self.atmosphere, ATMOSPHERE_COEFFICIENTS):
+            return False
+        for requested, step in ((temperature_step, 0), (pressure_alt_step, 1)):
+            if requested is not None and (self.requested_steps is None or self.requested_steps[step] != requested):
+                return False
+        return True
+
+    def save(self, path: str) -> None:
+        """
+        Saves the grid to a .npz file so that it does not have to be rebuilt at each process start.
+
+        :param path: file path
+        :return: None
+        """
+        arrays = {"requested_steps": self.requested_steps, "atmosphere": self.atmosphere}
+        np.savez(path, models=self.models, temperatures=self.temperatures, pressure_alts=self.pressure_alts,
+                 tables=self.tables, max_errors=self.max_errors,
+                 **{name: array for name, array in arrays.items() if array is not None})
+
+    @classmethod
+    def load(cls, path: str) -> "PerformanceGrid":
+        """
+        Loads a grid saved with PerformanceGrid.save(). Grids saved before the requested steps and the atmospheric
+        model were recorded load with None for them, and never match().
+
+        :param path: file path
+        :return: grid: PerformanceGrid = the tabulated models
+        """
+        with np.load(path) as data:
+            optional = {name: data[name] if name in data.files else None for name in ("requested_steps", "atmosphere")}
+            return cls(models=data["models"], temperatures=data["temperatures"],
+                       pressure_alts=data["pressure_alts"], tables=data["tables"], max_errors=data["max_errors"],
+                       **optional)
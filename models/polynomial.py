@@ -0,0 +1,47 @@
+import numpy as np
+
+# inputs taken by the plain float path, which converts them with float()
+SCALAR_TYPES: tuple = (float, int, np.floating, np.integer)
+
+
+def is_scalar(*values) -> bool:
+    """
+    Flags inputs that can take the plain float path of the models: Python ints and floats and NumPy integer and
+    floating scalars (e.g., np.float32, np.int64). Arrays, including 0-d arrays, take the vectorized path.
+
+    :param values: the inputs
+    :return: True if every input is a scalar of SCALAR_TYPES
+    """
+    return all(isinstance(value, SCALAR_TYPES) for value in values)
+
+
+class Polynomial:
+    """
+    Polynomial compiled from its coefficients (highest power first, as np.polyval() expects). Scalar inputs are
+    evaluated with Horner's rule on plain floats, in the same order of operations as np.polyval(), without the
+    NumPy call overhead; array inputs are passed to np.polyval().
+    """
+    __slots__ = ("coefficients", "leading", "trailing")
+
+    def __init__(self, coefficients) -> None:
+        """
+        :param coefficients: the polynomial coefficients, highest power first
+        """
+        self.coefficients: np.ndarray = np.array(coefficients, dtype=float)
+        assert self.coefficients.ndim == 1 and len(self.coefficients) > 0, \
+            "The coefficients must be a non-empty 1-D sequence."
+        self.leading: float = self.coefficients[0].item()
+        self.trailing: tuple = tuple(self.coefficients[1:].tolist())
+
+    def __call__(self, x):
+        """
+        :param x: a scalar or an array
+        :return: the polynomial evaluated at x (a float for scalar inputs)
+        """
+        if not is_scalar(x):
+            return np.polyval(self.coefficients, x)
+        x = float(x)
+        y = self.leading
+        for coefficient in self.trailing:
+            y = y * x + coefficient
+        return y
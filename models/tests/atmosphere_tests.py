@@ -1,5 +1,6 @@
 import unittest
-from models.atmosphere import atmospheric_model
+import numpy as np
+from models.atmosphere import atmospheric_model, atmospheric_model_batch
 
 
 TOLERANCE = 0.33
@@ -25,6 +26,29 @@ class TestAtmosphericModel(unittest.TestCase):
                 result = atmospheric_model(case["temperature"], case["pressure_alt"])
                 self.assertAlmostEqual(result, case["expected"], delta=TOLERANCE)
 
+    def test_atmospheric_model_batch(self):
+        temperatures = np.arange(-20, 101, 7.5)
+        pressure_alts = np.arange(0, 14001, 250)
+        temperature_grid, pressure_alt_grid = np.meshgrid(temperatures, pressure_alts)
+
+        result = atmospheric_model_batch(temperature_grid, pressure_alt_grid)
+        self.assertEqual(result.shape, temperature_grid.shape)
+
+        for (i, j), temperature in np.ndenumerate(temperature_grid):
+            with self.subTest(temperature=temperature, pressure_alt=pressure_alt_grid[i, j]):
+                expected = atmospheric_model(temperature, pressure_alt_grid[i, j])
+                self.assertAlmostEqual(result[i, j], expected, places=9)
+
+    def test_atmospheric_model_batch_out_of_envelope(self):
+        temperatures = np.array([40, -21, 101, 40, 40, np.nan])
+        pressure_alts = np.array([1000, 1000, 1000, -1, 14001, 1000])
+
+        result, in_envelope = atmospheric_model_batch(temperatures, pressure_alts, return_mask=True)
+
+        np.testing.assert_array_equal(in_envelope, [True, False, False, False, False, False])
+        self.assertFalse(np.isnan(result[0]))
+        self.assertTrue(np.all(np.isnan(result[1:])))
+
 
 if __name__ == '__main__':
     unittest.main()
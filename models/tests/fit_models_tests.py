@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from models.atmosphere import ATMOSPHERE
+from models.modeling.fit_models import build_models, fit_models, report
+from models.modeling.model_artifact import DATA_DIR, MODEL_FILES, clear_cache, data_hash, load_models
+from models.performance_grid import MODEL_NAMES
+
+
+class TestFitModels(unittest.TestCase):
+    """
+    Tests to ensure that the fitting pipeline reproduces the MATLAB models and only refits when the charts change.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.directory.name, "data")
+        self.artifact_dir = os.path.join(self.directory.name, "artifacts")
+        shutil.copytree(DATA_DIR, self.data_dir)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_matlab_models(self):
+        models = fit_models(self.data_dir)
+
+        # coefficients of aircraft/N8273V.py and models/atmosphere.py, as fitted by the MATLAB scripts
+        np.testing.assert_allclose(models["time_to_climb"], [2.87877650796108e-06, -0.000144802420551403,
+                                                             0.00342898366361228, -0.0107917301934256,
+                                                             0.634422192936824, -0.0186154940652254], rtol=1e-9)
+        np.testing.assert_allclose(models["fuel_to_descend"], [1.19726058053013e-07, -1.36088862232907e-06,
+                                                               -0.000200535974443365, 0.00344771825995696,
+                                                               0.0981893803146724, 0.0140448819097330], rtol=1e-9)
+        np.testing.assert_array_equal(models["atmosphere_altitudes"], sorted(ATMOSPHERE))
+        np.testing.assert_allclose(models["atmosphere_coefficients"],
+                                   [ATMOSPHERE[altitude] for altitude in sorted(ATMOSPHERE)], rtol=1e-9)
+
+        for name in MODEL_NAMES:
+            self.assertLessEqual(models[f"{name}_rms"], models[f"{name}_max_error"])
+        self.assertEqual(len(report(models).splitlines()), 1 + len(MODEL_NAMES) + len(ATMOSPHERE))
+
+    def test_unchanged_data_is_not_refitted(self):
+        path = build_models(self.data_dir, self.artifact_dir)
+        modified = os.stat(path).st_mtime_ns
+
+        self.assertEqual(build_models(self.data_dir, self.artifact_dir), path)
+        self.assertEqual(os.stat(path).st_mtime_ns, modified)
+
+        with open(os.path.join(self.data_dir, MODEL_FILES["time_to_climb"]), "a") as file:
+            file.write("\n45.0, 30.0\n")
+        changed_path = build_models(self.data_dir, self.artifact_dir)
+        self.assertNotEqual(changed_path, path)
+        self.assertFalse(np.array_equal(load_models(changed_path)["time_to_climb"],
+                                        load_models(path)["time_to_climb"]))
+
+    def test_configurable_order(self):
+        path = build_models(self.data_dir, self.artifact_dir, model_order=3, atmosphere_order=1)
+        models = load_models(path)
+
+        self.assertNotEqual(path, build_models(self.data_dir, self.artifact_dir))
+        self.assertEqual(models["distance_to_climb"].shape, (4,))
+        self.assertEqual(models["atmosphere_coefficients"].shape, (len(ATMOSPHERE), 2))
+
+    def test_loading_is_read_only(self):
+        with self.assertRaises(FileNotFoundError):
+            load_models(data_dir=self.data_dir, artifact_dir=self.artifact_dir)
+        self.assertFalse(os.path.exists(self.artifact_dir))
+
+        path = build_models(self.data_dir, self.artifact_dir)
+        models = load_models(data_dir=self.data_dir, artifact_dir=self.artifact_dir)
+        self.assertIs(models, load_models(path))
+        self.assertIs(load_models(data_dir=self.data_dir, artifact_dir=self.artifact_dir), models)
+
+        # a changed chart makes the artifact stale (charts are looked up once per process, until clear_cache())
+        with open(os.path.join(self.data_dir, MODEL_FILES["time_to_climb"]), "a") as file:
+            file.write("\n45.0, 30.0\n")
+        clear_cache()
+        with self.assertRaises(FileNotFoundError):
+            load_models(data_dir=self.data_dir, artifact_dir=self.artifact_dir)
+
+    def test_hash_ignores_line_endings(self):
+        expected = data_hash(self.data_dir)
+        for directory, _, names in os.walk(self.data_dir):
+            for name in names:
+                with open(os.path.join(directory, name), "rb") as file:
+                    contents = file.read()
+                with open(os.path.join(directory, name), "wb") as file:
+                    file.write(contents.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n"))
+        self.assertEqual(data_hash(self.data_dir), expected)
+
+    def test_aircraft_loads_artifact(self):
+        aircraft = N8273V()
+        aircraft.load_performance_models(build_models(self.data_dir, self.artifact_dir, model_order=4))
+
+        self.assertEqual(aircraft.time_to_descend_model.shape, (5,))
+        time, distance, fuel = aircraft.compute_climb(1000, 5500, 60)
+        self.assertAlmostEqual(time, N8273V().compute_climb(1000, 5500, 60)[0], delta=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
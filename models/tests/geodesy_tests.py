@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from models.geodesy import EARTH_RADIUS_NM, great_circle, rhumb_line, intermediate_point, route_geometry
+from models.magnetic_variation import MagneticVariationGrid
+
+
+class TestGeodesy(unittest.TestCase):
+    """
+    Tests to ensure that the great circle and rhumb line kernels give the expected courses and distances.
+    """
+    def test_cardinal_courses(self):
+        arc_minute = EARTH_RADIUS_NM * np.pi / (180 * 60)
+
+        course, distance = great_circle(0, 0, [1, 0, -1, 0], [0, 1, 0, -1])
+        np.testing.assert_allclose(course, [0, 90, 180, 270], atol=1e-9)
+        np.testing.assert_allclose(distance, 60 * arc_minute)
+
+        course, distance = rhumb_line(45, 0, 45, 1)
+        self.assertAlmostEqual(course, 90)
+        self.assertAlmostEqual(distance, 60 * arc_minute * np.cos(np.deg2rad(45)), places=6)
+
+    def test_great_circle_and_rhumb_line_agree_on_short_legs(self):
+        rng = np.random.default_rng(0)
+        latitudes = rng.uniform(-60, 60, (100, 2))
+        longitudes = rng.uniform(-180, 180, (100, 1)) + rng.uniform(-0.5, 0.5, (100, 2))
+
+        great_circle_course, great_circle_distance = route_geometry(latitudes, longitudes, "great_circle")
+        rhumb_line_course, rhumb_line_distance = route_geometry(latitudes, longitudes, "rhumb_line")
+        np.testing.assert_allclose(rhumb_line_distance, great_circle_distance, rtol=1e-3)
+        np.testing.assert_allclose((rhumb_line_course - great_circle_course + 180) % 360 - 180, 0, atol=1.0)
+        self.assertTrue(np.all(rhumb_line_distance >= great_circle_distance - 1e-9))
+
+    def test_route_geometry_and_midpoint(self):
+        # KPDK -> GVL
+        course, distance = route_geometry([33.8756, 34.2726], [-84.3020, -83.8302])
+        self.assertAlmostEqual(float(course[0]), 44, delta=1)
+        self.assertAlmostEqual(float(distance[0]), 33.7, delta=0.5)
+
+        latitude, longitude = intermediate_point(0, 179, 0, -179)
+        self.assertAlmostEqual(float(latitude), 0)
+        self.assertAlmostEqual(abs(float(longitude)), 180)
+
+    def test_magnetic_variation_grid(self):
+        grid = MagneticVariationGrid(latitudes=[30, 40], longitudes=[-90, -80],
+                                     variation=[[-2.0, 6.0], [0.0, 8.0]])
+        np.testing.assert_allclose(grid.sample([30, 40, 35], [-90, -80, -85]), [-2, 8, 3], atol=1e-2)
+        self.assertTrue(np.isnan(grid.sample(45, -85)))
+
+        # interpolated across the antimeridian (179 -> 180 -> -179) rather than back through 0
+        wrapped = MagneticVariationGrid(latitudes=[0, 1], longitudes=[0, 1], variation=[[179, -179], [179, -179]])
+        self.assertAlmostEqual(abs(float(wrapped.sample(0.5, 0.5))), 180)
+
+
+if __name__ == '__main__':
+    unittest.main()
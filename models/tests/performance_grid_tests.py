@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from models.performance_grid import PerformanceGrid, CLIMB_MODELS, DESCEND_MODELS, evaluate_performance_models
+
+
+TOLERANCE = 0.05
+
+
+class TestPerformanceGrid(unittest.TestCase):
+    """
+    Tests to ensure that the tabulated climb and descent models stay close to the exact models.
+    """
+    def setUp(self):
+        self.exact = N8273V()
+        self.gridded = N8273V()
+        self.grid = self.gridded.enable_performance_grid(tolerance=TOLERANCE)
+
+    def test_grid_matches_exact_models(self):
+        rng = np.random.default_rng(0)
+        temperatures = rng.uniform(-20, 100, 500)
+        from_altitudes = rng.uniform(0, 7000, 500)
+        to_altitudes = rng.uniform(7001, 14000, 500)
+
+        # max_errors is measured at the cell centers only: measure the lookup error at the test points instead, a
+        # climb or descent is the difference of two lookups
+        lookup_errors = [np.abs(self.grid.lookup(temperatures, altitudes) - evaluate_performance_models(
+            self.exact.performance_models, temperatures, altitudes)).max(axis=1)
+            for altitudes in (from_altitudes, to_altitudes)]
+        measured_errors = np.maximum(*lookup_errors)
+        np.testing.assert_array_less(measured_errors, 1.5 * self.grid.max_errors)
+        climb_bounds = 2 * measured_errors[CLIMB_MODELS]
+        descent_bounds = 2 * measured_errors[DESCEND_MODELS]
+
+        exact_climb = self.exact.compute_climb_batch(from_altitudes, to_altitudes, temperatures)
+        gridded_climb = self.gridded.compute_climb_batch(from_altitudes, to_altitudes, temperatures)
+        exact_descent = self.exact.compute_descent_batch(to_altitudes, from_altitudes, temperatures)
+        gridded_descent = self.gridded.compute_descent_batch(to_altitudes, from_altitudes, temperatures)
+
+        for exact, gridded, bound in zip(exact_climb + exact_descent, gridded_climb + gridded_descent,
+                                         np.concatenate([climb_bounds, descent_bounds])):
+            self.assertLessEqual(np.max(np.abs(exact - gridded)), bound + 1e-12)
+
+        time, distance, fuel = self.gridded.compute_climb(1000, 5500, 70)
+        self.assertAlmostEqual(time, self.exact.compute_climb(1000, 5500, 70)[0], delta=climb_bounds[0])
+
+    def test_out_of_envelope(self):
+        time, distance, fuel = self.grid.compute_climb(np.array([1000, 1000]), np.array([5500, 15000]), 70)
+        self.assertFalse(np.isnan(time[0]))
+        self.assertTrue(np.isnan(time[1]))
+
+        with self.assertRaises(AssertionError):
+            self.gridded.compute_climb(1000, 5500, 120)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "grid.npz")
+            self.grid.save(path)
+            loaded = PerformanceGrid.load(path)
+
+            self.assertTrue(loaded.matches(self.exact.performance_models))
+            self.assertTrue(loaded.matches(self.exact.performance_models, 1.0, 100.0))
+            self.assertFalse(loaded.matches(self.exact.performance_models, 0.5, 50.0))
+            np.testing.assert_array_equal(loaded.tables, self.grid.tables)
+            np.testing.assert_array_equal(loaded.max_errors, self.grid.max_errors)
+
+    def test_cached_grid_matches_requested_steps(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "grid.npz")
+            coarse = self.gridded.enable_performance_grid(temperature_step=10, pressure_alt_step=1000, path=path)
+            self.assertEqual(self.gridded.enable_performance_grid(temperature_step=10, pressure_alt_step=1000,
+                                                                  path=path).tables.shape, coarse.tables.shape)
+
+            fine = self.gridded.enable_performance_grid(temperature_step=0.5, pressure_alt_step=50, path=path)
+            self.assertEqual(fine.temperature_step, 0.5)
+            self.assertEqual(fine.pressure_alt_step, 50)
+
+            # grids of another atmospheric model are rebuilt
+            fine.atmosphere = fine.atmosphere + 1
+            fine.save(path)
+            self.assertFalse(PerformanceGrid.load(path).matches(self.exact.performance_models))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import pickle
+import unittest
+import numpy as np
+from aircraft.N8273V import N8273V
+from models.atmosphere import atmospheric_model, atmospheric_model_batch
+from models.polynomial import Polynomial, is_scalar
+from models.winds import compute_wca, compute_gs, compute_wind_triangle
+
+
+TOLERANCE = 1e-9
+
+
+class TestScalarFastPath(unittest.TestCase):
+    """
+    Tests to ensure that the plain float path of the models matches their vectorized NumPy path.
+    """
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.temperature = rng.uniform(-20, 100, 200)
+        self.pressure_alt = rng.uniform(0, 14000, 200)
+
+    def test_polynomial(self):
+        coefficients = [1.5e-6, -2e-3, 0.7, -3.0, 11.0, 0.25]
+        polynomial = pickle.loads(pickle.dumps(Polynomial(coefficients)))
+        x = np.linspace(-10, 40, 101)
+
+        np.testing.assert_array_equal(polynomial(x), np.polyval(coefficients, x))
+        for value in x.tolist():
+            self.assertIsInstance(polynomial(value), float)
+            self.assertEqual(polynomial(value), np.polyval(coefficients, value))
+        self.assertTrue(is_scalar(3, 2.5, np.float64(1), np.float32(1), np.int64(1)))
+        self.assertFalse(is_scalar(3, np.array(2.5)))
+
+    def test_atmospheric_model(self):
+        batch = atmospheric_model_batch(self.temperature, self.pressure_alt)
+        for temperature, pressure_alt, expected in zip(self.temperature.tolist(), self.pressure_alt.tolist(), batch):
+            self.assertIsInstance(atmospheric_model(temperature, pressure_alt), float)
+            self.assertAlmostEqual(atmospheric_model(temperature, pressure_alt), expected, delta=TOLERANCE)
+        np.testing.assert_array_equal(atmospheric_model(self.temperature, self.pressure_alt), batch)
+        self.assertIsInstance(atmospheric_model(np.float32(60), np.int64(5500)), float)
+        self.assertAlmostEqual(atmospheric_model(np.float32(60), np.int64(5500)), atmospheric_model(60, 5500),
+                               delta=TOLERANCE)
+        with self.assertRaises(AssertionError):
+            atmospheric_model(np.array([60, 120]), np.array([1000, 1000]))
+
+    def test_wind_triangle(self):
+        rng = np.random.default_rng(1)
+        inputs = (rng.uniform(0, 360, 200), rng.uniform(0, 160, 200), rng.uniform(0, 360, 200),
+                  rng.uniform(0, 50, 200))
+        batch = compute_wind_triangle(*inputs)
+        wca, gs = compute_wca(*inputs), compute_gs(*inputs)
+        for i, scalar_inputs in enumerate(zip(*(values.tolist() for values in inputs))):
+            for value, expected in zip(compute_wind_triangle(*scalar_inputs), batch):
+                self.assertIsInstance(value, float)
+                self.assertAlmostEqual(value, expected[i], delta=TOLERANCE)
+            self.assertAlmostEqual(compute_wca(*scalar_inputs), wca[i], delta=TOLERANCE)
+            self.assertAlmostEqual(compute_gs(*scalar_inputs), gs[i], delta=TOLERANCE)
+            for value, expected in zip(compute_wind_triangle(*map(np.float32, scalar_inputs)), batch):
+                self.assertIsInstance(value, float)
+                self.assertAlmostEqual(value, expected[i], delta=1e-3)
+
+    def test_climb_and_descent(self):
+        aircraft = N8273V()
+        to_altitude = np.minimum(self.pressure_alt + 2500, 14000)
+        climb = aircraft.compute_climb_batch(self.pressure_alt, to_altitude, self.temperature)
+        descent = aircraft.compute_descent_batch(to_altitude, self.pressure_alt, self.temperature)
+
+        for i in range(0, 200, 10):
+            arguments = (self.pressure_alt[i].item(), to_altitude[i].item(), self.temperature[i].item())
+            for value, expected in zip(aircraft.compute_climb(*arguments), climb):
+                self.assertAlmostEqual(value, expected[i], delta=TOLERANCE)
+            arguments = (to_altitude[i].item(), self.pressure_alt[i].item(), self.temperature[i].item())
+            for value, expected in zip(aircraft.compute_descent(*arguments), descent):
+                self.assertAlmostEqual(value, expected[i], delta=TOLERANCE)
+
+        # array inputs are dispatched to the batch path, replaced models are recompiled
+        np.testing.assert_array_equal(aircraft.compute_climb(self.pressure_alt, to_altitude, self.temperature)[0],
+                                      climb[0])
+        with self.assertRaises(AssertionError):
+            aircraft.compute_climb(to_altitude, self.pressure_alt, self.temperature)
+        aircraft.time_to_climb_model = 2 * aircraft.time_to_climb_model
+        self.assertAlmostEqual(aircraft.compute_climb(1000, 5500, 60)[0],
+                               N8273V().compute_climb(1000, 5500, 60)[0] * 2, delta=TOLERANCE)
+
+        # the models are read-only, so the compiled evaluators cannot go stale
+        with self.assertRaises(ValueError):
+            aircraft.time_to_climb_model *= 2
+        self.assertAlmostEqual(aircraft.compute_climb(1000, 5500, 60)[0],
+                               N8273V().compute_climb(1000, 5500, 60)[0] * 2, delta=TOLERANCE)
+
+
+if __name__ == '__main__':
+    unittest.main()
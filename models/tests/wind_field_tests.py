@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from models.wind_field import WindField
+from models.winds_aloft import WindsAloft
+
+
+def linear_field() -> WindField:
+    """
+    Field whose components are linear in every axis, so that interpolation is exact.
+    """
+    times, altitudes = np.array([0.0, 6.0]), np.array([0.0, 6000.0, 12000.0])
+    latitudes, longitudes = np.arange(30.0, 36.0), np.arange(-88.0, -80.0)
+    t, a, y, x = np.meshgrid(times, altitudes, latitudes, longitudes, indexing="ij")
+    values = np.stack([t + a / 1000 + y, 2 * x - y, 60 - a / 500 + t], axis=-1)
+    return WindField(times, altitudes, latitudes, longitudes, values)
+
+
+class TestWindField(unittest.TestCase):
+    """
+    Tests to ensure that the gridded forecast interpolates exactly between grid points and samples legs in bulk.
+    """
+    def test_linear_interpolation(self):
+        field = linear_field()
+        rng = np.random.default_rng(0)
+        t, a = rng.uniform(0, 6, 100), rng.uniform(0, 12000, 100)
+        y, x = rng.uniform(30, 35, 100), rng.uniform(-88, -81, 100)
+
+        components = field.sample_components(y, x, a, t)
+        np.testing.assert_allclose(components, np.stack([t + a / 1000 + y, 2 * x - y, 60 - a / 500 + t], axis=-1))
+
+        # clamped in time and altitude, NaN outside of the horizontal grid
+        np.testing.assert_allclose(field.sample_components(32, -85, 20000, 10), [6 + 12 + 32, -202, 42])
+        self.assertTrue(np.isnan(field.sample_components(40, -85, 5000, 1)).all())
+
+    def test_matches_winds_aloft(self):
+        altitudes = np.array([3000.0, 6000.0, 9000.0])
+        winds_aloft = WindsAloft(altitudes, [350, 20, 60], [10, 20, 30], [70, 60, 50])
+        field = WindField.from_forecast([0.0], altitudes, [30.0, 40.0], [-90.0, -80.0],
+                                        np.broadcast_to(np.reshape([350, 20, 60], (1, 3, 1, 1)), (1, 3, 2, 2)),
+                                        np.broadcast_to(np.reshape([10, 20, 30], (1, 3, 1, 1)), (1, 3, 2, 2)),
+                                        np.broadcast_to(np.reshape([70, 60, 50], (1, 3, 1, 1)), (1, 3, 2, 2)))
+
+        sampled = field.sample(35, -85, np.linspace(2000, 10000, 17), 0)
+        for actual, expected in zip(sampled, winds_aloft.sample(np.linspace(2000, 10000, 17))):
+            np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-4)
+
+    def test_sample_legs(self):
+        field = linear_field()
+        rng = np.random.default_rng(1)
+        shape = (50, 4)
+        legs = dict(from_latitude=rng.uniform(31, 34, shape), from_longitude=rng.uniform(-87, -82, shape),
+                    to_latitude=rng.uniform(31, 34, shape), to_longitude=rng.uniform(-87, -82, shape),
+                    start_altitude=rng.uniform(1000, 11000, shape), end_altitude=rng.uniform(1000, 11000, shape),
+                    time=rng.uniform(0, 6, shape))
+
+        midpoint = field.sample_legs(**legs)
+        integrated = field.sample_legs(**legs, method="integrate", n_points=16)
+        for values in midpoint + integrated:
+            self.assertEqual(values.shape, shape)
+        # the temperature is linear along the leg, so both methods agree on it
+        np.testing.assert_allclose(integrated[2], midpoint[2], atol=1e-3)
+
+    def test_save_and_load(self):
+        field = linear_field()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "forecast.npy")
+            field.save(path)
+            loaded = WindField.load(path)
+
+            self.assertIsInstance(loaded.values, np.memmap)
+            np.testing.assert_allclose(loaded.sample(33.3, -84.2, 5500, 2.5), field.sample(33.3, -84.2, 5500, 2.5),
+                                       rtol=1e-5)
+            # the axes are stored in the table file, the forecast is a single file
+            self.assertEqual(os.listdir(directory), ["forecast.npy"])
+            del loaded
+
+
+if __name__ == '__main__':
+    unittest.main()
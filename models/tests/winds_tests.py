@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+from models.winds import compute_wca, compute_gs, compute_wind_triangle
+
+
+TOLERANCE = 1e-9
+
+
+class TestWindTriangle(unittest.TestCase):
+    """
+    Tests to ensure that the fused wind triangle matches compute_wca() and compute_gs().
+    """
+    def test_wind_triangle_matches_separate_functions(self):
+        rng = np.random.default_rng(0)
+        true_course = rng.uniform(0, 360, 1000)
+        true_airspeed = rng.uniform(60, 160, 1000)
+        wind_direction = rng.uniform(0, 360, 1000)
+        wind_speed = rng.uniform(0, 50, 1000)
+
+        wca, gs, _, _ = compute_wind_triangle(true_course, true_airspeed, wind_direction, wind_speed)
+
+        np.testing.assert_allclose(wca, compute_wca(true_course, true_airspeed, wind_direction, wind_speed),
+                                   atol=TOLERANCE)
+        np.testing.assert_allclose(gs, compute_gs(true_course, true_airspeed, wind_direction, wind_speed),
+                                   atol=TOLERANCE)
+
+    def test_wind_components(self):
+        test_cases = [
+            {"true_course": 90, "wind_direction": 90, "expected_headwind": 20, "expected_crosswind": 0},
+            {"true_course": 90, "wind_direction": 270, "expected_headwind": -20, "expected_crosswind": 0},
+            {"true_course": 90, "wind_direction": 180, "expected_headwind": 0, "expected_crosswind": 20},
+            {"true_course": 0, "wind_direction": 270, "expected_headwind": 0, "expected_crosswind": -20},
+        ]
+
+        for case in test_cases:
+            with self.subTest(true_course=case["true_course"], wind_direction=case["wind_direction"]):
+                wca, gs, headwind, crosswind = compute_wind_triangle(case["true_course"], 100,
+                                                                     case["wind_direction"], 20)
+                self.assertAlmostEqual(headwind, case["expected_headwind"], delta=TOLERANCE)
+                self.assertAlmostEqual(crosswind, case["expected_crosswind"], delta=TOLERANCE)
+                self.assertAlmostEqual(wca, compute_wca(case["true_course"], 100, case["wind_direction"], 20),
+                                       delta=TOLERANCE)
+                self.assertAlmostEqual(gs, compute_gs(case["true_course"], 100, case["wind_direction"], 20),
+                                       delta=TOLERANCE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+import numpy as np
+from common.array_file import save_array, load_array
+from models.geodesy import intermediate_point
+
+AXES: tuple = ("times", "altitudes", "latitudes", "longitudes")
+CHANNELS: tuple = ("wind_east", "wind_north", "temperature")
+SAMPLING_METHODS: tuple = ("midpoint", "integrate")
+
+
+class WindField:
+    """
+    Gridded winds and temperatures aloft forecast (e.g., one cycle of a numerical weather model for the area flown),
+    tabulated by time, pressure altitude, latitude and longitude. Winds are stored as east/north vector components,
+    so that interpolation wraps correctly through north.
+
+    The table is a single (T, A, Y, X, 3) float32 .npy array, memory-mapped when loaded, so only the pages around
+    the sampled points are read and worker processes share them.
+    """
+    def __init__(self, times: np.ndarray, altitudes: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray,
+                 values: np.ndarray) -> None:
+        """
+        :param times: (T,) increasing forecast times in hours (from any reference, e.g. the start of the cycle)
+        :param altitudes: (A,) increasing pressure altitudes (ft)
+        :param latitudes: (Y,) increasing latitudes in degrees
+        :param longitudes: (X,) increasing longitudes in degrees
+        :param values: (T, A, Y, X, 3) wind east component (kts), wind north component (kts), temperature (F)
+        """
+        self.axes: tuple = tuple(np.asarray(axis, dtype=float) for axis in (times, altitudes, latitudes, longitudes))
+        self.values: np.ndarray = values
+
+        for name, axis in zip(AXES, self.axes):
+            assert axis.ndim == 1 and len(axis) > 0, f"The wind field must have at least one of {name}."
+            assert np.all(np.diff(axis) > 0), f"The {name} of the wind field must be increasing."
+        assert values.shape == tuple(len(axis) for axis in self.axes) + (len(CHANNELS),), \
+            "values must have the shape (times, altitudes, latitudes, longitudes, 3)."
+
+    @property
+    def times(self) -> np.ndarray:
+        return self.axes[0]
+
+    @property
+    def altitudes(self) -> np.ndarray:
+        return self.axes[1]
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self.axes[2]
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self.axes[3]
+
+    @classmethod
+    def from_forecast(cls, times: np.ndarray, altitudes: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray,
+                      wind_direction: np.ndarray, wind_speed: np.ndarray, temperature: np.ndarray) -> "WindField":
+        """
+        :param times: (T,) increasing forecast times in hours
+        :param altitudes: (A,) increasing pressure altitudes (ft)
+        :param latitudes: (Y,) increasing latitudes in degrees
+        :param longitudes: (X,) increasing longitudes in degrees
+        :param wind_direction: (T, A, Y, X) wind direction in degrees
+        :param wind_speed: (T, A, Y, X) wind speed in kts
+        :param temperature: (T, A, Y, X) outside temperature (F)
+        :return: the wind field
+        """
+        wind_direction = np.deg2rad(wind_direction)
+        values = np.stack([wind_speed * np.sin(wind_direction), wind_speed * np.cos(wind_direction),
+                           np.asarray(temperature, dtype=float)], axis=-1).astype(np.float32)
+        return cls(times, altitudes, latitudes, longitudes, values)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the table (.npy) followed by its axes, as a single file replaced atomically (see
+        common.array_file.save_array()).
+
+        :param path: path of the .npy file
+        :return: None
+        """
+        save_array(path, np.asarray(self.values, dtype=np.float32),
+                   {name: axis.tolist() for name, axis in zip(AXES, self.axes)})
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "WindField":
+        """
+        :param path: path of a .npy file written by save()
+        :param mmap: memory-map the table instead of reading it
+        :return: the wind field
+        """
+        values, axes = load_array(path, mmap=mmap)
+        return cls(*(axes[name] for name in AXES), values)
+
+    def sample_components(self, latitude: np.ndarray, longitude: np.ndarray, altitude: np.ndarray,
+                          time: np.ndarray) -> np.ndarray:
+        """
+        Interpolates the table linearly along every axis. Times and altitudes outside of the forecast use the
+        closest forecast time or altitude; points outside of the latitudes and longitudes are NaN.
+
+        :param latitude: latitudes in degrees
+        :param longitude: longitudes in degrees
+        :param altitude: pressure altitudes (ft)
+        :param time: times in hours
+        :return: (..., 3) wind east component (kts), wind north component (kts) and temperature (F), where ... is
+                 the broadcast shape of the inputs
+        """
+        points = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (time, altitude, latitude,
+                                                                                     longitude)))
+        shape = points[0].shape
+
+        indices, weights, outside = [], [], np.zeros(shape, dtype=bool)
+        for axis, value, clamp in zip(self.axes, points, (True, True, False, False)):
+            if len(axis) == 1:
+                indices.append((np.zeros(shape, dtype=int), np.zeros(shape, dtype=int)))
+                weights.append(np.zeros(shape))
+                if not clamp:
+                    outside |= value != axis[0]
+                continue
+
+            lower = np.clip(np.searchsorted(axis, value, side="right") - 1, 0, len(axis) - 2)
+            weight = (value - axis[lower]) / (axis[lower + 1] - axis[lower])
+            if clamp:
+                weight = np.clip(weight, 0, 1)
+            else:
+                outside |= (weight < 0) | (weight > 1)
+            indices.append((lower, lower + 1))
+            weights.append(weight)
+
+        values = np.zeros(shape + (len(CHANNELS),))
+        for corner in range(16):
+            bits = [(corner >> axis) & 1 for axis in range(4)]
+            weight = np.ones(shape)
+            for bit, axis_weight in zip(bits, weights):
+                weight = weight * (axis_weight if bit else 1 - axis_weight)
+            corner_values = self.values[tuple(axis_indices[bit] for bit, axis_indices in zip(bits, indices))]
+            values += weight[..., np.newaxis] * corner_values
+
+        values[outside] = np.nan
+        return values
+
+    def sample(self, latitude: np.ndarray, longitude: np.ndarray, altitude: np.ndarray,
+               time: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Interpolates the forecast at the given points (see sample_components()).
+
+        :param latitude: latitudes in degrees
+        :param longitude: longitudes in degrees
+        :param altitude: pressure altitudes (ft)
+        :param time: times in hours
+        :return: wind_direction: wind direction in degrees
+        :return: wind_speed: wind speed in kts
+        :return: temperature: outside temperature (F)
+        """
+        return components_to_wind(self.sample_components(latitude, longitude, altitude, time))
+
+    def sample_legs(self, from_latitude: np.ndarray, from_longitude: np.ndarray, to_latitude: np.ndarray,
+                    to_longitude: np.ndarray, start_altitude: np.ndarray, end_altitude: np.ndarray,
+                    time: np.ndarray, method: str = "midpoint",
+                    n_points: int = 8) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Samples the forecast for many legs at once (e.g., every leg of a day's plans, flattened or as an (N, M)
+        plan table).
+
+        :param from_latitude: latitude of the start of each leg in degrees
+        :param from_longitude: longitude of the start of each leg in degrees
+        :param to_latitude: latitude of the end of each leg in degrees
+        :param to_longitude: longitude of the end of each leg in degrees
+        :param start_altitude: pressure altitude at the start of each leg (ft)
+        :param end_altitude: pressure altitude at the end of each leg (ft)
+        :param time: time of each leg in hours
+        :param method: "midpoint" to interpolate at the middle of the leg at its mean altitude, "integrate" to
+                       average the wind vectors and temperatures at n_points evenly spaced along the great circle,
+                       with the altitude changing linearly from start_altitude to end_altitude
+        :param n_points: number of points of the "integrate" method
+        :return: wind_direction: wind direction in degrees
+        :return: wind_speed: wind speed in kts
+        :return: temperature: outside temperature (F)
+        """
+        assert method in SAMPLING_METHODS, f"method must be one of {SAMPLING_METHODS}."
+        legs = [np.asarray(value, dtype=float) for value in (from_latitude, from_longitude, to_latitude,
+                                                             to_longitude, start_altitude, end_altitude, time)]
+
+        if method == "midpoint":
+            fractions = np.array(0.5)
+        else:
+            legs = [leg[..., np.newaxis] for leg in legs]
+            fractions = (np.arange(n_points) + 0.5) / n_points
+
+        from_latitude, from_longitude, to_latitude, to_longitude, start_altitude, end_altitude, time = legs
+        latitude, longitude = intermediate_point(from_latitude, from_longitude, to_latitude, to_longitude,
+                                                 fractions)
+        altitude = start_altitude + fractions * (end_altitude - start_altitude)
+        components = self.sample_components(latitude, longitude, altitude, time)
+
+        if method == "integrate":
+            components = components.mean(axis=-2)
+        return components_to_wind(components)
+
+
+def components_to_wind(components: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :param components: (..., 3) wind east component (kts), wind north component (kts) and temperature (F)
+    :return: wind_direction: wind direction in degrees
+    :return: wind_speed: wind speed in kts
+    :return: temperature: outside temperature (F)
+    """
+    wind_east, wind_north, temperature = components[..., 0], components[..., 1], components[..., 2]
+    return np.rad2deg(np.arctan2(wind_east, wind_north)) % 360, np.hypot(wind_east, wind_north), temperature
@@ -1,4 +1,7 @@
+import math
+import sys
 import numpy as np
+from models.polynomial import is_scalar
 
 
 def compute_wca(true_course: float, true_airspeed: float, wind_direction: float, wind_speed: float) -> float:
@@ -11,8 +14,12 @@ def compute_wca(true_course: float, true_airspeed: float, wind_direction: float,
     :param wind_speed: the wind speed in kts.
     :return: wind correction angle in degrees.
     """
-    acute_wind_angle = (wind_direction - true_course) % 360
+    if is_scalar(true_course, true_airspeed, wind_direction, wind_speed):
+        acute_wind_angle = (float(wind_direction) - float(true_course)) % 360
+        return math.degrees(math.atan2(float(wind_speed)*math.sin(math.radians(acute_wind_angle)),
+                                       float(true_airspeed)))
 
+    acute_wind_angle = (wind_direction - true_course) % 360
     wca = np.arctan2(wind_speed*np.sin(np.deg2rad(acute_wind_angle)), true_airspeed)
 
     return np.rad2deg(wca)
@@ -28,6 +35,13 @@ def compute_gs(true_course: float, true_airspeed: float, wind_direction: float,
     :param wind_speed: the wind speed in kts.
     :return: the computed ground speed in kts.
     """
+    if is_scalar(true_course, true_airspeed, wind_direction, wind_speed):
+        true_course, true_airspeed = float(true_course), float(true_airspeed)
+        wind_direction, wind_speed = float(wind_direction), float(wind_speed)
+        wca_rad = math.radians(compute_wca(true_course, true_airspeed, wind_direction, wind_speed))
+        return math.sqrt(max(true_airspeed ** 2 + wind_speed ** 2 - 2 * true_airspeed * wind_speed *
+                             math.cos(math.radians(true_course) - math.radians(wind_direction) + wca_rad), 0))
+
     tc_rad = np.deg2rad(true_course)
     wd_rad = np.deg2rad(wind_direction)
     wca_rad = np.deg2rad(compute_wca(true_course, true_airspeed, wind_direction, wind_speed))
@@ -38,6 +52,48 @@ def compute_gs(true_course: float, true_airspeed: float, wind_direction: float,
     return ground_speed
 
 
+def compute_wind_triangle(true_course: float, true_airspeed: float, wind_direction: float, wind_speed: float):
+    """
+    Solves the wind triangle in a single pass. Equivalent to calling compute_wca() and compute_gs(), but the wind
+    angle trigonometry is only evaluated once. The inputs may be scalars or arrays of any broadcastable shape;
+    scalars are solved with the math module on plain floats.
+
+    :param true_course: the course that the aircraft must fly on a sectional map in degrees.
+    :param true_airspeed: the true airspeed of the aircraft during the maneuver in kts.
+    :param wind_direction: the wind direction relative to true north in degrees.
+    :param wind_speed: the wind speed in kts.
+    :return: wca: wind correction angle in degrees.
+    :return: ground_speed: the computed ground speed in kts.
+    :return: headwind: the wind component along the course in kts (negative for a tailwind).
+    :return: crosswind: the wind component across the course in kts (positive for a wind from the right).
+    """
+    if is_scalar(true_course, true_airspeed, wind_direction, wind_speed):
+        true_course, true_airspeed = float(true_course), float(true_airspeed)
+        wind_direction, wind_speed = float(wind_direction), float(wind_speed)
+        acute_wind_angle = math.radians((wind_direction - true_course) % 360)
+        headwind = wind_speed * math.cos(acute_wind_angle)
+        crosswind = wind_speed * math.sin(acute_wind_angle)
+        r = max(math.hypot(crosswind, true_airspeed), sys.float_info.min)
+        ground_speed = math.sqrt(max(true_airspeed ** 2 + wind_speed ** 2 -
+                                     2 * true_airspeed * (true_airspeed * headwind + crosswind ** 2) / r, 0))
+        return math.degrees(math.atan2(crosswind, true_airspeed)), ground_speed, headwind, crosswind
+
+    acute_wind_angle = np.deg2rad((wind_direction - true_course) % 360)
+
+    headwind = wind_speed * np.cos(acute_wind_angle)
+    crosswind = wind_speed * np.sin(acute_wind_angle)
+
+    wca = np.arctan2(crosswind, true_airspeed)
+
+    # cos(wca - wind angle) expanded with cos(wca) = TAS / r and sin(wca) = crosswind / r
+    # (r is kept away from 0 so that a zero airspeed and crosswind reduces to GS = wind speed)
+    r = np.maximum(np.hypot(crosswind, true_airspeed), np.finfo(float).tiny)
+    ground_speed = np.sqrt(np.maximum(true_airspeed ** 2 + wind_speed ** 2 -
+                                      2 * true_airspeed * (true_airspeed * headwind + crosswind ** 2) / r, 0))
+
+    return np.rad2deg(wca), ground_speed, headwind, crosswind
+
+
 if __name__ == '__main__':
     true_course = 90
     wca = compute_wca(true_course=true_course, true_airspeed=120, wind_direction=289, wind_speed=21)
@@ -0,0 +1,47 @@
+import numpy as np
+
+
+class WindsAloft:
+    """
+    Winds and temperatures aloft forecast for a single location, tabulated by altitude (e.g., an FB winds aloft
+    report). Winds are interpolated between altitudes as vectors, so that directions wrap correctly through north.
+    """
+    def __init__(self, altitudes: np.ndarray, wind_direction: np.ndarray, wind_speed: np.ndarray,
+                 temperature: np.ndarray) -> None:
+        """
+        :param altitudes: forecast pressure altitudes (ft)
+        :param wind_direction: wind direction at each altitude in degrees
+        :param wind_speed: wind speed at each altitude in kts
+        :param temperature: outside temperature at each altitude (F)
+        """
+        altitudes = np.asarray(altitudes, dtype=float)
+        assert altitudes.ndim == 1 and len(altitudes) > 0, "Winds aloft must have at least one altitude."
+
+        order = np.argsort(altitudes)
+        wind_direction = np.deg2rad(np.asarray(wind_direction, dtype=float)[order])
+        wind_speed = np.asarray(wind_speed, dtype=float)[order]
+
+        self.altitudes: np.ndarray = altitudes[order]
+        self.temperature: np.ndarray = np.asarray(temperature, dtype=float)[order]
+        self.wind_east: np.ndarray = wind_speed * np.sin(wind_direction)
+        self.wind_north: np.ndarray = wind_speed * np.cos(wind_direction)
+
+    def sample(self, altitude: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Interpolates the forecast at the given altitudes. Altitudes outside of the forecast use the closest
+        forecast altitude.
+
+        :param altitude: pressure altitudes (ft), any shape
+        :return: wind_direction: wind direction in degrees
+        :return: wind_speed: wind speed in kts
+        :return: temperature: outside temperature (F)
+        """
+        altitude = np.asarray(altitude, dtype=float)
+        wind_east = np.interp(altitude, self.altitudes, self.wind_east)
+        wind_north = np.interp(altitude, self.altitudes, self.wind_north)
+        temperature = np.interp(altitude, self.altitudes, self.temperature)
+
+        wind_direction = np.rad2deg(np.arctan2(wind_east, wind_north)) % 360
+        wind_speed = np.hypot(wind_east, wind_north)
+
+        return wind_direction, wind_speed, temperature